@@ -1,24 +1,47 @@
 from flask import Flask
 from flask_restful import Api
-from endpoints.products import ProductsResource
+from endpoints.products import ProductsResource, ProductsBulkResource
 from endpoints.auth import AuthenticationResource
 from endpoints.categories import CategoriesResource
-from endpoints.favorites import FavoritesResource
+from endpoints.favorites import FavoritesResource, FavoritesBulkResource
+from endpoints.cache import CacheStatsResource
+from endpoints.stats import StatsResource
+from endpoints.metrics import MetricsResource
+from container import AppContainer
+from utils.metrics import Metrics, install_flask_metrics, timed
 
 app = Flask(__name__)
 api = Api(app)
 
-import json
-with open('db.json', 'r') as file:
-    products = json.load(file)
+# Servicios, repositorios y parsers compartidos por todas las peticiones
+container = AppContainer()
 
 api.add_resource( AuthenticationResource,'/auth')
 
-api.add_resource(ProductsResource, '/products', '/products/<int:product_id>') 
+api.add_resource(ProductsResource, '/products', '/products/<int:product_id>',
+                 resource_class_kwargs=container.products())
 
-api.add_resource(CategoriesResource, '/categories', '/categories/<int:category_id>')
+api.add_resource(ProductsBulkResource, '/products/bulk',
+                 resource_class_kwargs={'service': container.product_service})
 
-api.add_resource(FavoritesResource, '/favorites')
+api.add_resource(CategoriesResource, '/categories', '/categories/<int:category_id>',
+                 resource_class_kwargs=container.categories())
+
+api.add_resource(FavoritesResource, '/favorites', resource_class_kwargs=container.favorites())
+
+api.add_resource(FavoritesBulkResource, '/favorites/bulk',
+                 resource_class_kwargs={'service': container.favorite_service})
+
+api.add_resource(CacheStatsResource, '/cache/stats')
+
+api.add_resource(StatsResource, '/stats', resource_class_kwargs={'service': container.stats_service})
+
+# Instrumentación opcional (METRICS_ENABLED=1): tiempos por endpoint y serialización JSON
+if Metrics().enabled:
+    install_flask_metrics(app)
+    api.representations['application/json'] = timed('serialization', 'output_json')(
+        api.representations['application/json'])
+    api.add_resource(MetricsResource, '/metrics')
 
 if __name__ == '__main__':
     app.run(debug=True)
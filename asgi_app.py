@@ -0,0 +1,469 @@
+"""
+Punto de entrada ASGI (asyncio) con el mismo contrato que app.py para
+/auth, /products, /products/bulk, /categories, /favorites, /favorites/bulk,
+/stats, /cache/stats y /metrics.
+
+Los handlers son corrutinas que llaman a los servicios a través de
+AsyncService, que ejecuta la E/S del almacenamiento en un pool de hilos
+acotado. Así un solo proceso mantiene miles de conexiones keep-alive
+abiertas sin un hilo por cliente.
+
+Uso:
+    pip install uvicorn
+    uvicorn asgi_app:app --port 5000
+"""
+
+import io
+import json
+import re
+import time
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+from werkzeug.datastructures import MIMEAccept
+from werkzeug.http import parse_accept_header
+from services.async_service import AsyncService, get_executor
+from services.stats_service import StatsUnavailableError
+from container import AppContainer
+from utils.auth.auth_config import AuthConfig
+from utils.auth.token_service import TokenService
+from utils.bulk import read_bulk_items, bulk_response
+from utils.http_cache import request_variant, validators, is_not_modified
+from utils.metrics import Metrics, REQUEST_METRIC, PROMETHEUS_MIMETYPE
+from utils.pagination import (parse_fields, project, project_all, wants_ndjson, MAX_PAGE_SIZE,
+                              NDJSON_MIMETYPE, PRICE_PARAMS)
+from utils.records import as_dict, as_dicts
+from utils.response_cache import ResponseCache, cache_key
+
+
+class Request:
+    """Datos de una petición HTTP leídos del scope ASGI."""
+
+    def __init__(self, scope: Dict[str, Any], body: bytes):
+        self.method = scope['method']
+        self.path = scope['path']
+        self.query_string = scope.get('query_string', b'')
+        # Como Flask, un parámetro vacío (?ids=) se conserva como ''
+        self.args = {key: values[0] for key, values
+                     in parse_qs(self.query_string.decode('latin-1'), keep_blank_values=True).items()}
+        self.headers = {name.decode('latin-1').lower(): value.decode('latin-1')
+                        for name, value in scope.get('headers', [])}
+        self.body = body
+
+    def get_json(self, silent: bool = True) -> Any:
+        """
+        Cuerpo JSON de la petición, o None si está vacío o no es JSON válido.
+        silent existe solo para aceptar las llamadas escritas para Flask.
+        """
+        if not self.body:
+            return None
+        try:
+            return json.loads(self.body)
+        except ValueError:
+            return None
+
+    @property
+    def mimetype(self) -> str:
+        """Content-Type sin parámetros, como request.mimetype de Flask."""
+        return self.headers.get('content-type', '').split(';', 1)[0].strip().lower()
+
+    @property
+    def stream(self) -> io.BytesIO:
+        """Cuerpo como archivo, para leerlo línea por línea (NDJSON)."""
+        return io.BytesIO(self.body)
+
+    @property
+    def accept_mimetypes(self) -> MIMEAccept:
+        """Accept interpretado con calidades, como request.accept_mimetypes de Flask."""
+        return parse_accept_header(self.headers.get('accept'), MIMEAccept)
+
+
+class Response:
+    """Respuesta con cuerpo completo o generado por partes (streaming)."""
+
+    def __init__(self, status: int, body: bytes = b'', headers: Optional[Dict[str, str]] = None,
+                 content_type: str = 'application/json', stream=None):
+        self.status = status
+        self.body = body
+        self.headers = headers or {}
+        self.content_type = content_type
+        self.stream = stream
+
+
+def json_response(payload: Any, status: int = 200, headers: Optional[Dict[str, str]] = None) -> Response:
+    return Response(status, (json.dumps(payload) + '\n').encode(), headers)
+
+
+class RequestParser:
+    """
+    Validación de argumentos equivalente a reqparse de Flask-RESTful:
+    busca en el cuerpo JSON y luego en la query, convierte el tipo y
+    responde {'message': {campo: ayuda}} con 400 si falta o no es válido.
+    """
+
+    def __init__(self, *arguments: Tuple[str, type, str]):
+        self.arguments = arguments
+
+    def parse_args(self, request: Request) -> Tuple[Dict[str, Any], Optional[Response]]:
+        body = request.get_json()
+        if not isinstance(body, dict):
+            body = {}
+        args = {}
+        for name, arg_type, help_text in self.arguments:
+            value = body.get(name, request.args.get(name))
+            try:
+                if value is None:
+                    raise ValueError(help_text)
+                args[name] = arg_type(value)
+            except (TypeError, ValueError):
+                return args, json_response({'message': {name: help_text}}, 400)
+        return args, None
+
+
+def _unauthorized(request: Request) -> Optional[Response]:
+    """Misma validación que token_required."""
+    token = request.headers.get('authorization')
+    if not token:
+        return json_response({'message': 'Unauthorized: access token not found'}, 401)
+    if not TokenService().is_valid(token):
+        return json_response({'message': 'Unauthorized: invalid token'}, 401)
+    return None
+
+
+def _error(e: Exception) -> Response:
+    if isinstance(e, ValueError):
+        return json_response({'message': str(e)}, 400)
+    if isinstance(e, StatsUnavailableError):
+        return json_response({'message': str(e)}, 501)
+    return json_response({'message': f'Internal server error: {str(e)}'}, 500)
+
+
+async def _cached_get(request: Request, service: AsyncService, collection: str, handler,
+                      conditional: bool = True) -> Response:
+    """
+    Equivalente a conditional_get + cached_response: ETag/Last-Modified,
+    304 con la versión actual y caché de la respuesta serializada.
+    Con conditional=False solo aplica la caché, como GET /favorites en app.py.
+    """
+    version, modified = await service.get_data_version()
+    headers = {}
+    if conditional:
+        etag, headers = validators(collection, version, modified, request_variant(request))
+        if is_not_modified(etag, modified, request.headers.get('if-none-match'),
+                           request.headers.get('if-modified-since')):
+            return Response(304, headers=headers)
+
+    cache = ResponseCache()
+    key = cache_key(request, version)
+    body = cache.get(key)
+    if body is not None:
+        return Response(200, body, dict(headers, **{'X-Cache': 'HIT'}))
+
+    response = await handler()
+    if response.status == 200:
+        response.headers.update(headers)
+        if response.stream is None:
+            cache.put(key, collection, response.body)
+            response.headers['X-Cache'] = 'MISS'
+    return response
+
+
+def _ndjson_stream(fetch_page, fields: Optional[List[str]]) -> Response:
+    """Exportación NDJSON leyendo el almacén página por página en el pool."""
+    async def generate():
+        cursor = None
+        while True:
+            page = await fetch_page(cursor, str(MAX_PAGE_SIZE))
+            if page['items']:
+                yield ''.join(json.dumps(project(row, fields)) + '\n' for row in page['items']).encode()
+            cursor = page['next_cursor']
+            if cursor is None:
+                return
+
+    return Response(200, content_type=NDJSON_MIMETYPE, stream=generate())
+
+
+class AsyncAPI:
+    """
+    Aplicación ASGI. Usa los servicios del contenedor y enruta cada
+    petición a su handler asíncrono.
+    """
+
+    def __init__(self):
+        container = AppContainer()
+        self.metrics = Metrics()
+        self.products = AsyncService(container.product_service)
+        self.categories = AsyncService(container.category_service)
+        self.favorites = AsyncService(container.favorite_service)
+        self.stats = AsyncService(container.stats_service)
+        self.product_parser = RequestParser(
+            ('name', str, 'Name of the product is required'),
+            ('category', str, 'Category of the product is required'),
+            ('price', float, 'Price of the product is required'))
+        self.category_parser = RequestParser(('name', str, 'Name of the category is required'))
+        self.favorite_parser = RequestParser(
+            ('user_id', int, 'User ID is required'),
+            ('product_id', int, 'Product ID is required'))
+        self.routes = [
+            (re.compile(r'^/auth/?$'), {'POST': self.auth_post, 'DELETE': self.auth_delete}, False),
+            (re.compile(r'^/products/bulk/?$'), {'POST': self.products_bulk_post}, True),
+            (re.compile(r'^/products(?:/(\d+))?/?$'),
+             {'GET': self.products_get, 'POST': self.products_post}, True),
+            (re.compile(r'^/categories(?:/(\d+))?/?$'),
+             {'GET': self.categories_get, 'POST': self.categories_post,
+              'DELETE': self.categories_delete}, True),
+            (re.compile(r'^/favorites/?$'),
+             {'GET': self.favorites_get, 'POST': self.favorites_post,
+              'DELETE': self.favorites_delete}, True),
+            (re.compile(r'^/favorites/bulk/?$'), {'POST': self.favorites_bulk_post}, True),
+            (re.compile(r'^/stats/?$'), {'GET': self.stats_get}, True),
+            (re.compile(r'^/cache/stats/?$'), {'GET': self.cache_stats_get}, True),
+        ]
+        if self.metrics.enabled:
+            self.routes.append((re.compile(r'^/metrics/?$'), {'GET': self.metrics_get}, True))
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self._lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+        start = time.perf_counter()
+        body = await _read_body(receive)
+        request = Request(scope, body)
+        response = await self.dispatch(request)
+        await _send_response(send, response)
+        if self.metrics.enabled:
+            # Se etiqueta por recurso ('/products'), no por ruta completa con IDs
+            endpoint = '/' + request.path.strip('/').split('/', 1)[0]
+            labels = (('endpoint', endpoint), ('method', request.method), ('status', str(response.status)))
+            self.metrics.observe(REQUEST_METRIC, labels, time.perf_counter() - start)
+
+    async def _lifespan(self, receive, send) -> None:
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                # Carga los almacenes antes de aceptar tráfico
+                for service in (self.products, self.categories, self.favorites):
+                    await service.get_data_version()
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                get_executor().shutdown(wait=True)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    async def dispatch(self, request: Request) -> Response:
+        """Busca la ruta, valida el token y ejecuta el handler."""
+        for pattern, handlers, protected in self.routes:
+            match = pattern.match(request.path)
+            if not match:
+                continue
+            handler = handlers.get(request.method)
+            if handler is None:
+                return json_response({'message': 'The method is not allowed for the requested URL.'}, 405)
+            if protected:
+                denied = _unauthorized(request)
+                if denied:
+                    return denied
+            params = [int(group) for group in match.groups() if group is not None]
+            try:
+                return await handler(request, *params)
+            except Exception as e:
+                return _error(e)
+        return json_response({'message': 'The requested URL was not found on the server.'}, 404)
+
+    async def auth_post(self, request: Request) -> Response:
+        data = request.get_json()
+        if not data:
+            return json_response({'message': 'Request body is required'}, 400)
+        username = data.get('username')
+        password = data.get('password')
+        if not username or not password:
+            return json_response({'message': 'Username and password are required'}, 400)
+        auth_config = AuthConfig()
+        if auth_config.validate_credentials(username, password):
+            return json_response({'token': TokenService().issue(username),
+                                  'expires_in': auth_config.TOKEN_TTL})
+        return json_response({'message': 'Unauthorized: invalid credentials'}, 401)
+
+    async def metrics_get(self, request: Request) -> Response:
+        return Response(200, self.metrics.render().encode(), content_type=PROMETHEUS_MIMETYPE)
+
+    async def auth_delete(self, request: Request) -> Response:
+        token = request.headers.get('authorization')
+        if not token:
+            return json_response({'message': 'Unauthorized: access token not found'}, 401)
+        if not TokenService().revoke(token):
+            return json_response({'message': 'Unauthorized: invalid token'}, 401)
+        return json_response({'message': 'Token revoked successfully'})
+
+    async def products_get(self, request: Request, product_id: Optional[int] = None) -> Response:
+        async def handler():
+            fields = parse_fields(request.args.get('fields'))
+            if 'ids' in request.args and product_id is None:
+                products = await self.products.get_products_by_ids(request.args.get('ids'))
+                return json_response(project_all(products, fields))
+            query = request.args.get('q')
+            if query is not None and product_id is None:
+                products = await self.products.search_products(query, request.args.get('limit'),
+                                                               request.args.get('category'))
+                return json_response(project_all(products, fields))
+            if product_id is None and any(name in request.args for name in PRICE_PARAMS):
+                page = await self.products.get_products_by_price(
+                    request.args.get('min_price'), request.args.get('max_price'),
+                    request.args.get('sort'), request.args.get('category'),
+                    request.args.get('cursor'), request.args.get('limit'))
+                page['items'] = project_all(page['items'], fields)
+                return json_response(page)
+            category_filter = request.args.get('category')
+            if category_filter:
+                products = await self.products.get_products_by_category(category_filter)
+                return json_response(project_all(products, fields))
+            if product_id is not None:
+                product = await self.products.get_product_by_id(product_id)
+                if product:
+                    return json_response(project(product, fields))
+                return json_response({'message': 'Product not found'}, 404)
+            if wants_ndjson(request):
+                return _ndjson_stream(self.products.get_products_page, fields)
+            if 'cursor' in request.args or 'limit' in request.args:
+                page = await self.products.get_products_page(request.args.get('cursor'),
+                                                             request.args.get('limit'))
+                page['items'] = project_all(page['items'], fields)
+                return json_response(page)
+            return json_response(project_all(await self.products.get_all_products(), fields))
+
+        return await _cached_get(request, self.products, 'products', handler)
+
+    async def products_post(self, request: Request) -> Response:
+        args, error = self.product_parser.parse_args(request)
+        if error:
+            return error
+        new_product = await self.products.create_product(
+            name=args['name'], category=args['category'], price=args['price'])
+        return json_response({'message': 'Product added successfully', 'product': as_dict(new_product)}, 201)
+
+    async def products_bulk_post(self, request: Request) -> Response:
+        items = read_bulk_items(request)
+        return json_response(*bulk_response(await self.products.create_products(items)))
+
+    async def categories_get(self, request: Request, category_id: Optional[int] = None) -> Response:
+        async def handler():
+            fields = parse_fields(request.args.get('fields'))
+            if category_id is not None:
+                category = await self.categories.get_category_by_id(category_id)
+                if category:
+                    return json_response(project(category, fields))
+                return json_response({'message': 'Category not found'}, 404)
+            if wants_ndjson(request):
+                return _ndjson_stream(self.categories.get_categories_page, fields)
+            if 'cursor' in request.args or 'limit' in request.args:
+                page = await self.categories.get_categories_page(request.args.get('cursor'),
+                                                                 request.args.get('limit'))
+                page['items'] = project_all(page['items'], fields)
+                return json_response(page)
+            return json_response(project_all(await self.categories.get_all_categories(), fields))
+
+        return await _cached_get(request, self.categories, 'categories', handler)
+
+    async def categories_post(self, request: Request) -> Response:
+        args, error = self.category_parser.parse_args(request)
+        if error:
+            return error
+        new_category = await self.categories.create_category(name=args['name'])
+        return json_response({'message': 'Category added successfully', 'category': new_category}, 201)
+
+    async def categories_delete(self, request: Request) -> Response:
+        args, error = self.category_parser.parse_args(request)
+        if error:
+            return error
+        try:
+            removed = await self.categories.delete_category(name=args['name'],
+                                                            cascade=request.args.get('cascade'))
+        except ValueError as e:
+            if "no encontrada" in str(e).lower() or "not found" in str(e).lower():
+                return json_response({'message': str(e)}, 404)
+            raise
+        return json_response({'message': 'Category removed successfully', 'products_removed': removed})
+
+    async def favorites_get(self, request: Request) -> Response:
+        async def handler():
+            try:
+                user_id = int(request.args['user_id'])
+            except (KeyError, ValueError):
+                user_id = None
+            if user_id:
+                favorites = await self.favorites.get_user_favorites(user_id)
+            else:
+                favorites = await self.favorites.get_all_favorites()
+            expand = request.args.get('expand')
+            if expand is not None:
+                return json_response(await self.favorites.expand_favorites(favorites, expand))
+            return json_response(as_dicts(favorites))
+
+        return await _cached_get(request, self.favorites, 'favorites', handler, conditional=False)
+
+    async def favorites_post(self, request: Request) -> Response:
+        args, error = self.favorite_parser.parse_args(request)
+        if error:
+            return error
+        new_favorite = await self.favorites.add_favorite(
+            user_id=args['user_id'], product_id=args['product_id'])
+        return json_response({'message': 'Product added to favorites', 'favorite': as_dict(new_favorite)}, 201)
+
+    async def favorites_bulk_post(self, request: Request) -> Response:
+        items = read_bulk_items(request)
+        return json_response(*bulk_response(await self.favorites.add_favorites(items)))
+
+    async def favorites_delete(self, request: Request) -> Response:
+        args, error = self.favorite_parser.parse_args(request)
+        if error:
+            return error
+        try:
+            await self.favorites.remove_favorite(user_id=args['user_id'], product_id=args['product_id'])
+        except ValueError as e:
+            if "no existe" in str(e).lower() or "not exist" in str(e).lower():
+                return json_response({'message': str(e)}, 404)
+            raise
+        return json_response({'message': 'Product removed from favorites'})
+
+    async def stats_get(self, request: Request) -> Response:
+        async def handler():
+            return json_response(await self.stats.get_stats(request.args.get('limit')))
+
+        return await _cached_get(request, self.stats, 'stats', handler)
+
+    async def cache_stats_get(self, request: Request) -> Response:
+        return json_response(ResponseCache().stats())
+
+
+async def _read_body(receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        chunks.append(message.get('body', b''))
+        if not message.get('more_body'):
+            return b''.join(chunks)
+
+
+async def _send_response(send, response: Response) -> None:
+    headers = [(b'content-type', response.content_type.encode())]
+    headers.extend((name.lower().encode(), value.encode()) for name, value in response.headers.items())
+    if response.stream is None:
+        headers.append((b'content-length', str(len(response.body)).encode()))
+    await send({'type': 'http.response.start', 'status': response.status, 'headers': headers})
+    if response.stream is None:
+        await send({'type': 'http.response.body', 'body': response.body})
+        return
+    async for chunk in response.stream:
+        await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+    await send({'type': 'http.response.body', 'body': b''})
+
+
+app = AsyncAPI()
+
+if __name__ == '__main__':
+    try:
+        import uvicorn
+    except ImportError:
+        raise SystemExit("Instale uvicorn para ejecutar el servidor ASGI: pip install uvicorn")
+    uvicorn.run(app, port=5000)
@@ -0,0 +1,179 @@
+"""
+Prueba de carga: servidor Flask (hilo por conexión) contra el punto de
+entrada ASGI (asyncio + pool acotado) con clientes keep-alive concurrentes.
+
+Cada servidor se levanta en un subproceso sobre una copia temporal de los
+datos; el generador de carga abre N conexiones HTTP/1.1 persistentes y
+cada una envía peticiones en serie durante la duración indicada.
+
+Uso:
+    python -m benchmarks.bench_asgi_vs_flask [conexiones] [segundos]
+
+El modo ASGI requiere uvicorn (pip install uvicorn); si no está instalado
+solo se mide Flask.
+"""
+
+import asyncio
+import http.client
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+from benchmarks.datasets import generate_dataset, write_dataset
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CREDENTIALS = {'username': 'student', 'password': 'desingp'}
+PRODUCTS = 10000
+REQUEST_TIMEOUT = 30
+
+
+def serve(kind: str, port: int) -> None:
+    """Ejecuta el servidor pedido en el proceso actual (usado por el subproceso)."""
+    if kind == 'flask':
+        from werkzeug.serving import run_simple, WSGIRequestHandler
+        from app import app
+
+        class KeepAliveHandler(WSGIRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+        run_simple('127.0.0.1', port, app, threaded=True, request_handler=KeepAliveHandler)
+    else:
+        import uvicorn
+        from asgi_app import app
+        uvicorn.run(app, host='127.0.0.1', port=port, log_level='warning', backlog=4096)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def _wait_for_port(port: int, timeout: float = 30) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError(f"El servidor no respondió en el puerto {port}")
+
+
+def _login(port: int) -> str:
+    """Obtiene un token firmado con POST /auth."""
+    connection = http.client.HTTPConnection('127.0.0.1', port, timeout=REQUEST_TIMEOUT)
+    try:
+        connection.request('POST', '/auth', json.dumps(CREDENTIALS), {'Content-Type': 'application/json'})
+        return json.loads(connection.getresponse().read())['token']
+    finally:
+        connection.close()
+
+
+async def _client(port: int, token: str, deadline: float, latencies: List[float], errors: List[str],
+                  seed: int) -> None:
+    """
+    Una conexión keep-alive que envía GET /products/<id> hasta el plazo.
+    Si el servidor responde 'Connection: close' (el servidor de desarrollo
+    de Flask lo hace siempre) se vuelve a conectar, y ese costo se mide.
+    """
+    rng = random.Random(seed)
+    writer = None
+    try:
+        while time.perf_counter() < deadline:
+            product_id = rng.randint(1, PRODUCTS)
+            request = (f'GET /products/{product_id} HTTP/1.1\r\nHost: localhost\r\n'
+                       f'Authorization: {token}\r\n\r\n').encode()
+            start = time.perf_counter()
+            if writer is None:
+                reader, writer = await asyncio.open_connection('127.0.0.1', port)
+            writer.write(request)
+            head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), REQUEST_TIMEOUT)
+            length = 0
+            keep_alive = True
+            for line in head.lower().split(b'\r\n'):
+                if line.startswith(b'content-length:'):
+                    length = int(line.split(b':', 1)[1])
+                elif line.startswith(b'connection:') and b'close' in line:
+                    keep_alive = False
+            await asyncio.wait_for(reader.readexactly(length), REQUEST_TIMEOUT)
+            if not head.startswith(b'HTTP/1.1 200'):
+                errors.append(head.split(b'\r\n', 1)[0].decode())
+            latencies.append(time.perf_counter() - start)
+            if not keep_alive:
+                writer.close()
+                writer = None
+    except (OSError, asyncio.IncompleteReadError, asyncio.TimeoutError) as e:
+        errors.append(type(e).__name__)
+    finally:
+        if writer is not None:
+            writer.close()
+
+
+async def _load(port: int, token: str, connections: int, seconds: float) -> Dict[str, float]:
+    latencies: List[float] = []
+    errors: List[str] = []
+    deadline = time.perf_counter() + seconds
+    start = time.perf_counter()
+    await asyncio.gather(*[_client(port, token, deadline, latencies, errors, seed)
+                           for seed in range(connections)])
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+
+    def percentile(fraction: float) -> float:
+        return latencies[min(len(latencies) - 1, int(len(latencies) * fraction))] * 1000 if latencies else 0.0
+
+    return {
+        'requests': len(latencies),
+        'rps': len(latencies) / elapsed,
+        'p50_ms': percentile(0.50),
+        'p99_ms': percentile(0.99),
+        'errors': len(errors)
+    }
+
+
+def run(kind: str, data_dir: str, connections: int, seconds: float) -> None:
+    port = _free_port()
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    process = subprocess.Popen([sys.executable, '-m', 'benchmarks.bench_asgi_vs_flask', '--serve', kind, str(port)],
+                               cwd=data_dir, env=env, stderr=subprocess.DEVNULL)
+    try:
+        _wait_for_port(port)
+        token = _login(port)
+        # Calentamiento: carga del almacén y del pool de hilos
+        asyncio.run(_load(port, token, 4, 0.5))
+        result = asyncio.run(_load(port, token, connections, seconds))
+        print(f"  {kind:<6} {result['rps']:>10.0f} req/s  p50 {result['p50_ms']:>8.2f} ms  "
+              f"p99 {result['p99_ms']:>8.2f} ms  {result['requests']} peticiones, {result['errors']} errores")
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main() -> None:
+    connections = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 10
+    kinds = ['flask']
+    try:
+        import uvicorn  # noqa: F401
+        kinds.append('asgi')
+    except ImportError:
+        print("uvicorn no está instalado: se omite el servidor ASGI")
+
+    with tempfile.TemporaryDirectory() as data_dir:
+        write_dataset(os.path.join(data_dir, 'db.json'), generate_dataset(PRODUCTS, 50000))
+        print(f"{connections} conexiones keep-alive durante {seconds:.0f} s")
+        for kind in kinds:
+            run(kind, data_dir, connections, seconds)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) == 4 and sys.argv[1] == '--serve':
+        serve(sys.argv[2], int(sys.argv[3]))
+    else:
+        main()
@@ -0,0 +1,66 @@
+"""
+Compara el backend JSON (DataStore) con el backend SQLite.
+
+Uso:
+    python -m benchmarks.bench_storage_backends [productos] [favoritos]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+from benchmarks.datasets import generate_dataset, write_dataset
+from utils.data_store import DataStore
+from utils.sqlite_connection import SQLiteConnection
+from utils.records import Product
+
+
+def _timed(label: str, operation, repeat: int) -> None:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        operation()
+    elapsed = time.perf_counter() - start
+    print(f"  {label:<28} {elapsed / repeat * 1e6:>12.1f} us/op  ({repeat} ops)")
+
+
+def run_backend(name: str, store, products: int, users: int) -> None:
+    rng = random.Random(7)
+    print(f"[{name}]")
+    _timed('get_product', lambda: store.get_product(rng.randint(1, products)), 2000)
+    _timed('get_products_by_category', lambda: store.get_products_by_category('men'), 50)
+    _timed('has_favorite', lambda: store.has_favorite(rng.randint(1, users), rng.randint(1, products)), 2000)
+    _timed('get_user_favorites', lambda: store.get_user_favorites(rng.randint(1, users)), 2000)
+
+    def add_product():
+        product_id = store.next_id('products')
+        store.add_product(Product(product_id, 'bench', 'men', 1.0))
+
+    _timed('next_id + add_product', add_product, 20)
+
+
+def main() -> None:
+    products = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    favorites = int(sys.argv[2]) if len(sys.argv) > 2 else 50000
+    users = 1000
+    data = generate_dataset(products, favorites, users=users)
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        json_path = os.path.join(tmp_dir, 'db.json')
+        write_dataset(json_path, data)
+
+        start = time.perf_counter()
+        json_store = DataStore(json_path)
+        json_store.get_products()
+        print(f"json: carga inicial {time.perf_counter() - start:.3f} s")
+
+        start = time.perf_counter()
+        sqlite_store = SQLiteConnection(os.path.join(tmp_dir, 'db.sqlite3'))
+        sqlite_store.import_json(data)
+        print(f"sqlite: importación {time.perf_counter() - start:.3f} s")
+
+        run_backend('json', json_store, products, users)
+        run_backend('sqlite', sqlite_store, products, users)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,298 @@
+"""
+Suite de benchmarks reproducible para repositorios, servicios y endpoints.
+
+Para cada tamaño genera un db.json sintético (productos y favoritos) y, en
+un subproceso con ese archivo como directorio de trabajo, mide:
+- cada método de ProductRepository, CategoryRepository y FavoriteRepository
+- cada método de ProductService, CategoryService y FavoriteService
+- los endpoints de la app Flask a través de su test client
+
+Los resultados se escriben en JSON junto con el commit medido, para
+comparar dos ejecuciones.
+
+Uso:
+    python -m benchmarks.bench_suite [--sizes 1000,100000,1000000] [--budget 0.5] [--output resultados.json]
+    python -m benchmarks.bench_suite --compare base.json nuevo.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Callable, Dict
+from benchmarks.datasets import generate_dataset, write_dataset
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CREDENTIALS = {'username': 'student', 'password': 'desingp'}
+USERS = 1000
+SEED = 42
+# Una regresión se marca cuando el tiempo medio crece más que este factor
+REGRESSION_RATIO = 1.10
+
+
+def measure(operation: Callable[[], Any], budget: float, min_ops: int = 3, max_ops: int = 20000) -> Dict[str, float]:
+    """
+    Ejecuta una operación hasta agotar el presupuesto de tiempo.
+
+    Args:
+        operation: Función sin argumentos a medir
+        budget: Segundos por benchmark
+        min_ops: Mínimo de ejecuciones aunque se supere el presupuesto
+        max_ops: Máximo de ejecuciones
+
+    Returns:
+        ops, mean_us, p50_us y p99_us
+    """
+    samples = []
+    deadline = time.perf_counter() + budget
+    while len(samples) < max_ops and (len(samples) < min_ops or time.perf_counter() < deadline):
+        start = time.perf_counter()
+        operation()
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return {
+        'ops': len(samples),
+        'mean_us': round(sum(samples) / len(samples) * 1e6, 2),
+        'p50_us': round(samples[len(samples) // 2] * 1e6, 2),
+        'p99_us': round(samples[min(len(samples) - 1, int(len(samples) * 0.99))] * 1e6, 2),
+    }
+
+
+def bench_repositories(size: int, budget: float) -> Dict[str, Dict[str, float]]:
+    from repositories.product_repository import ProductRepository
+    from repositories.category_repository import CategoryRepository
+    from repositories.favorite_repository import FavoriteRepository
+    from utils.records import Favorite, Product
+
+    rng = random.Random(SEED)
+    products, categories, favorites = ProductRepository(), CategoryRepository(), FavoriteRepository()
+    names = [category['name'] for category in categories.get_all()]
+    results = {}
+
+    def add_product():
+        products.add(Product(products.get_next_id(), 'bench', 'men', 1.0))
+
+    def add_remove_category():
+        categories.add({'id': categories.get_next_id(), 'name': 'bench-category'})
+        categories.remove('bench-category')
+
+    def add_remove_favorite():
+        favorite = Favorite(USERS + 1, rng.randint(1, size))
+        favorites.add(favorite)
+        favorites.remove(favorite.user_id, favorite.product_id)
+
+    benchmarks = {
+        'ProductRepository.get_all': products.get_all,
+        'ProductRepository.get_by_id': lambda: products.get_by_id(rng.randint(1, size)),
+        'ProductRepository.get_by_category': lambda: products.get_by_category(rng.choice(names)),
+        'ProductRepository.get_page': lambda: products.get_page(rng.randint(0, size), 50),
+        'ProductRepository.search': lambda: products.search(f'product {rng.randint(1, size)}', 50),
+        'ProductRepository.get_by_price': lambda: products.get_by_price(rng.uniform(1, 400), None, None, 50),
+        'ProductRepository.get_by_ids': lambda: products.get_by_ids([rng.randint(1, size) for _ in range(50)]),
+        'ProductRepository.get_next_id': products.get_next_id,
+        'ProductRepository.add': add_product,
+        'CategoryRepository.get_all': categories.get_all,
+        'CategoryRepository.get_by_id': lambda: categories.get_by_id(rng.randint(1, len(names))),
+        'CategoryRepository.get_by_name': lambda: categories.get_by_name(rng.choice(names)),
+        'CategoryRepository.add+remove': add_remove_category,
+        'FavoriteRepository.get_all': favorites.get_all,
+        'FavoriteRepository.get_by_user': lambda: favorites.get_by_user(rng.randint(1, USERS)),
+        'FavoriteRepository.exists': lambda: favorites.exists(rng.randint(1, USERS), rng.randint(1, size)),
+        'FavoriteRepository.add+remove': add_remove_favorite,
+    }
+    for name, operation in benchmarks.items():
+        results[name] = measure(operation, budget)
+    return results
+
+
+def bench_services(size: int, budget: float) -> Dict[str, Dict[str, float]]:
+    from services.product_service import ProductService
+    from services.category_service import CategoryService
+    from services.favorite_service import FavoriteService
+    from services import stats_service
+
+    rng = random.Random(SEED)
+    products, categories, favorites = ProductService(), CategoryService(), FavoriteService()
+    stats = stats_service.StatsService()
+    names = [category['name'] for category in categories.get_all_categories()]
+    results = {}
+
+    def create_delete_category():
+        categories.create_category('bench-category')
+        categories.delete_category('bench-category')
+
+    def add_remove_favorite():
+        product_id = rng.randint(1, size)
+        favorites.add_favorite(USERS + 1, product_id)
+        favorites.remove_favorite(USERS + 1, product_id)
+
+    def recompute_stats():
+        add_remove_favorite()  # Cambia la versión de favoritos
+        stats.get_stats('50')
+
+    benchmarks = {
+        'ProductService.get_all_products': products.get_all_products,
+        'ProductService.get_product_by_id': lambda: products.get_product_by_id(rng.randint(1, size)),
+        'ProductService.get_products_by_category': lambda: products.get_products_by_category(rng.choice(names)),
+        'ProductService.get_products_page': lambda: products.get_products_page(str(rng.randint(0, size)), '50'),
+        'ProductService.search_products': lambda: products.search_products(f'product {rng.randint(1, size)}', '50'),
+        'ProductService.get_products_by_price': lambda: products.get_products_by_price(str(rng.uniform(1, 400)), None,
+                                                                                       'price', 'men'),
+        'ProductService.create_product': lambda: products.create_product('bench', 'men', 1.0),
+        'CategoryService.get_all_categories': categories.get_all_categories,
+        'CategoryService.get_category_by_id': lambda: categories.get_category_by_id(rng.randint(1, len(names))),
+        'CategoryService.create+delete_category': create_delete_category,
+        'FavoriteService.get_user_favorites': lambda: favorites.get_user_favorites(rng.randint(1, USERS)),
+        'FavoriteService.add+remove_favorite': add_remove_favorite,
+    }
+    if stats_service.np is not None:
+        benchmarks['StatsService.get_stats'] = lambda: stats.get_stats('50')
+        benchmarks['StatsService.add+remove_favorite+get_stats'] = recompute_stats
+    for name, operation in benchmarks.items():
+        results[name] = measure(operation, budget)
+    return results
+
+
+def bench_endpoints(size: int, budget: float) -> Dict[str, Dict[str, float]]:
+    from app import app
+
+    rng = random.Random(SEED)
+    client = app.test_client()
+    headers = {'Authorization': client.post('/auth', json=CREDENTIALS).get_json()['token']}
+    results = {}
+
+    def request(method: str, path: str, expected: int, **kwargs) -> None:
+        response = client.open(path, method=method, headers=headers, **kwargs)
+        if response.status_code != expected:
+            raise RuntimeError(f'{method} {path}: {response.status_code} {response.get_data(as_text=True)[:200]}')
+
+    def add_remove_favorite():
+        body = {'user_id': USERS + 2, 'product_id': rng.randint(1, size)}
+        request('POST', '/favorites', 201, json=body)
+        request('DELETE', '/favorites', 200, json=body)
+
+    benchmarks = {
+        'GET /products/<id>': lambda: request('GET', f'/products/{rng.randint(1, size)}', 200),
+        'GET /products?category=': lambda: request('GET', '/products?category=men', 200),
+        'GET /products?limit=50&cursor=': lambda: request('GET', f'/products?limit=50&cursor={rng.randint(0, size)}', 200),
+        'GET /products?q=': lambda: request('GET', f'/products?q=product+{rng.randint(1, size)}', 200),
+        'GET /products?min_price=&sort=price': lambda: request('GET', f'/products?min_price={rng.randint(1, 400)}&sort=price', 200),
+        'GET /products': lambda: request('GET', '/products', 200),
+        'GET /categories': lambda: request('GET', '/categories', 200),
+        'GET /favorites?user_id=': lambda: request('GET', f'/favorites?user_id={rng.randint(1, USERS)}', 200),
+        'GET /favorites?user_id=&expand=product': lambda: request(
+            'GET', f'/favorites?user_id={rng.randint(1, USERS)}&expand=product', 200),
+        'POST /products': lambda: request('POST', '/products', 201,
+                                          json={'name': 'bench', 'category': 'men', 'price': 1.0}),
+        'POST+DELETE /favorites': add_remove_favorite,
+    }
+    for name, operation in benchmarks.items():
+        results[name] = measure(operation, budget)
+    return results
+
+
+def run_size(size: int, budget: float) -> Dict[str, Any]:
+    """Mide un tamaño en el directorio actual (ejecutado dentro del subproceso)."""
+    start = time.perf_counter()
+    write_dataset('db.json', generate_dataset(size, size, users=USERS, seed=SEED))
+    generated = time.perf_counter() - start
+
+    from repositories.product_repository import ProductRepository
+    start = time.perf_counter()
+    ProductRepository().get_version()
+    loaded = time.perf_counter() - start
+
+    return {
+        'dataset': {'products': size, 'favorites': size, 'users': USERS,
+                    'generate_s': round(generated, 3), 'load_s': round(loaded, 3),
+                    'bytes': os.path.getsize('db.json')},
+        'repository': bench_repositories(size, budget),
+        'service': bench_services(size, budget),
+        'endpoint': bench_endpoints(size, budget),
+    }
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+def run_suite(sizes, budget: float, output: str) -> None:
+    report = {
+        'commit': _git_commit(),
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'budget_s': budget,
+        'sizes': {}
+    }
+    # Se conserva el PYTHONPATH del usuario (dependencias opcionales instaladas aparte)
+    env = dict(os.environ, PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get('PYTHONPATH')])))
+    for size in sizes:
+        print(f'Midiendo {size} productos/favoritos...', file=sys.stderr)
+        with tempfile.TemporaryDirectory() as data_dir:
+            # Un proceso por tamaño: los almacenes y el contenedor son singletons por proceso
+            completed = subprocess.run(
+                [sys.executable, '-m', 'benchmarks.bench_suite', '--run-size', str(size), '--budget', str(budget)],
+                cwd=data_dir, env=env, capture_output=True, text=True)
+            if completed.returncode != 0:
+                raise RuntimeError(f'Falló el tamaño {size}:\n{completed.stderr}')
+            report['sizes'][str(size)] = json.loads(completed.stdout.strip().splitlines()[-1])
+    with open(output, 'w') as output_file:
+        json.dump(report, output_file, indent=2)
+    print(f'Resultados en {output}', file=sys.stderr)
+
+
+def compare(base_path: str, new_path: str) -> int:
+    """
+    Compara el tiempo medio de dos ejecuciones.
+
+    Returns:
+        Cantidad de benchmarks más lentos que REGRESSION_RATIO
+    """
+    with open(base_path) as base_file, open(new_path) as new_file:
+        base, new = json.load(base_file), json.load(new_file)
+    print(f"base {base['commit']}  ->  nuevo {new['commit']}")
+    regressions = 0
+    for size, groups in new['sizes'].items():
+        for group in ('repository', 'service', 'endpoint'):
+            for name, stats in groups.get(group, {}).items():
+                before = base['sizes'].get(size, {}).get(group, {}).get(name)
+                if not before:
+                    continue
+                ratio = stats['mean_us'] / before['mean_us'] if before['mean_us'] else 0.0
+                flag = '  REGRESIÓN' if ratio > REGRESSION_RATIO else ''
+                regressions += bool(flag)
+                print(f"  {size:>8} {group:<10} {name:<42} {before['mean_us']:>12.1f} -> "
+                      f"{stats['mean_us']:>12.1f} us  x{ratio:.2f}{flag}")
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmarks de repositorios, servicios y endpoints')
+    parser.add_argument('--sizes', default='1000,100000,1000000',
+                        help='Tamaños de dataset separados por coma')
+    parser.add_argument('--budget', type=float, default=0.5, help='Segundos por benchmark')
+    parser.add_argument('--output', default='benchmark-results.json')
+    parser.add_argument('--compare', nargs=2, metavar=('BASE', 'NUEVO'))
+    parser.add_argument('--run-size', type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run_size:
+        print(json.dumps(run_size(args.run_size, args.budget)))
+    elif args.compare:
+        sys.exit(1 if compare(*args.compare) else 0)
+    else:
+        run_suite([int(size) for size in args.sizes.split(',')], args.budget, os.path.abspath(args.output))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,52 @@
+"""
+Generación de datos sintéticos con el formato de db.json para benchmarks.
+"""
+
+import json
+import random
+from typing import Dict, Any
+
+CATEGORIES = ['men', 'women', 'kids', 'girls', 'accessories', 'shoes', 'sports', 'home']
+
+
+def generate_dataset(products: int, favorites: int, users: int = 1000, seed: int = 42) -> Dict[str, Any]:
+    """
+    Genera un documento reproducible con productos, categorías y favoritos.
+
+    Args:
+        products: Cantidad de productos
+        favorites: Cantidad de favoritos (pares usuario/producto únicos)
+        users: Cantidad de usuarios distintos
+        seed: Semilla del generador aleatorio
+
+    Returns:
+        Documento con las colecciones products, categories y favorites
+    """
+    rng = random.Random(seed)
+    data = {
+        'products': [
+            {
+                'id': product_id,
+                'name': f'Product {product_id}',
+                'price': round(rng.uniform(1, 500), 2),
+                'category': rng.choice(CATEGORIES)
+            }
+            for product_id in range(1, products + 1)
+        ],
+        'categories': [{'id': i, 'name': name} for i, name in enumerate(CATEGORIES, start=1)],
+        'favorites': []
+    }
+    favorites = min(favorites, users * products)
+    seen = set()
+    while len(seen) < favorites:
+        pair = (rng.randint(1, users), rng.randint(1, products))
+        if pair not in seen:
+            seen.add(pair)
+            data['favorites'].append({'user_id': pair[0], 'product_id': pair[1]})
+    return data
+
+
+def write_dataset(path: str, data: Dict[str, Any]) -> None:
+    """Escribe el documento en disco con el mismo formato que db.json."""
+    with open(path, 'w') as json_file:
+        json.dump(data, json_file, indent=4)
@@ -0,0 +1,73 @@
+"""
+Contenedor de la aplicación usando Singleton Pattern.
+Construye una sola vez por proceso los repositorios, servicios y parsers
+de argumentos, y los entrega a los resources mediante resource_class_kwargs,
+así cada petición solo crea el objeto Resource.
+"""
+
+from typing import Any, Dict
+from flask_restful import reqparse
+from repositories.product_repository import ProductRepository
+from repositories.category_repository import CategoryRepository
+from repositories.favorite_repository import FavoriteRepository
+from services.product_service import ProductService
+from services.category_service import CategoryService
+from services.favorite_service import FavoriteService
+from services.stats_service import StatsService
+
+
+def _build_parser(*arguments) -> reqparse.RequestParser:
+    """Crea un RequestParser con argumentos requeridos (nombre, tipo, ayuda)."""
+    parser = reqparse.RequestParser()
+    for name, arg_type, help_text in arguments:
+        parser.add_argument(name, type=arg_type, required=True, help=help_text)
+    return parser
+
+
+class AppContainer:
+    """
+    Singleton con las dependencias compartidas de la aplicación.
+    Los servicios no guardan estado por petición, por lo que una sola
+    instancia atiende a todos los hilos.
+    """
+    _instance = None
+    _initialized = False
+
+    def __new__(cls, db_file: str = 'db.json'):
+        if cls._instance is None:
+            cls._instance = super(AppContainer, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self, db_file: str = 'db.json'):
+        if not self._initialized:
+            # Repositorios y servicios
+            product_repository = ProductRepository(db_file)
+            category_repository = CategoryRepository(db_file)
+            favorite_repository = FavoriteRepository(db_file)
+            self.product_service = ProductService(product_repository, category_repository)
+            self.category_service = CategoryService(category_repository)
+            self.favorite_service = FavoriteService(favorite_repository, product_repository)
+            self.stats_service = StatsService(product_repository, favorite_repository)
+            # Parsers ya configurados; parse_args no modifica el parser
+            self.product_parser = _build_parser(
+                ('name', str, 'Name of the product is required'),
+                ('category', str, 'Category of the product is required'),
+                ('price', float, 'Price of the product is required'))
+            self.category_parser = _build_parser(
+                ('name', str, 'Name of the category is required'))
+            self.favorite_parser = _build_parser(
+                ('user_id', int, 'User ID is required'),
+                ('product_id', int, 'Product ID is required'))
+            self._initialized = True
+
+    def products(self) -> Dict[str, Any]:
+        """Argumentos de construcción para ProductsResource."""
+        return {'service': self.product_service, 'parser': self.product_parser}
+
+    def categories(self) -> Dict[str, Any]:
+        """Argumentos de construcción para CategoriesResource."""
+        return {'service': self.category_service, 'parser': self.category_parser}
+
+    def favorites(self) -> Dict[str, Any]:
+        """Argumentos de construcción para FavoritesResource."""
+        return {'service': self.favorite_service, 'parser': self.favorite_parser}
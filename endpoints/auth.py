@@ -6,6 +6,7 @@ Utiliza la configuración centralizada.
 from flask_restful import Resource
 from flask import request
 from utils.auth.auth_config import AuthConfig
+from utils.auth.token_service import TokenService
 
 
 class AuthenticationResource(Resource):
@@ -17,6 +18,7 @@ class AuthenticationResource(Resource):
     def __init__(self):
         """Inicializa el resource con la configuración de autenticación."""
         self.auth_config = AuthConfig()
+        self.tokens = TokenService()
     
     def post(self):
         """
@@ -27,7 +29,7 @@ class AuthenticationResource(Resource):
             password: Contraseña
             
         Returns:
-            200: Token de autenticación
+            200: Token firmado y su duración en segundos (expires_in)
             400: Datos inválidos
             401: Credenciales incorrectas
         """
@@ -47,9 +49,34 @@ class AuthenticationResource(Resource):
             
             # Validar credenciales
             if self.auth_config.validate_credentials(username, password):
-                return {'token': self.auth_config.VALID_TOKEN}, 200
+                return {
+                    'token': self.tokens.issue(username),
+                    'expires_in': self.auth_config.TOKEN_TTL
+                }, 200
             else:
                 return {'message': 'Unauthorized: invalid credentials'}, 401
                 
         except Exception as e:
-            return {'message': f'Internal server error: {str(e)}'}, 500
\ No newline at end of file
+            return {'message': f'Internal server error: {str(e)}'}, 500
+    
+    def delete(self):
+        """
+        Revoca el token enviado en el header Authorization (cierre de sesión).
+        
+        Returns:
+            200: Token revocado
+            401: Token ausente, inválido o no revocable (token estático)
+        """
+        try:
+            token = request.headers.get('Authorization')
+            
+            if not token:
+                return {'message': 'Unauthorized: access token not found'}, 401
+            
+            if not self.tokens.revoke(token):
+                return {'message': 'Unauthorized: invalid token'}, 401
+            
+            return {'message': 'Token revoked successfully'}, 200
+                
+        except Exception as e:
+            return {'message': f'Internal server error: {str(e)}'}, 500
@@ -0,0 +1,23 @@
+"""
+Endpoint de estadísticas de la caché de respuestas.
+"""
+
+from flask_restful import Resource
+from utils.auth.auth_decorator import token_required
+from utils.response_cache import ResponseCache
+
+
+class CacheStatsResource(Resource):
+    """
+    Resource que expone los contadores de aciertos y fallos de la caché.
+    """
+    
+    @token_required
+    def get(self):
+        """
+        Obtiene las estadísticas de la caché de respuestas.
+        
+        Returns:
+            200: hits, misses, hit_ratio, entries y bytes
+        """
+        return ResponseCache().stats(), 200
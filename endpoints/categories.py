@@ -3,9 +3,15 @@ Endpoint de categorías refactorizado.
 Utiliza Service Layer, Repository Pattern y Decorator Pattern.
 """
 
+from typing import Optional
 from flask_restful import Resource, reqparse
+from flask import request
 from utils.auth.auth_decorator import token_required
+from utils.http_cache import conditional_get
+from utils.response_cache import cached_response
 from services.category_service import CategoryService
+from container import AppContainer
+from utils.pagination import parse_fields, project, project_all, wants_ndjson, ndjson_response
 
 
 class CategoriesResource(Resource):
@@ -14,12 +20,21 @@ class CategoriesResource(Resource):
     Ahora con separación de responsabilidades y código más limpio.
     """
     
-    def __init__(self):
-        """Inicializa el resource con su servicio."""
-        self.service = CategoryService()
-        self.parser = reqparse.RequestParser()
+    def __init__(self, service: Optional[CategoryService] = None,
+                 parser: Optional[reqparse.RequestParser] = None):
+        """
+        Inicializa el resource con las dependencias inyectadas por el contenedor.
+        
+        Args:
+            service: Servicio compartido; por defecto el del contenedor
+            parser: Parser de argumentos ya configurado; por defecto el del contenedor
+        """
+        self.service = service or AppContainer().category_service
+        self.parser = parser or AppContainer().category_parser
     
     @token_required
+    @conditional_get('categories')
+    @cached_response('categories')
     def get(self, category_id=None):
         """
         Obtiene categorías.
@@ -27,21 +42,42 @@ class CategoriesResource(Resource):
         Args:
             category_id: ID de la categoría (opcional)
             
+        Query params:
+            cursor: Cursor de la página anterior (opcional)
+            limit: Tamaño de página (opcional)
+            fields: Campos a incluir separados por coma (opcional)
+            format: 'ndjson' para exportar en streaming (opcional)
+            
         Returns:
             - Si category_id: categoría específica o 404
+            - Si cursor o limit: página de categorías con 'next_cursor'
+            - Si format=ndjson: todas las categorías, una por línea
             - Sin parámetros: todas las categorías
         """
         try:
+            fields = parse_fields(request.args.get('fields'))
+            
             # Categoría específica por ID
             if category_id is not None:
                 category = self.service.get_category_by_id(category_id)
                 if category:
-                    return category, 200
+                    return project(category, fields), 200
                 else:
                     return {'message': 'Category not found'}, 404
             
+            # Exportación completa en streaming
+            if wants_ndjson(request):
+                return ndjson_response(self.service.iter_categories(), fields)
+            
+            # Página de categorías
+            if 'cursor' in request.args or 'limit' in request.args:
+                page = self.service.get_categories_page(request.args.get('cursor'),
+                                                        request.args.get('limit'))
+                page['items'] = project_all(page['items'], fields)
+                return page, 200
+            
             # Todas las categorías
-            return self.service.get_all_categories(), 200
+            return project_all(self.service.get_all_categories(), fields), 200
             
         except ValueError as e:
             return {'message': str(e)}, 400
@@ -61,10 +97,6 @@ class CategoriesResource(Resource):
             400: Datos inválidos o categoría ya existe
         """
         try:
-            # Configurar parser
-            self.parser.add_argument('name', type=str, required=True, 
-                                    help='Name of the category is required')
-            
             args = self.parser.parse_args()
             
             # Crear categoría usando el servicio
@@ -88,22 +120,22 @@ class CategoriesResource(Resource):
         Body:
             name: Nombre de la categoría a eliminar (requerido)
             
+        Query params:
+            cascade: 'true' para eliminar también sus productos (opcional)
+            
         Returns:
-            200: Categoría eliminada exitosamente
-            400: Datos inválidos
+            200: Categoría eliminada exitosamente, con 'products_removed'
+            400: Datos inválidos o la categoría tiene productos sin cascade
             404: Categoría no encontrada
         """
         try:
-            # Configurar parser
-            self.parser.add_argument('name', type=str, required=True, 
-                                    help='Name of the category is required')
-            
             args = self.parser.parse_args()
             
             # Eliminar categoría usando el servicio
-            self.service.delete_category(name=args['name'])
+            removed = self.service.delete_category(name=args['name'],
+                                                   cascade=request.args.get('cascade'))
             
-            return {'message': 'Category removed successfully'}, 200
+            return {'message': 'Category removed successfully', 'products_removed': removed}, 200
             
         except ValueError as e:
             # Si la categoría no existe, retornar 404
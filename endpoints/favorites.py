@@ -3,9 +3,15 @@ Endpoint de favoritos refactorizado.
 Utiliza Service Layer, Repository Pattern y Decorator Pattern.
 """
 
+from typing import Optional
 from flask_restful import Resource, reqparse
+from flask import request
 from utils.auth.auth_decorator import token_required
+from utils.response_cache import cached_response
+from utils.bulk import read_bulk_items, bulk_response
 from services.favorite_service import FavoriteService
+from container import AppContainer
+from utils.records import as_dict, as_dicts
 
 
 class FavoritesResource(Resource):
@@ -14,21 +20,31 @@ class FavoritesResource(Resource):
     Ahora con separación de responsabilidades y código más limpio.
     """
     
-    def __init__(self):
-        """Inicializa el resource con su servicio."""
-        self.service = FavoriteService()
-        self.parser = reqparse.RequestParser()
+    def __init__(self, service: Optional[FavoriteService] = None,
+                 parser: Optional[reqparse.RequestParser] = None):
+        """
+        Inicializa el resource con las dependencias inyectadas por el contenedor.
+        
+        Args:
+            service: Servicio compartido; por defecto el del contenedor
+            parser: Parser de argumentos ya configurado; por defecto el del contenedor
+        """
+        self.service = service or AppContainer().favorite_service
+        self.parser = parser or AppContainer().favorite_parser
     
     @token_required
+    @cached_response('favorites')
     def get(self):
         """
         Obtiene todos los favoritos.
         
         Query params:
             user_id: Filtrar por usuario (opcional)
+            expand: 'product' para incluir los datos de cada producto (opcional)
             
         Returns:
             200: Lista de favoritos
+            400: Parámetros inválidos
         """
         try:
             # Filtro opcional por usuario
@@ -39,7 +55,12 @@ class FavoritesResource(Resource):
             else:
                 favorites = self.service.get_all_favorites()
             
-            return favorites, 200
+            # Productos embebidos en la misma respuesta (evita N peticiones GET /products/<id>)
+            expand = request.args.get('expand')
+            if expand is not None:
+                return self.service.expand_favorites(favorites, expand), 200
+            
+            return as_dicts(favorites), 200
             
         except ValueError as e:
             return {'message': str(e)}, 400
@@ -57,15 +78,9 @@ class FavoritesResource(Resource):
             
         Returns:
             201: Favorito agregado exitosamente
-            400: Datos inválidos o favorito ya existe
+            400: Datos inválidos, producto inexistente o favorito ya existe
         """
         try:
-            # Configurar parser
-            self.parser.add_argument('user_id', type=int, required=True, 
-                                    help='User ID is required')
-            self.parser.add_argument('product_id', type=int, required=True, 
-                                    help='Product ID is required')
-            
             args = self.parser.parse_args()
             
             # Agregar favorito usando el servicio
@@ -76,7 +91,7 @@ class FavoritesResource(Resource):
             
             return {
                 'message': 'Product added to favorites',
-                'favorite': new_favorite
+                'favorite': as_dict(new_favorite)
             }, 201
             
         except ValueError as e:
@@ -99,12 +114,6 @@ class FavoritesResource(Resource):
             404: Favorito no encontrado
         """
         try:
-            # Configurar parser
-            self.parser.add_argument('user_id', type=int, required=True, 
-                                    help='User ID is required')
-            self.parser.add_argument('product_id', type=int, required=True, 
-                                    help='Product ID is required')
-            
             args = self.parser.parse_args()
             
             # Eliminar favorito usando el servicio
@@ -121,4 +130,37 @@ class FavoritesResource(Resource):
                 return {'message': str(e)}, 404
             return {'message': str(e)}, 400
         except Exception as e:
-            return {'message': f'Internal server error: {str(e)}'}, 500
\ No newline at end of file
+            return {'message': f'Internal server error: {str(e)}'}, 500
+
+
+class FavoritesBulkResource(Resource):
+    """
+    Resource para la carga masiva de favoritos.
+    """
+    
+    def __init__(self, service: Optional[FavoriteService] = None):
+        """Inicializa el resource con su servicio."""
+        self.service = service or AppContainer().favorite_service
+    
+    @token_required
+    def post(self):
+        """
+        Agrega varios favoritos con una sola escritura.
+        
+        Body:
+            Arreglo JSON o NDJSON (Content-Type: application/x-ndjson) de
+            objetos con user_id y product_id
+            
+        Returns:
+            201: Todos los favoritos agregados
+            207: Algunos favoritos con errores (ver 'results')
+            400: Cuerpo inválido o ningún favorito válido
+        """
+        try:
+            items = read_bulk_items(request)
+            return bulk_response(self.service.add_favorites(items))
+            
+        except ValueError as e:
+            return {'message': str(e)}, 400
+        except Exception as e:
+            return {'message': f'Internal server error: {str(e)}'}, 500
@@ -0,0 +1,26 @@
+"""
+Endpoint de métricas en formato de texto de Prometheus.
+"""
+
+from flask_restful import Resource
+from flask import Response
+from utils.auth.auth_decorator import token_required
+from utils.metrics import Metrics, PROMETHEUS_MIMETYPE
+
+
+class MetricsResource(Resource):
+    """
+    Resource que expone los histogramas de tiempos por endpoint y por capa.
+    Solo se registra cuando METRICS_ENABLED está activo y requiere token.
+    """
+    
+    @token_required
+    def get(self):
+        """
+        Obtiene las métricas del proceso.
+        
+        Returns:
+            200: Histogramas y contadores en formato de texto de Prometheus
+            401: Token faltante o inválido
+        """
+        return Response(Metrics().render(), content_type=PROMETHEUS_MIMETYPE)
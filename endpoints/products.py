@@ -3,10 +3,18 @@ Endpoint de productos refactorizado.
 Utiliza Service Layer, Repository Pattern y Decorator Pattern.
 """
 
+from typing import Optional
 from flask_restful import Resource, reqparse
 from flask import request
 from utils.auth.auth_decorator import token_required
+from utils.http_cache import conditional_get
+from utils.response_cache import cached_response
 from services.product_service import ProductService
+from container import AppContainer
+from utils.bulk import read_bulk_items, bulk_response
+from utils.pagination import (parse_fields, project, project_all, wants_ndjson, ndjson_response,
+                              PRICE_PARAMS)
+from utils.records import as_dict
 
 
 class ProductsResource(Resource):
@@ -15,12 +23,21 @@ class ProductsResource(Resource):
     Ahora con separación de responsabilidades y código más limpio.
     """
     
-    def __init__(self):
-        """Inicializa el resource con su servicio."""
-        self.service = ProductService()
-        self.parser = reqparse.RequestParser()
+    def __init__(self, service: Optional[ProductService] = None,
+                 parser: Optional[reqparse.RequestParser] = None):
+        """
+        Inicializa el resource con las dependencias inyectadas por el contenedor.
+        
+        Args:
+            service: Servicio compartido; por defecto el del contenedor
+            parser: Parser de argumentos ya configurado; por defecto el del contenedor
+        """
+        self.service = service or AppContainer().product_service
+        self.parser = parser or AppContainer().product_parser
     
     @token_required
+    @conditional_get('products')
+    @cached_response('products')
     def get(self, product_id=None):
         """
         Obtiene productos.
@@ -29,30 +46,80 @@ class ProductsResource(Resource):
             product_id: ID del producto (opcional)
             
         Query params:
+            ids: IDs separados por coma para obtener varios productos (opcional)
+            q: Buscar por nombre, ordenado por relevancia (opcional)
             category: Filtrar por categoría (opcional)
+            min_price, max_price: Rango de precios inclusive (opcional)
+            sort: 'price' para ordenar por precio (opcional)
+            cursor: Cursor de la página anterior (opcional)
+            limit: Tamaño de página (opcional)
+            fields: Campos a incluir separados por coma (opcional)
+            format: 'ndjson' para exportar en streaming (opcional)
             
         Returns:
             - Si product_id: producto específico o 404
+            - Si ids: los productos existentes de la lista, en el orden pedido
+            - Si q: hasta limit productos que coinciden, los más relevantes primero
+            - Si min_price, max_price o sort: página de productos ordenada por precio,
+              combinable con category
             - Si category: productos de esa categoría
+            - Si cursor o limit: página de productos con 'next_cursor'
+            - Si format=ndjson: todos los productos, uno por línea
             - Sin parámetros: todos los productos
         """
         try:
+            fields = parse_fields(request.args.get('fields'))
+            
+            # Varios productos por ID en una sola consulta
+            if 'ids' in request.args and product_id is None:
+                products = self.service.get_products_by_ids(request.args.get('ids'))
+                return project_all(products, fields), 200
+            
+            # Búsqueda por nombre (combinable con category)
+            query = request.args.get('q')
+            if query is not None and product_id is None:
+                products = self.service.search_products(query, request.args.get('limit'),
+                                                        request.args.get('category'))
+                return project_all(products, fields), 200
+            
+            # Rango y orden por precio (combinable con category)
+            if product_id is None and any(name in request.args for name in PRICE_PARAMS):
+                page = self.service.get_products_by_price(request.args.get('min_price'),
+                                                         request.args.get('max_price'),
+                                                         request.args.get('sort'),
+                                                         request.args.get('category'),
+                                                         request.args.get('cursor'),
+                                                         request.args.get('limit'))
+                page['items'] = project_all(page['items'], fields)
+                return page, 200
+            
             # Filtro por categoría
             category_filter = request.args.get('category')
             if category_filter:
                 products = self.service.get_products_by_category(category_filter)
-                return products, 200
+                return project_all(products, fields), 200
             
             # Producto específico por ID
             if product_id is not None:
                 product = self.service.get_product_by_id(product_id)
                 if product:
-                    return product, 200
+                    return project(product, fields), 200
                 else:
                     return {'message': 'Product not found'}, 404
             
+            # Exportación completa en streaming
+            if wants_ndjson(request):
+                return ndjson_response(self.service.iter_products(), fields)
+            
+            # Página de productos
+            if 'cursor' in request.args or 'limit' in request.args:
+                page = self.service.get_products_page(request.args.get('cursor'),
+                                                      request.args.get('limit'))
+                page['items'] = project_all(page['items'], fields)
+                return page, 200
+            
             # Todos los productos
-            return self.service.get_all_products(), 200
+            return project_all(self.service.get_all_products(), fields), 200
             
         except ValueError as e:
             return {'message': str(e)}, 400
@@ -66,22 +133,14 @@ class ProductsResource(Resource):
         
         Body:
             name: Nombre del producto (requerido)
-            category: Categoría del producto (requerido)
+            category: Categoría del producto; debe existir (requerido)
             price: Precio del producto (requerido)
             
         Returns:
             201: Producto creado exitosamente
-            400: Datos inválidos
+            400: Datos inválidos o categoría inexistente
         """
         try:
-            # Configurar parser
-            self.parser.add_argument('name', type=str, required=True, 
-                                    help='Name of the product is required')
-            self.parser.add_argument('category', type=str, required=True, 
-                                    help='Category of the product is required')
-            self.parser.add_argument('price', type=float, required=True, 
-                                    help='Price of the product is required')
-            
             args = self.parser.parse_args()
             
             # Crear producto usando el servicio
@@ -93,10 +152,43 @@ class ProductsResource(Resource):
             
             return {
                 'message': 'Product added successfully',
-                'product': new_product
+                'product': as_dict(new_product)
             }, 201
             
         except ValueError as e:
             return {'message': str(e)}, 400
         except Exception as e:
-            return {'message': f'Internal server error: {str(e)}'}, 500
\ No newline at end of file
+            return {'message': f'Internal server error: {str(e)}'}, 500
+
+
+class ProductsBulkResource(Resource):
+    """
+    Resource para la carga masiva de productos.
+    """
+    
+    def __init__(self, service: Optional[ProductService] = None):
+        """Inicializa el resource con su servicio."""
+        self.service = service or AppContainer().product_service
+    
+    @token_required
+    def post(self):
+        """
+        Crea varios productos con una sola escritura.
+        
+        Body:
+            Arreglo JSON o NDJSON (Content-Type: application/x-ndjson) de
+            objetos con name, category y price
+            
+        Returns:
+            201: Todos los productos creados
+            207: Algunos productos con errores (ver 'results')
+            400: Cuerpo inválido o ningún producto válido
+        """
+        try:
+            items = read_bulk_items(request)
+            return bulk_response(self.service.create_products(items))
+            
+        except ValueError as e:
+            return {'message': str(e)}, 400
+        except Exception as e:
+            return {'message': f'Internal server error: {str(e)}'}, 500
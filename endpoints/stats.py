@@ -0,0 +1,48 @@
+"""
+Endpoint de estadísticas del catálogo.
+Utiliza Service Layer y Decorator Pattern.
+"""
+
+from typing import Optional
+from flask_restful import Resource
+from flask import request
+from utils.auth.auth_decorator import token_required
+from utils.http_cache import conditional_get
+from utils.response_cache import cached_response
+from services.stats_service import StatsService, StatsUnavailableError
+from container import AppContainer
+
+
+class StatsResource(Resource):
+    """
+    Resource con estadísticas de precios por categoría y de favoritos.
+    """
+    
+    def __init__(self, service: Optional[StatsService] = None):
+        """Inicializa el resource con su servicio."""
+        self.service = service or AppContainer().stats_service
+    
+    @token_required
+    @conditional_get('stats')
+    @cached_response('stats')
+    def get(self):
+        """
+        Obtiene las estadísticas del catálogo.
+        
+        Query params:
+            limit: Productos en el ranking de favoritos (opcional, por defecto 50)
+            
+        Returns:
+            200: products, categories y favorites
+            400: Parámetros inválidos
+            501: NumPy no está instalado
+        """
+        try:
+            return self.service.get_stats(request.args.get('limit')), 200
+            
+        except ValueError as e:
+            return {'message': str(e)}, 400
+        except StatsUnavailableError as e:
+            return {'message': str(e)}, 501
+        except Exception as e:
+            return {'message': f'Internal server error: {str(e)}'}, 500
@@ -3,10 +3,14 @@ Repository Pattern para gestión de categorías.
 Separa la lógica de acceso a datos de la lógica de negocio.
 """
 
-from typing import List, Optional, Dict, Any
-from utils.database_connection import DatabaseConnection
+from typing import Iterator, List, Optional, Dict, Any, Tuple
+from utils.connection_factory import ConnectionFactory
+from utils.integrity import IntegrityError
+from utils.metrics import instrument
+from utils.pagination import iter_by_id
 
 
+@instrument('repository')
 class CategoryRepository:
     """
     Repositorio para operaciones CRUD de categorías.
@@ -15,13 +19,12 @@ class CategoryRepository:
     
     def __init__(self, db_file: str = 'db.json'):
         """
-        Inicializa el repositorio con conexión a base de datos.
+        Inicializa el repositorio con el almacén de datos configurado.
         
         Args:
             db_file: Ruta al archivo de base de datos JSON
         """
-        self.db = DatabaseConnection(db_file)
-        self.db.connect()
+        self.db = ConnectionFactory.create(db_file)
     
     def get_all(self) -> List[Dict[str, Any]]:
         """
@@ -35,6 +38,46 @@ class CategoryRepository:
         except Exception as e:
             raise Exception(f"Error al obtener categorías: {str(e)}")
     
+    def get_version(self) -> Tuple[str, float]:
+        """
+        Obtiene la versión de las categorías sin leer sus datos.
+        
+        Returns:
+            Tupla (etiqueta de versión, timestamp de la última modificación)
+        """
+        try:
+            return self.db.get_version('categories')
+        except Exception as e:
+            raise Exception(f"Error al obtener versión: {str(e)}")
+    
+    def get_page(self, after_id: Optional[int], limit: int) -> List[Dict[str, Any]]:
+        """
+        Obtiene una página de categorías ordenadas por ID.
+        
+        Args:
+            after_id: Último ID entregado en la página anterior (None para la primera)
+            limit: Cantidad máxima de registros
+            
+        Returns:
+            Lista de categorías con ID mayor a after_id
+        """
+        try:
+            return self.db.get_categories_page(after_id, limit)
+        except Exception as e:
+            raise Exception(f"Error al paginar categorías: {str(e)}")
+    
+    def iter_all(self, batch_size: int = 500) -> Iterator[Dict[str, Any]]:
+        """
+        Recorre todas las categorías por páginas, sin copiar la colección completa.
+        
+        Args:
+            batch_size: Registros leídos del almacén por página
+            
+        Returns:
+            Generador de categorías
+        """
+        return iter_by_id(self.get_page, batch_size)
+    
     def get_by_id(self, category_id: int) -> Optional[Dict[str, Any]]:
         """
         Busca una categoría por ID.
@@ -46,8 +89,7 @@ class CategoryRepository:
             Categoría encontrada o None
         """
         try:
-            categories = self.get_all()
-            return next((c for c in categories if c['id'] == category_id), None)
+            return self.db.get_category(category_id)
         except Exception as e:
             raise Exception(f"Error al buscar categoría: {str(e)}")
     
@@ -62,8 +104,7 @@ class CategoryRepository:
             Categoría encontrada o None
         """
         try:
-            categories = self.get_all()
-            return next((c for c in categories if c.get('name', '').lower() == name.lower()), None)
+            return self.db.get_category_by_name(name)
         except Exception as e:
             raise Exception(f"Error al buscar categoría por nombre: {str(e)}")
     
@@ -83,31 +124,35 @@ class CategoryRepository:
         except Exception as e:
             raise Exception(f"Error al agregar categoría: {str(e)}")
     
-    def remove(self, name: str) -> bool:
+    def remove(self, name: str, cascade: bool = False) -> int:
         """
-        Elimina una categoría por nombre.
+        Elimina una categoría por nombre, verificando sus productos en la misma operación.
         
         Args:
             name: Nombre de la categoría a eliminar
+            cascade: Eliminar también sus productos
             
         Returns:
-            True si se eliminó exitosamente
+            Cantidad de productos eliminados
+            
+        Raises:
+            IntegrityError: Si la categoría no existe o tiene productos sin cascade
         """
         try:
-            self.db.remove_category(name)
-            return True
+            return self.db.remove_category(name, cascade)
+        except IntegrityError:
+            raise
         except Exception as e:
             raise Exception(f"Error al eliminar categoría: {str(e)}")
     
     def get_next_id(self) -> int:
         """
-        Calcula el siguiente ID disponible.
+        Reserva el siguiente ID disponible.
         
         Returns:
             Siguiente ID a utilizar
         """
         try:
-            categories = self.get_all()
-            return len(categories) + 1
-        except Exception:
-            return 1
\ No newline at end of file
+            return self.db.next_id('categories')
+        except Exception as e:
+            raise Exception(f"Error al reservar ID: {str(e)}")
\ No newline at end of file
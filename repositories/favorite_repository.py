@@ -3,27 +3,42 @@ Repository Pattern para gestión de favoritos.
 Separa la lógica de acceso a datos de la lógica de negocio.
 """
 
-from typing import List, Dict, Any
-from utils.database_connection import DatabaseConnection
+from array import array
+from typing import Iterable, List, Tuple
+from utils.connection_factory import ConnectionFactory
+from utils.metrics import instrument
+from utils.group_commit import GroupCommitQueue
+from utils.integrity import IntegrityError
+from utils.storage_config import StorageConfig
+from utils.records import Favorite
 
 
+@instrument('repository')
 class FavoriteRepository:
     """
     Repositorio para operaciones CRUD de favoritos.
     Encapsula toda la lógica de acceso a datos.
     """
     
-    def __init__(self, db_file: str = 'favorites.json'):
+    def __init__(self, db_file: str = 'db.json'):
         """
-        Inicializa el repositorio con conexión a base de datos.
+        Inicializa el repositorio con el almacén de datos configurado.
         
         Args:
             db_file: Ruta al archivo de base de datos JSON
         """
-        self.db = DatabaseConnection(db_file)
-        self.db.connect()
+        self.db = ConnectionFactory.create(db_file)
+        config = StorageConfig()
+        self.write_queue = None
+        if config.GROUP_COMMIT_ENABLED:
+            # Una cola por almacén: el almacén es un singleton por archivo
+            self.write_queue = GroupCommitQueue(
+                f'favorites-{id(self.db)}', self.db.apply_favorite_changes,
+                batch_size=config.GROUP_COMMIT_BATCH_SIZE,
+                max_delay_ms=config.GROUP_COMMIT_MAX_DELAY_MS,
+                max_depth=config.GROUP_COMMIT_QUEUE_DEPTH)
     
-    def get_all(self) -> List[Dict[str, Any]]:
+    def get_all(self) -> Iterable[Favorite]:
         """
         Obtiene todos los favoritos.
         
@@ -35,7 +50,31 @@ class FavoriteRepository:
         except Exception as e:
             raise Exception(f"Error al obtener favoritos: {str(e)}")
     
-    def get_by_user(self, user_id: int) -> List[Dict[str, Any]]:
+    def get_version(self) -> Tuple[str, float]:
+        """
+        Obtiene la versión de los favoritos sin leer sus datos.
+        
+        Returns:
+            Tupla (etiqueta de versión, timestamp de la última modificación)
+        """
+        try:
+            return self.db.get_version('favorites')
+        except Exception as e:
+            raise Exception(f"Error al obtener versión: {str(e)}")
+    
+    def get_product_ids(self) -> array:
+        """
+        Obtiene el ID de producto de cada favorito, sin pares repetidos.
+        
+        Returns:
+            Arreglo de IDs de producto, uno por favorito
+        """
+        try:
+            return self.db.get_favorite_product_ids()
+        except Exception as e:
+            raise Exception(f"Error al obtener favoritos: {str(e)}")
+    
+    def get_by_user(self, user_id: int) -> List[Favorite]:
         """
         Obtiene favoritos de un usuario específico.
         
@@ -46,12 +85,11 @@ class FavoriteRepository:
             Lista de favoritos del usuario
         """
         try:
-            favorites = self.get_all()
-            return [f for f in favorites if f.get('user_id') == user_id]
+            return self.db.get_user_favorites(user_id)
         except Exception as e:
             raise Exception(f"Error al obtener favoritos del usuario: {str(e)}")
     
-    def add(self, favorite: Dict[str, Any]) -> Dict[str, Any]:
+    def add(self, favorite: Favorite) -> Favorite:
         """
         Agrega un nuevo favorito.
         
@@ -60,13 +98,43 @@ class FavoriteRepository:
             
         Returns:
             Favorito agregado
+            
+        Raises:
+            IntegrityError: Si el producto no existe
         """
         try:
-            self.db.add_favorite(favorite)
+            if self.write_queue is not None:
+                self.write_queue.submit(('add', favorite))
+            else:
+                self.db.add_favorite(favorite)
             return favorite
+        except IntegrityError:
+            raise
         except Exception as e:
             raise Exception(f"Error al agregar favorito: {str(e)}")
     
+    def add_many(self, favorites: List[Favorite]) -> List[Favorite]:
+        """
+        Agrega varios favoritos con una sola escritura.
+        
+        Args:
+            favorites: Favoritos a agregar (user_id, product_id)
+            
+        Returns:
+            Favoritos agregados
+            
+        Raises:
+            IntegrityError: Si algún producto no existe (no se agrega ninguno)
+        """
+        try:
+            if favorites:
+                self.db.add_favorites(favorites)
+            return favorites
+        except IntegrityError:
+            raise
+        except Exception as e:
+            raise Exception(f"Error al agregar favoritos: {str(e)}")
+    
     def remove(self, user_id: int, product_id: int) -> bool:
         """
         Elimina un favorito específico.
@@ -79,12 +147,10 @@ class FavoriteRepository:
             True si se eliminó exitosamente
         """
         try:
-            favorites = self.get_all()
-            updated_favorites = [
-                f for f in favorites 
-                if not (f.get('user_id') == user_id and f.get('product_id') == product_id)
-            ]
-            self.db.save_favorites(updated_favorites)
+            if self.write_queue is not None:
+                self.write_queue.submit(('remove', Favorite(user_id, product_id)))
+            else:
+                self.db.remove_favorite(user_id, product_id)
             return True
         except Exception as e:
             raise Exception(f"Error al eliminar favorito: {str(e)}")
@@ -101,10 +167,6 @@ class FavoriteRepository:
             True si el favorito existe
         """
         try:
-            favorites = self.get_all()
-            return any(
-                f.get('user_id') == user_id and f.get('product_id') == product_id 
-                for f in favorites
-            )
+            return self.db.has_favorite(user_id, product_id)
         except Exception as e:
             raise Exception(f"Error al verificar existencia de favorito: {str(e)}")
\ No newline at end of file
@@ -3,10 +3,15 @@ Repository Pattern para gestión de productos.
 Separa la lógica de acceso a datos de la lógica de negocio.
 """
 
-from typing import List, Optional, Dict, Any
-from utils.database_connection import DatabaseConnection
+from typing import Iterator, List, Optional, Tuple
+from utils.connection_factory import ConnectionFactory
+from utils.integrity import IntegrityError
+from utils.metrics import instrument
+from utils.pagination import iter_by_id
+from utils.records import Product, ProductColumns
 
 
+@instrument('repository')
 class ProductRepository:
     """
     Repositorio para operaciones CRUD de productos.
@@ -15,15 +20,14 @@ class ProductRepository:
     
     def __init__(self, db_file: str = 'db.json'):
         """
-        Inicializa el repositorio con conexión a base de datos.
+        Inicializa el repositorio con el almacén de datos configurado.
         
         Args:
             db_file: Ruta al archivo de base de datos JSON
         """
-        self.db = DatabaseConnection(db_file)
-        self.db.connect()
+        self.db = ConnectionFactory.create(db_file)
     
-    def get_all(self) -> List[Dict[str, Any]]:
+    def get_all(self) -> List[Product]:
         """
         Obtiene todos los productos.
         
@@ -35,7 +39,59 @@ class ProductRepository:
         except Exception as e:
             raise Exception(f"Error al obtener productos: {str(e)}")
     
-    def get_by_id(self, product_id: int) -> Optional[Dict[str, Any]]:
+    def get_version(self) -> Tuple[str, float]:
+        """
+        Obtiene la versión de los productos sin leer sus datos.
+        
+        Returns:
+            Tupla (etiqueta de versión, timestamp de la última modificación)
+        """
+        try:
+            return self.db.get_version('products')
+        except Exception as e:
+            raise Exception(f"Error al obtener versión: {str(e)}")
+    
+    def get_page(self, after_id: Optional[int], limit: int) -> List[Product]:
+        """
+        Obtiene una página de productos ordenados por ID.
+        
+        Args:
+            after_id: Último ID entregado en la página anterior (None para la primera)
+            limit: Cantidad máxima de registros
+            
+        Returns:
+            Lista de productos con ID mayor a after_id
+        """
+        try:
+            return self.db.get_products_page(after_id, limit)
+        except Exception as e:
+            raise Exception(f"Error al paginar productos: {str(e)}")
+    
+    def get_columns(self) -> ProductColumns:
+        """
+        Obtiene ID, precio y categoría de los productos en columnas.
+        
+        Returns:
+            Columnas de productos (copia independiente del almacén)
+        """
+        try:
+            return self.db.get_product_columns()
+        except Exception as e:
+            raise Exception(f"Error al obtener columnas de productos: {str(e)}")
+    
+    def iter_all(self, batch_size: int = 500) -> Iterator[Product]:
+        """
+        Recorre todos los productos por páginas, sin copiar la colección completa.
+        
+        Args:
+            batch_size: Registros leídos del almacén por página
+            
+        Returns:
+            Generador de productos
+        """
+        return iter_by_id(self.get_page, batch_size)
+    
+    def get_by_id(self, product_id: int) -> Optional[Product]:
         """
         Busca un producto por ID.
         
@@ -46,12 +102,26 @@ class ProductRepository:
             Producto encontrado o None
         """
         try:
-            products = self.get_all()
-            return next((p for p in products if p['id'] == product_id), None)
+            return self.db.get_product(product_id)
         except Exception as e:
             raise Exception(f"Error al buscar producto: {str(e)}")
     
-    def get_by_category(self, category: str) -> List[Dict[str, Any]]:
+    def get_by_ids(self, product_ids: List[int]) -> List[Optional[Product]]:
+        """
+        Busca varios productos por ID con una sola consulta al índice.
+        
+        Args:
+            product_ids: IDs de los productos a buscar
+            
+        Returns:
+            Lista alineada con product_ids: el producto o None si no existe
+        """
+        try:
+            return self.db.get_products_by_ids(product_ids)
+        except Exception as e:
+            raise Exception(f"Error al buscar productos: {str(e)}")
+    
+    def get_by_category(self, category: str) -> List[Product]:
         """
         Filtra productos por categoría.
         
@@ -62,12 +132,49 @@ class ProductRepository:
             Lista de productos de la categoría
         """
         try:
-            products = self.get_all()
-            return [p for p in products if p.get('category', '').lower() == category.lower()]
+            return self.db.get_products_by_category(category)
         except Exception as e:
             raise Exception(f"Error al filtrar por categoría: {str(e)}")
+
+    def get_by_price(self, min_price: Optional[float], max_price: Optional[float],
+                     after: Optional[Tuple[float, int]], limit: int,
+                     category: Optional[str] = None) -> List[Product]:
+        """
+        Obtiene una página de productos en un rango de precios, ordenados por precio y luego por ID.
+        
+        Args:
+            min_price: Precio mínimo inclusive (None sin límite)
+            max_price: Precio máximo inclusive (None sin límite)
+            after: (precio, ID) del último producto de la página anterior (None para la primera)
+            limit: Cantidad máxima de registros
+            category: Categoría a la que se restringe el rango (opcional)
+            
+        Returns:
+            Lista de productos del rango
+        """
+        try:
+            return self.db.get_products_by_price(min_price, max_price, after, limit, category)
+        except Exception as e:
+            raise Exception(f"Error al filtrar por precio: {str(e)}")
+    
+    def search(self, query: str, limit: int, category: Optional[str] = None) -> List[Product]:
+        """
+        Busca productos por nombre.
+        
+        Args:
+            query: Palabras a buscar (también por prefijo)
+            limit: Cantidad máxima de resultados
+            category: Categoría a la que se restringe la búsqueda (opcional)
+            
+        Returns:
+            Productos ordenados por relevancia
+        """
+        try:
+            return self.db.search_products(query, limit, category)
+        except Exception as e:
+            raise Exception(f"Error al buscar productos: {str(e)}")
     
-    def add(self, product: Dict[str, Any]) -> Dict[str, Any]:
+    def add(self, product: Product) -> Product:
         """
         Agrega un nuevo producto.
         
@@ -76,22 +183,63 @@ class ProductRepository:
             
         Returns:
             Producto agregado con ID asignado
+            
+        Raises:
+            IntegrityError: Si la categoría del producto no existe
         """
         try:
             self.db.add_product(product)
             return product
+        except IntegrityError:
+            raise
         except Exception as e:
             raise Exception(f"Error al agregar producto: {str(e)}")
     
+    def add_many(self, products: List[Product]) -> List[Product]:
+        """
+        Agrega varios productos con una sola escritura.
+        
+        Args:
+            products: Productos a agregar, con ID ya asignado
+            
+        Returns:
+            Productos agregados
+            
+        Raises:
+            IntegrityError: Si la categoría de algún producto no existe (no se agrega ninguno)
+        """
+        try:
+            if products:
+                self.db.add_products(products)
+            return products
+        except IntegrityError:
+            raise
+        except Exception as e:
+            raise Exception(f"Error al agregar productos: {str(e)}")
+    
+    def get_next_ids(self, count: int) -> int:
+        """
+        Reserva un bloque de IDs consecutivos.
+        
+        Args:
+            count: Cantidad de IDs a reservar
+            
+        Returns:
+            Primer ID del bloque
+        """
+        try:
+            return self.db.next_id('products', count)
+        except Exception as e:
+            raise Exception(f"Error al reservar IDs: {str(e)}")
+    
     def get_next_id(self) -> int:
         """
-        Calcula el siguiente ID disponible.
+        Reserva el siguiente ID disponible.
         
         Returns:
             Siguiente ID a utilizar
         """
         try:
-            products = self.get_all()
-            return len(products) + 1
-        except Exception:
-            return 1
\ No newline at end of file
+            return self.db.next_id('products')
+        except Exception as e:
+            raise Exception(f"Error al reservar ID: {str(e)}")
\ No newline at end of file
@@ -0,0 +1,59 @@
+"""
+Adaptador asíncrono para los servicios (Decorator Pattern sobre el Service Layer).
+Expone los mismos métodos que el servicio envuelto como corrutinas que se
+ejecutan en un pool de hilos acotado, así el event loop nunca se bloquea
+con la E/S del almacenamiento.
+"""
+
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, Optional
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """
+    Devuelve el pool compartido para la E/S de almacenamiento.
+    Su tamaño se configura con ASYNC_MAX_WORKERS (por defecto 32).
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            max_workers = int(os.environ.get('ASYNC_MAX_WORKERS', '32'))
+            _executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='storage')
+        return _executor
+
+
+class AsyncService:
+    """
+    Envuelve un servicio síncrono; cada método público se vuelve awaitable.
+
+    Uso:
+        products = AsyncService(ProductService())
+        product = await products.get_product_by_id(1)
+    """
+
+    def __init__(self, service: Any):
+        """
+        Args:
+            service: Instancia de ProductService, CategoryService o FavoriteService
+        """
+        self.service = service
+
+    def __getattr__(self, name: str):
+        method = getattr(self.service, name)
+        if not callable(method) or name.startswith('_'):
+            return method
+
+        async def run(*args, **kwargs):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(get_executor(), partial(method, *args, **kwargs))
+
+        # Se guarda en la instancia para no volver a crear la corrutina en cada acceso
+        setattr(self, name, run)
+        return run
@@ -3,18 +3,27 @@ Service Layer para lógica de negocio de categorías.
 Separa la lógica de negocio del acceso a datos y la presentación.
 """
 
-from typing import List, Optional, Dict, Any
+from typing import Iterator, List, Optional, Dict, Any, Tuple
+from utils.response_cache import invalidates
+from utils.metrics import instrument
+from utils.pagination import parse_limit, parse_id_cursor, parse_flag, build_page
 from repositories.category_repository import CategoryRepository
 
 
+@instrument('service')
 class CategoryService:
     """
     Servicio que contiene la lógica de negocio para categorías.
     """
     
-    def __init__(self):
-        """Inicializa el servicio con su repositorio."""
-        self.repository = CategoryRepository()
+    def __init__(self, repository: Optional[CategoryRepository] = None):
+        """
+        Inicializa el servicio con su repositorio.
+        
+        Args:
+            repository: Repositorio a usar; si no se indica se crea uno nuevo
+        """
+        self.repository = repository or CategoryRepository()
     
     def get_all_categories(self) -> List[Dict[str, Any]]:
         """
@@ -25,6 +34,43 @@ class CategoryService:
         """
         return self.repository.get_all()
     
+    def get_data_version(self) -> Tuple[str, float]:
+        """
+        Obtiene la versión actual de las categorías, usada para ETag y Last-Modified.
+        
+        Returns:
+            Tupla (etiqueta de versión, timestamp de la última modificación)
+        """
+        return self.repository.get_version()
+    
+    def get_categories_page(self, cursor: Optional[str], limit: Optional[str]) -> Dict[str, Any]:
+        """
+        Obtiene una página de categorías ordenada por ID.
+        La paginación por cursor es estable aunque se inserten registros nuevos.
+        
+        Args:
+            cursor: Cursor devuelto en la página anterior (None para la primera)
+            limit: Tamaño de página solicitado
+            
+        Returns:
+            Diccionario con las categorías ('items') y el cursor siguiente ('next_cursor')
+            
+        Raises:
+            ValueError: Si el cursor o el límite no son válidos
+        """
+        page_size = parse_limit(limit)
+        rows = self.repository.get_page(parse_id_cursor(cursor), page_size + 1)
+        return build_page(rows, page_size)
+    
+    def iter_categories(self) -> Iterator[Dict[str, Any]]:
+        """
+        Recorre todas las categorías para exportaciones en streaming.
+        
+        Returns:
+            Generador de categorías
+        """
+        return self.repository.iter_all()
+    
     def get_category_by_id(self, category_id: int) -> Optional[Dict[str, Any]]:
         """
         Obtiene una categoría por su ID.
@@ -43,6 +89,7 @@ class CategoryService:
         
         return self.repository.get_by_id(category_id)
     
+    @invalidates('categories')
     def create_category(self, name: str) -> Dict[str, Any]:
         """
         Crea una nueva categoría.
@@ -76,25 +123,35 @@ class CategoryService:
         
         return self.repository.add(new_category)
     
-    def delete_category(self, name: str) -> bool:
+    @invalidates('favorites')
+    @invalidates('products')
+    @invalidates('categories')
+    def delete_category(self, name: str, cascade: Optional[str] = None) -> int:
         """
         Elimina una categoría por nombre.
+        Sin cascade no se elimina si tiene productos; con cascade se eliminan
+        también sus productos y los favoritos de esos productos. El almacén cuenta los productos con el índice
+        por categoría y elimina en la misma operación, así ningún producto
+        creado en paralelo queda con una categoría inexistente.
         
         Args:
             name: Nombre de la categoría a eliminar
+            cascade: 'true' para eliminar también los productos de la categoría
             
         Returns:
-            True si se eliminó exitosamente
+            Cantidad de productos eliminados junto con la categoría
             
         Raises:
-            ValueError: Si los datos no son válidos o la categoría no existe
+            ValueError: Si los datos no son válidos, la categoría no existe o
+                tiene productos y no se pidió cascade
         """
         if not name or not name.strip():
             raise ValueError("El nombre de la categoría no puede estar vacío")
+        delete_products = parse_flag(cascade, 'cascade')
         
         # Verificar si existe
         existing_category = self.repository.get_by_name(name.strip())
         if not existing_category:
             raise ValueError("Categoría no encontrada")
         
-        return self.repository.remove(name.strip())
\ No newline at end of file
+        return self.repository.remove(existing_category['name'], delete_products)
\ No newline at end of file
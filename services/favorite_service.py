@@ -3,20 +3,38 @@ Service Layer para lógica de negocio de favoritos.
 Separa la lógica de negocio del acceso a datos y la presentación.
 """
 
-from typing import List, Dict, Any
+from typing import Iterable, List, Dict, Any, Set, Tuple, Optional
+from utils.response_cache import invalidates
+from utils.metrics import instrument
 from repositories.favorite_repository import FavoriteRepository
+from repositories.product_repository import ProductRepository
+from utils.integrity import IntegrityError
+from utils.records import Favorite, as_dict
 
+# Relaciones que se pueden embeber con ?expand=
+EXPANSIONS = ('product',)
 
+
+@instrument('service')
 class FavoriteService:
     """
     Servicio que contiene la lógica de negocio para favoritos.
     """
     
-    def __init__(self):
-        """Inicializa el servicio con su repositorio."""
-        self.repository = FavoriteRepository()
+    def __init__(self, repository: Optional[FavoriteRepository] = None,
+                 product_repository: Optional[ProductRepository] = None):
+        """
+        Inicializa el servicio con sus repositorios.
+        
+        Args:
+            repository: Repositorio a usar; si no se indica se crea uno nuevo
+            product_repository: Repositorio de productos para expand=product y
+                para validar que el producto exista
+        """
+        self.repository = repository or FavoriteRepository()
+        self.product_repository = product_repository or ProductRepository()
     
-    def get_all_favorites(self) -> List[Dict[str, Any]]:
+    def get_all_favorites(self) -> Iterable[Favorite]:
         """
         Obtiene todos los favoritos.
         
@@ -25,7 +43,19 @@ class FavoriteService:
         """
         return self.repository.get_all()
     
-    def get_user_favorites(self, user_id: int) -> List[Dict[str, Any]]:
+    def get_data_version(self) -> Tuple[str, float]:
+        """
+        Obtiene la versión actual de los favoritos, usada por la caché de respuestas.
+        Incluye la de productos porque expand=product embebe sus datos.
+        
+        Returns:
+            Tupla (etiqueta de versión, timestamp de la última modificación)
+        """
+        favorites, favorites_modified = self.repository.get_version()
+        products, products_modified = self.product_repository.get_version()
+        return f"{favorites}.{products}", max(favorites_modified, products_modified)
+    
+    def get_user_favorites(self, user_id: int) -> List[Favorite]:
         """
         Obtiene los favoritos de un usuario.
         
@@ -43,7 +73,35 @@ class FavoriteService:
         
         return self.repository.get_by_user(user_id)
     
-    def add_favorite(self, user_id: int, product_id: int) -> Dict[str, Any]:
+    def expand_favorites(self, favorites: Iterable[Favorite], expand: str) -> List[Dict[str, Any]]:
+        """
+        Agrega a cada favorito los datos de su producto.
+        Todos los productos se resuelven con una sola consulta por ID, en
+        lugar de una petición por favorito.
+        
+        Args:
+            favorites: Favoritos a expandir
+            expand: Relación a embeber; solo se admite 'product'
+            
+        Returns:
+            Favoritos como diccionarios con 'product' (None si el producto no existe)
+            
+        Raises:
+            ValueError: Si la relación no es válida
+        """
+        if expand not in EXPANSIONS:
+            raise ValueError(f"El parámetro expand solo admite: {', '.join(EXPANSIONS)}")
+        
+        # Copia: una fila que ya es dict pertenece al almacén
+        rows = [dict(as_dict(favorite)) for favorite in favorites]
+        product_ids = list(dict.fromkeys(row.get('product_id') for row in rows))
+        products = dict(zip(product_ids, self.product_repository.get_by_ids(product_ids)))
+        for row in rows:
+            row['product'] = as_dict(products[row.get('product_id')])
+        return rows
+    
+    @invalidates('favorites')
+    def add_favorite(self, user_id: int, product_id: int) -> Favorite:
         """
         Agrega un producto a favoritos.
         
@@ -54,6 +112,22 @@ class FavoriteService:
         Returns:
             Favorito creado
             
+        Raises:
+            ValueError: Si los datos no son válidos, el producto no existe o el favorito ya existe
+        """
+        self._validate_new_favorite(user_id, product_id)
+        
+        # Crear favorito; el almacén verifica que el producto exista al escribir
+        new_favorite = Favorite(user_id, product_id)
+        
+        return self.repository.add(new_favorite)
+    
+    def _validate_new_favorite(self, user_id: int, product_id: int) -> None:
+        """
+        Aplica las reglas de negocio para agregar un favorito.
+        La existencia del producto la verifica el almacén con su lock tomado,
+        en la misma operación que escribe el favorito.
+        
         Raises:
             ValueError: Si los datos no son válidos o el favorito ya existe
         """
@@ -67,15 +141,81 @@ class FavoriteService:
         # Verificar si ya existe
         if self.repository.exists(user_id, product_id):
             raise ValueError("Este producto ya está en favoritos")
+    
+    @invalidates('favorites')
+    def add_favorites(self, items: List[Any]) -> List[Dict[str, Any]]:
+        """
+        Agrega varios favoritos con las mismas reglas que add_favorite.
+        Los productos del lote se buscan con una sola consulta por ID y el
+        lote se guarda con una sola escritura.
         
-        # Crear favorito
-        new_favorite = {
-            'user_id': user_id,
-            'product_id': product_id
-        }
+        Args:
+            items: Lista de diccionarios con user_id y product_id
+            
+        Returns:
+            Resultado por elemento, en el mismo orden de entrada:
+            {'index', 'status': 201, 'favorite'} o {'index', 'status': 400, 'message'}
+        """
+        results = []
+        pending = []  # Resultados 201 aún sin guardar
+        seen = set()
+        product_ids = list(dict.fromkeys(item.get('product_id') for item in items
+                                         if isinstance(item, dict) and type(item.get('product_id')) is int))
+        existing_products = self._existing_products(product_ids)
+        for index, item in enumerate(items):
+            try:
+                if not isinstance(item, dict):
+                    raise ValueError("Cada elemento debe ser un objeto")
+                user_id = _as_id(item.get('user_id'), 'user_id')
+                product_id = _as_id(item.get('product_id'), 'product_id')
+                self._validate_new_favorite(user_id, product_id)
+                if product_id not in existing_products:
+                    raise ValueError("El producto no existe")
+                # Duplicados dentro del mismo lote
+                if (user_id, product_id) in seen:
+                    raise ValueError("Este producto ya está en favoritos")
+                seen.add((user_id, product_id))
+                result = {'index': index, 'status': 201, 'favorite': Favorite(user_id, product_id)}
+                pending.append(result)
+            except ValueError as e:
+                result = {'index': index, 'status': 400, 'message': str(e)}
+            results.append(result)
         
-        return self.repository.add(new_favorite)
+        self._add_validated(pending)
+        return results
+    
+    def _existing_products(self, product_ids: List[int]) -> Set[int]:
+        """IDs de producto que existen, resueltos con una sola consulta por ID."""
+        return {product_id for product_id, product
+                in zip(product_ids, self.product_repository.get_by_ids(product_ids))
+                if product is not None}
     
+    def _add_validated(self, pending: List[Dict[str, Any]]) -> None:
+        """
+        Guarda los favoritos de un lote ya validado. El almacén vuelve a verificar
+        los productos al escribir; si alguno se eliminó después de validar, esos
+        elementos pasan a 400 y se guardan los demás.
+        """
+        while pending:
+            try:
+                self.repository.add_many([result['favorite'] for result in pending])
+                return
+            except IntegrityError:
+                existing_products = self._existing_products(
+                    list(dict.fromkeys(result['favorite']['product_id'] for result in pending)))
+                remaining = []
+                for result in pending:
+                    if result['favorite']['product_id'] not in existing_products:
+                        del result['favorite']
+                        result['status'] = 400
+                        result['message'] = "El producto no existe"
+                    else:
+                        remaining.append(result)
+                if len(remaining) == len(pending):
+                    raise
+                pending = remaining
+    
+    @invalidates('favorites')
     def remove_favorite(self, user_id: int, product_id: int) -> bool:
         """
         Elimina un producto de favoritos.
@@ -101,4 +241,11 @@ class FavoriteService:
         if not self.repository.exists(user_id, product_id):
             raise ValueError("Este favorito no existe")
         
-        return self.repository.remove(user_id, product_id)
\ No newline at end of file
+        return self.repository.remove(user_id, product_id)
+
+
+def _as_id(value: Any, field: str) -> int:
+    """Valida que un ID de un elemento del lote sea entero."""
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise ValueError(f"El campo {field} debe ser un número entero")
+    return value
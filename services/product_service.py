@@ -3,20 +3,37 @@ Service Layer para lógica de negocio de productos.
 Separa la lógica de negocio del acceso a datos y la presentación.
 """
 
-from typing import List, Optional, Dict, Any
+import math
+from typing import Iterator, List, Optional, Dict, Any, Tuple
+from utils.response_cache import invalidates
+from utils.metrics import instrument
+from utils.integrity import IntegrityError
+from utils.pagination import (parse_limit, parse_id_cursor, parse_id_list, parse_price, parse_price_cursor,
+                              build_page, price_cursor)
+from utils.records import Product
 from repositories.product_repository import ProductRepository
+from repositories.category_repository import CategoryRepository
 
 
+@instrument('service')
 class ProductService:
     """
     Servicio que contiene la lógica de negocio para productos.
     """
     
-    def __init__(self):
-        """Inicializa el servicio con su repositorio."""
-        self.repository = ProductRepository()
+    def __init__(self, repository: Optional[ProductRepository] = None,
+                 category_repository: Optional[CategoryRepository] = None):
+        """
+        Inicializa el servicio con sus repositorios.
+        
+        Args:
+            repository: Repositorio a usar; si no se indica se crea uno nuevo
+            category_repository: Repositorio de categorías para validar la categoría
+        """
+        self.repository = repository or ProductRepository()
+        self.category_repository = category_repository or CategoryRepository()
     
-    def get_all_products(self) -> List[Dict[str, Any]]:
+    def get_all_products(self) -> List[Product]:
         """
         Obtiene todos los productos.
         
@@ -25,7 +42,44 @@ class ProductService:
         """
         return self.repository.get_all()
     
-    def get_product_by_id(self, product_id: int) -> Optional[Dict[str, Any]]:
+    def get_data_version(self) -> Tuple[str, float]:
+        """
+        Obtiene la versión actual de los productos, usada para ETag y Last-Modified.
+        
+        Returns:
+            Tupla (etiqueta de versión, timestamp de la última modificación)
+        """
+        return self.repository.get_version()
+    
+    def get_products_page(self, cursor: Optional[str], limit: Optional[str]) -> Dict[str, Any]:
+        """
+        Obtiene una página de productos ordenada por ID.
+        La paginación por cursor es estable aunque se inserten registros nuevos.
+        
+        Args:
+            cursor: Cursor devuelto en la página anterior (None para la primera)
+            limit: Tamaño de página solicitado
+            
+        Returns:
+            Diccionario con los productos ('items') y el cursor siguiente ('next_cursor')
+            
+        Raises:
+            ValueError: Si el cursor o el límite no son válidos
+        """
+        page_size = parse_limit(limit)
+        rows = self.repository.get_page(parse_id_cursor(cursor), page_size + 1)
+        return build_page(rows, page_size)
+    
+    def iter_products(self) -> Iterator[Product]:
+        """
+        Recorre todos los productos para exportaciones en streaming.
+        
+        Returns:
+            Generador de productos
+        """
+        return self.repository.iter_all()
+    
+    def get_product_by_id(self, product_id: int) -> Optional[Product]:
         """
         Obtiene un producto por su ID.
         
@@ -43,7 +97,23 @@ class ProductService:
         
         return self.repository.get_by_id(product_id)
     
-    def get_products_by_category(self, category: str) -> List[Dict[str, Any]]:
+    def get_products_by_ids(self, ids: Optional[str]) -> List[Product]:
+        """
+        Obtiene varios productos por ID con una sola consulta.
+        
+        Args:
+            ids: IDs separados por coma ('1,2,3')
+            
+        Returns:
+            Productos encontrados, en el orden pedido; los IDs inexistentes se omiten
+            
+        Raises:
+            ValueError: Si la lista de IDs no es válida
+        """
+        products = self.repository.get_by_ids(parse_id_list(ids))
+        return [product for product in products if product is not None]
+    
+    def get_products_by_category(self, category: str) -> List[Product]:
         """
         Filtra productos por categoría.
         
@@ -61,20 +131,73 @@ class ProductService:
         
         return self.repository.get_by_category(category.strip())
     
-    def create_product(self, name: str, category: str, price: float) -> Dict[str, Any]:
+    def get_products_by_price(self, min_price: Optional[str], max_price: Optional[str],
+                              sort: Optional[str] = None, category: Optional[str] = None,
+                              cursor: Optional[str] = None, limit: Optional[str] = None) -> Dict[str, Any]:
         """
-        Crea un nuevo producto.
+        Obtiene una página de productos en un rango de precios, ordenada por precio.
         
         Args:
-            name: Nombre del producto
-            category: Categoría del producto
-            price: Precio del producto
+            min_price: Precio mínimo inclusive (opcional)
+            max_price: Precio máximo inclusive (opcional)
+            sort: Orden solicitado; solo se admite 'price'
+            category: Categoría a la que se restringe el rango (opcional)
+            cursor: Cursor devuelto en la página anterior (None para la primera)
+            limit: Tamaño de página solicitado
             
         Returns:
-            Producto creado con ID asignado
+            Diccionario con los productos ('items') y el cursor siguiente ('next_cursor')
+            
+        Raises:
+            ValueError: Si algún parámetro no es válido
+        """
+        if sort not in (None, '', 'price'):
+            raise ValueError("El parámetro sort solo admite 'price'")
+        if category is not None and not category.strip():
+            raise ValueError("La categoría no puede estar vacía")
+        low = parse_price(min_price, 'min_price')
+        high = parse_price(max_price, 'max_price')
+        if low is not None and high is not None and low > high:
+            raise ValueError("min_price no puede ser mayor que max_price")
+        page_size = parse_limit(limit)
+        rows = self.repository.get_by_price(low, high, parse_price_cursor(cursor), page_size + 1,
+                                            category.strip() if category else None)
+        return build_page(rows, page_size, price_cursor)
+    
+    def search_products(self, query: str, limit: Optional[str] = None,
+                        category: Optional[str] = None) -> List[Product]:
+        """
+        Busca productos por nombre, ordenados por relevancia.
+        
+        Args:
+            query: Texto de búsqueda; la última palabra puede estar incompleta
+            limit: Cantidad máxima de resultados
+            category: Categoría a la que se restringe la búsqueda (opcional)
             
+        Returns:
+            Lista de productos encontrados
+            
+        Raises:
+            ValueError: Si la búsqueda está vacía o el límite no es válido
+        """
+        if not query or not query.strip():
+            raise ValueError("La búsqueda no puede estar vacía")
+        if category is not None and not category.strip():
+            raise ValueError("La categoría no puede estar vacía")
+        return self.repository.search(query.strip(), parse_limit(limit),
+                                      category.strip() if category else None)
+    
+    def _build_product(self, name: str, category: str, price: float,
+                       known_categories: Optional[Dict[str, bool]] = None) -> Dict[str, Any]:
+        """
+        Valida los datos de un producto y los normaliza (sin asignar ID).
+        La categoría debe existir; se busca por nombre en el índice de categorías.
+        
+        Args:
+            known_categories: Resultados de búsquedas anteriores del mismo lote
+        
         Raises:
-            ValueError: Si los datos no son válidos
+            ValueError: Si los datos no son válidos o la categoría no existe
         """
         # Validaciones de negocio
         if not name or not name.strip():
@@ -83,18 +206,137 @@ class ProductService:
         if not category or not category.strip():
             raise ValueError("La categoría no puede estar vacía")
         
+        if not math.isfinite(price):
+            raise ValueError("El precio debe ser un número finito")
+        
         if price < 0:
             raise ValueError("El precio no puede ser negativo")
         
         if len(name.strip()) > 100:
             raise ValueError("El nombre no puede exceder 100 caracteres")
         
-        # Crear producto
-        new_product = {
-            'id': self.repository.get_next_id(),
+        key = category.strip().casefold()
+        exists = None if known_categories is None else known_categories.get(key)
+        if exists is None:
+            exists = self.category_repository.get_by_name(category.strip()) is not None
+            if known_categories is not None:
+                known_categories[key] = exists
+        if not exists:
+            raise ValueError(f"La categoría '{category.strip()}' no existe")
+        
+        return {
             'name': name.strip(),
             'category': category.strip(),
             'price': round(price, 2)  # Redondear a 2 decimales
         }
+    
+    @invalidates('products')
+    def create_product(self, name: str, category: str, price: float) -> Product:
+        """
+        Crea un nuevo producto.
         
-        return self.repository.add(new_product)
\ No newline at end of file
+        Args:
+            name: Nombre del producto
+            category: Categoría del producto
+            price: Precio del producto
+            
+        Returns:
+            Producto creado con ID asignado
+            
+        Raises:
+            ValueError: Si los datos no son válidos o la categoría no existe
+        """
+        product = self._build_product(name, category, price)
+        
+        # Crear producto
+        new_product = Product(self.repository.get_next_id(), **product)
+        
+        return self.repository.add(new_product)
+    
+    @invalidates('products')
+    def create_products(self, items: List[Any]) -> List[Dict[str, Any]]:
+        """
+        Crea varios productos con las mismas reglas que create_product.
+        Los IDs se reservan en bloque y el lote se guarda con una sola escritura.
+        
+        Args:
+            items: Lista de diccionarios con name, category y price
+            
+        Returns:
+            Resultado por elemento, en el mismo orden de entrada:
+            {'index', 'status': 201, 'product'} o {'index', 'status': 400, 'message'}
+        """
+        results = []
+        pending = []  # (resultado, producto validado sin ID)
+        known_categories: Dict[str, bool] = {}
+        for index, item in enumerate(items):
+            try:
+                if not isinstance(item, dict):
+                    raise ValueError("Cada elemento debe ser un objeto")
+                product = self._build_product(_as_text(item.get('name')),
+                                              _as_text(item.get('category')),
+                                              _as_price(item.get('price')),
+                                              known_categories)
+                result = {'index': index, 'status': 201}
+                pending.append((result, product))
+            except ValueError as e:
+                result = {'index': index, 'status': 400, 'message': str(e)}
+            results.append(result)
+        
+        if pending:
+            first_id = self.repository.get_next_ids(len(pending))
+            for offset, (result, product) in enumerate(pending):
+                result['product'] = Product(first_id + offset, **product)
+            self._add_validated(pending)
+        
+        return results
+    
+    def _add_validated(self, pending: List[Tuple[Dict[str, Any], Dict[str, Any]]]) -> None:
+        """
+        Guarda los productos de un lote ya validado. El almacén vuelve a verificar
+        las categorías al escribir; si alguna se eliminó después de validar, esos
+        elementos pasan a 400 y se guardan los demás.
+        """
+        while pending:
+            try:
+                self.repository.add_many([result['product'] for result, _ in pending])
+                return
+            except IntegrityError:
+                remaining = []
+                known_categories: Dict[str, bool] = {}
+                for result, product in pending:
+                    key = product['category'].casefold()
+                    if key not in known_categories:
+                        known_categories[key] = self.category_repository.get_by_name(product['category']) is not None
+                    if not known_categories[key]:
+                        del result['product']
+                        result['status'] = 400
+                        result['message'] = f"La categoría '{product['category']}' no existe"
+                    else:
+                        remaining.append((result, product))
+                if len(remaining) == len(pending):
+                    raise
+                pending = remaining
+
+
+def _as_text(value: Any) -> str:
+    """Valida que un campo de texto del lote sea un string."""
+    if value is not None and not isinstance(value, str):
+        raise ValueError("Los campos name y category deben ser texto")
+    return value
+
+
+def _as_price(value: Any) -> float:
+    """Convierte el precio de un elemento del lote a float; solo admite números JSON."""
+    if value is None:
+        raise ValueError("El precio es requerido")
+    # bool es subclase de int y float('12') aceptaría texto: ambos se rechazan
+    if isinstance(value, (bool, str)):
+        raise ValueError("El precio debe ser numérico")
+    try:
+        price = float(value)
+    except (TypeError, ValueError, OverflowError):
+        raise ValueError("El precio debe ser numérico")
+    if not math.isfinite(price):
+        raise ValueError("El precio debe ser un número finito")
+    return price
@@ -0,0 +1,200 @@
+"""
+Service Layer para estadísticas del catálogo.
+Calcula con NumPy, sobre columnas de precios, categorías y favoritos, los
+agregados por categoría y el ranking de productos por favoritos. El
+resultado se guarda por versión de los datos.
+"""
+
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+from utils.metrics import instrument
+from utils.pagination import parse_limit, MAX_PAGE_SIZE
+from repositories.product_repository import ProductRepository
+from repositories.favorite_repository import FavoriteRepository
+
+try:
+    import numpy as np
+except ImportError:  # Dependencia opcional: solo la necesita /stats
+    np = None
+
+PERCENTILES = (25, 50, 75, 90, 99)
+# Con IDs hasta este múltiplo de la cantidad de productos se cuenta con bincount por ID
+DENSE_ID_FACTOR = 4
+
+
+class StatsUnavailableError(RuntimeError):
+    """Las estadísticas no se pueden calcular en este entorno (falta NumPy)."""
+
+
+@instrument('service')
+class StatsService:
+    """
+    Servicio de estadísticas de productos y favoritos.
+    Las agregaciones se hacen agrupando por código de categoría (bincount y
+    un ordenamiento por categoría y precio), sin recorrer registros en Python.
+    """
+
+    def __init__(self, product_repository: Optional[ProductRepository] = None,
+                 favorite_repository: Optional[FavoriteRepository] = None):
+        """
+        Inicializa el servicio con sus repositorios.
+
+        Args:
+            product_repository: Repositorio de productos; si no se indica se crea uno nuevo
+            favorite_repository: Repositorio de favoritos; si no se indica se crea uno nuevo
+        """
+        self.product_repository = product_repository or ProductRepository()
+        self.favorite_repository = favorite_repository or FavoriteRepository()
+        self._lock = threading.Lock()
+        self._cached: Optional[Tuple[str, Dict[str, Any]]] = None
+
+    def get_data_version(self) -> Tuple[str, float]:
+        """
+        Obtiene la versión combinada de productos y favoritos.
+
+        Returns:
+            Tupla (etiqueta de versión, timestamp de la última modificación)
+        """
+        products, products_modified = self.product_repository.get_version()
+        favorites, favorites_modified = self.favorite_repository.get_version()
+        return f"{products}.{favorites}", max(products_modified, favorites_modified)
+
+    def get_stats(self, limit: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Obtiene las estadísticas del catálogo.
+        Se recalculan solo cuando cambia la versión de productos o favoritos.
+
+        Args:
+            limit: Cantidad de productos en el ranking de favoritos
+
+        Returns:
+            Diccionario con 'products' (resumen de precios), 'categories'
+            (resumen por categoría) y 'favorites' (totales y ranking)
+
+        Raises:
+            ValueError: Si el límite no es válido
+            StatsUnavailableError: Si NumPy no está instalado
+        """
+        if np is None:
+            raise StatsUnavailableError("Las estadísticas requieren NumPy: pip install numpy")
+        top = parse_limit(limit)
+        # La versión se lee antes que los datos: nunca se guarda un cálculo con una versión más nueva
+        version, _ = self.get_data_version()
+        with self._lock:
+            if self._cached is None or self._cached[0] != version:
+                self._cached = (version, self._compute())
+            stats = self._cached[1]
+        favorites = dict(stats['favorites'], top_products=stats['favorites']['top_products'][:top])
+        return dict(stats, favorites=favorites)
+
+    def _compute(self) -> Dict[str, Any]:
+        """Calcula todas las estadísticas a partir de las columnas del almacén."""
+        columns = self.product_repository.get_columns()
+        ids = np.frombuffer(columns.ids, dtype=np.int64)
+        prices = np.frombuffer(columns.prices, dtype=np.float64)
+        codes = np.frombuffer(columns.category_codes, dtype=np.int64)
+        favorites = np.frombuffer(self.favorite_repository.get_product_ids(), dtype=np.int64)
+
+        favorite_counts = _count_by_id(ids, favorites)
+        category_favorites = np.bincount(codes, weights=favorite_counts, minlength=len(columns.categories))
+        categories = [{'category': name, **summary, 'favorites': int(count)}
+                      for name, summary, count in zip(columns.categories,
+                                                      _summaries(codes, prices, len(columns.categories)),
+                                                      category_favorites.tolist())]
+        categories.sort(key=lambda summary: summary['category'].casefold())
+
+        ranking = _top(ids, favorite_counts, MAX_PAGE_SIZE)
+        total = int(favorite_counts.sum())
+        return {
+            'products': _summaries(np.zeros(len(prices), dtype=np.int64), prices, 1)[0]
+                        if len(prices) else _empty_summary(),
+            'categories': categories,
+            'favorites': {
+                'count': total,
+                'products_with_favorites': int(np.count_nonzero(favorite_counts)),
+                'mean_per_product': round(total / len(ids), 4) if len(ids) else 0.0,
+                'top_products': [{'product_id': product_id, 'favorites': count}
+                                 for product_id, count in zip(ids[ranking].tolist(),
+                                                              favorite_counts[ranking].tolist())],
+            },
+        }
+
+
+def _count_by_id(ids, favorites):
+    """
+    Cuenta los favoritos de cada producto, alineados con ids. Los favoritos
+    de productos que no existen no se cuentan.
+    """
+    if not len(ids):
+        return np.zeros(0, dtype=np.int64)
+    low, high = int(ids.min()), int(ids.max())
+    if low >= 0 and high <= DENSE_ID_FACTOR * len(ids):
+        # IDs densos: bincount indexado directamente por ID
+        in_range = favorites <= high
+        return np.bincount(favorites[in_range & (favorites >= 0)], minlength=high + 1)[ids]
+    # IDs dispersos: cada favorito se ubica en los IDs ordenados con búsqueda binaria
+    order = np.argsort(ids, kind='stable')
+    sorted_ids = ids[order]
+    positions = np.searchsorted(sorted_ids, favorites)
+    valid = positions < len(sorted_ids)
+    valid[valid] = sorted_ids[positions[valid]] == favorites[valid]
+    counts = np.zeros(len(ids), dtype=np.int64)
+    counts[order] = np.bincount(positions[valid], minlength=len(ids))
+    return counts
+
+
+def _top(ids, counts, size: int):
+    """
+    Posiciones de los size productos con más favoritos (a igual cantidad,
+    menor ID). Solo se ordenan los candidatos que alcanzan el size-ésimo valor.
+    """
+    if len(counts) > size:
+        threshold = max(np.partition(counts, len(counts) - size)[len(counts) - size], 1)
+    else:
+        threshold = 1
+    candidates = np.flatnonzero(counts >= threshold)
+    order = np.lexsort((ids[candidates], -counts[candidates]))
+    return candidates[order[:size]]
+
+
+def _summaries(codes, prices, groups: int) -> List[Dict[str, Any]]:
+    """
+    Resume los precios de cada grupo (count, min, max, mean y percentiles).
+    Ordena una vez por (grupo, precio); cada grupo queda en un tramo contiguo
+    y sus percentiles se interpolan por posición como np.percentile ('linear').
+    Todos los grupos deben tener al menos un precio.
+    """
+    if groups == 1:
+        sorted_prices = np.sort(prices)
+    else:
+        # Orden estable por precio y luego por grupo; con pocos grupos los códigos
+        # entran en int16 y NumPy los ordena con radix sort
+        order = np.argsort(prices, kind='stable')
+        group_codes = codes[order]
+        if groups <= np.iinfo(np.int16).max:
+            group_codes = group_codes.astype(np.int16)
+        sorted_prices = prices[order[np.argsort(group_codes, kind='stable')]]
+    counts = np.bincount(codes, minlength=groups)
+    ends = np.cumsum(counts)
+    starts = ends - counts
+    means = np.bincount(codes, weights=prices, minlength=groups) / counts
+
+    positions = starts[:, None] + (counts[:, None] - 1) * (np.array(PERCENTILES) / 100)
+    low = np.floor(positions).astype(np.int64)
+    high = np.ceil(positions).astype(np.int64)
+    values = sorted_prices[low] + (sorted_prices[high] - sorted_prices[low]) * (positions - low)
+
+    return [{
+        'count': count,
+        'min_price': minimum,
+        'max_price': maximum,
+        'mean_price': round(mean, 2),
+        'percentiles': {f'p{percentile}': round(value, 2)
+                        for percentile, value in zip(PERCENTILES, row)},
+    } for count, minimum, maximum, mean, row in zip(
+        counts.tolist(), sorted_prices[starts].tolist(), sorted_prices[ends - 1].tolist(),
+        means.tolist(), values.tolist())]
+
+
+def _empty_summary() -> Dict[str, Any]:
+    return {'count': 0, 'min_price': None, 'max_price': None, 'mean_price': None, 'percentiles': {}}
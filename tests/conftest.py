@@ -0,0 +1,167 @@
+"""
+Fixtures compartidas: cada prueba usa su propio db.json en un directorio
+temporal y singletons nuevos, así la configuración leída de las variables
+de entorno no se arrastra entre pruebas. Las pruebas HTTP importan app.py
+y asgi_app.py desde ese directorio, así usan el db.json temporal.
+"""
+
+import asyncio
+import importlib
+import json
+import os
+import sys
+
+import pytest
+
+from container import AppContainer
+from utils.auth.auth_config import AuthConfig
+from utils.auth.token_service import TokenService
+from utils.data_store import DataStore
+from utils.group_commit import GroupCommitQueue
+from utils.metrics import Metrics
+from utils.response_cache import ResponseCache
+from utils.sqlite_connection import SQLiteConnection
+from utils.sqlite_import import import_json_file
+from utils.storage_config import StorageConfig
+
+SAMPLE_DATA = {
+    'products': [
+        {'id': 1, 'name': 'Red Shirt', 'price': 20.0, 'category': 'men'},
+        {'id': 2, 'name': 'Blue Dress', 'price': 45.5, 'category': 'women'},
+        {'id': 3, 'name': 'Red Pants', 'price': 5.0, 'category': 'men'},
+        {'id': 4, 'name': 'Redwood Hat', 'price': 5.0, 'category': 'kids'},
+        {'id': 5, 'name': 'Blue Shirt', 'price': 12.25, 'category': 'women'},
+        {'id': 6, 'name': 'Green Socks', 'price': 3.0, 'category': 'men'},
+    ],
+    'categories': [
+        {'id': 1, 'name': 'men'},
+        {'id': 2, 'name': 'women'},
+        {'id': 3, 'name': 'kids'},
+    ],
+    'favorites': [
+        {'user_id': 1, 'product_id': 1},
+        {'user_id': 1, 'product_id': 2},
+        {'user_id': 2, 'product_id': 3},
+    ],
+}
+
+_ENV_PREFIXES = ('DB_', 'AUTH_', 'METRICS_', 'RESPONSE_CACHE_')
+
+
+def write_db(path, data) -> str:
+    """Escribe un db.json con el mismo formato que el de la aplicación (indent=4)."""
+    with open(path, 'w') as json_file:
+        json.dump(data, json_file, indent=4)
+    return str(path)
+
+
+def read_db(path) -> dict:
+    with open(path) as json_file:
+        return json.load(json_file)
+
+
+@pytest.fixture(autouse=True)
+def fresh_singletons(monkeypatch):
+    """Aísla cada prueba de la configuración y los singletons de las demás."""
+    for name in list(os.environ):
+        if name.startswith(_ENV_PREFIXES):
+            monkeypatch.delenv(name)
+    monkeypatch.setenv('AUTH_SECRET_KEY', 'test-secret')
+    monkeypatch.setattr(StorageConfig, '_instance', None)
+    monkeypatch.setattr(AuthConfig, '_instance', None)
+    monkeypatch.setattr(TokenService, '_instance', None)
+    monkeypatch.setattr(ResponseCache, '_instance', None)
+    monkeypatch.setattr(DataStore, '_instances', {})
+    monkeypatch.setattr(GroupCommitQueue, '_instances', {})
+    monkeypatch.setattr(Metrics, '_instance', None)
+    monkeypatch.setattr(AppContainer, '_instance', None)
+
+
+@pytest.fixture
+def db_file(tmp_path) -> str:
+    """Ruta a una copia de SAMPLE_DATA en un directorio temporal."""
+    return write_db(tmp_path / 'db.json', SAMPLE_DATA)
+
+
+@pytest.fixture
+def journaled(monkeypatch):
+    """Activa el modo journal para los almacenes creados en la prueba."""
+    monkeypatch.setenv('DB_JOURNAL_ENABLED', '1')
+    # El compactador en segundo plano no debe interferir con las pruebas
+    monkeypatch.setenv('DB_COMPACT_INTERVAL', '3600')
+
+
+@pytest.fixture(params=['json', 'sqlite'])
+def backend(request, db_file, tmp_path, monkeypatch):
+    """Configura el backend y retorna la ruta que reciben los repositorios."""
+    if request.param == 'sqlite':
+        sqlite_path = str(tmp_path / 'db.sqlite3')
+        import_json_file(db_file, sqlite_path)
+        monkeypatch.setenv('DB_BACKEND', 'sqlite')
+        monkeypatch.setenv('DB_SQLITE_PATH', sqlite_path)
+        monkeypatch.setattr(SQLiteConnection, '_instances', {})
+    return db_file
+
+
+def _load_module(name, directory, monkeypatch):
+    """Importa de nuevo un punto de entrada: arma su contenedor al importarse, con el db.json de directory."""
+    monkeypatch.chdir(directory)
+    monkeypatch.delitem(sys.modules, name, raising=False)
+    return importlib.import_module(name)
+
+
+@pytest.fixture
+def flask_app(backend, tmp_path, monkeypatch):
+    """La aplicación Flask de app.py sobre el backend de la prueba."""
+    return _load_module('app', tmp_path, monkeypatch).app
+
+
+@pytest.fixture
+def client(flask_app):
+    """Cliente de prueba de Flask que envía un token válido en cada petición."""
+    test_client = flask_app.test_client()
+    response = test_client.post('/auth', json={'username': 'student', 'password': 'desingp'})
+    test_client.environ_base['HTTP_AUTHORIZATION'] = response.get_json()['token']
+    return test_client
+
+
+class AsgiClient:
+    """Llama a la aplicación ASGI sin servidor y retorna (status, headers, cuerpo)."""
+
+    def __init__(self, app):
+        self.app = app
+        self.token = None
+
+    def request(self, method, path, body=None, headers=None, query='', raw=None):
+        data = raw if raw is not None else (json.dumps(body).encode() if body is not None else b'')
+        header_list = [(name.lower().encode(), value.encode()) for name, value in (headers or {}).items()]
+        if self.token is not None:
+            header_list.append((b'authorization', self.token.encode()))
+        scope = {'type': 'http', 'method': method, 'path': path,
+                 'query_string': query.encode(), 'headers': header_list}
+        messages = []
+
+        async def receive():
+            return {'type': 'http.request', 'body': data}
+
+        async def send(message):
+            messages.append(message)
+
+        asyncio.run(self.app(scope, receive, send))
+        response_headers = {name.decode().lower(): value.decode() for name, value in messages[0]['headers']}
+        return messages[0]['status'], response_headers, b''.join(m.get('body', b'') for m in messages[1:])
+
+    def get(self, path, **kwargs):
+        return self.request('GET', path, **kwargs)
+
+    def post(self, path, body=None, **kwargs):
+        return self.request('POST', path, body, **kwargs)
+
+
+@pytest.fixture
+def asgi(backend, tmp_path, monkeypatch):
+    """Cliente de asgi_app.py sobre el backend de la prueba, con un token válido."""
+    asgi_client = AsgiClient(_load_module('asgi_app', tmp_path, monkeypatch).app)
+    _, _, body = asgi_client.post('/auth', {'username': 'student', 'password': 'desingp'})
+    asgi_client.token = json.loads(body)['token']
+    return asgi_client
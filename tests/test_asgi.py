@@ -0,0 +1,114 @@
+"""
+Pruebas de paridad entre asgi_app.py y app.py: las mismas peticiones dan el
+mismo status y el mismo cuerpo, con la misma negociación de contenido para
+la exportación NDJSON.
+"""
+
+import json
+
+import pytest
+
+NDJSON = 'application/x-ndjson'
+
+
+def _flask(client, method, path, body=None, headers=None, query=''):
+    response = client.open(path, method=method, json=body, headers=headers or {}, query_string=query)
+    return response.status_code, response.headers, response.data
+
+
+@pytest.mark.parametrize('path, query', [
+    ('/products', ''),
+    ('/products/3', ''),
+    ('/products/99', ''),
+    ('/products', 'category=MEN'),
+    ('/products', 'limit=2&cursor=2&fields=id,name'),
+    ('/products', 'min_price=5&max_price=20&limit=2'),
+    ('/products', 'q=red&limit=5'),
+    ('/products', 'ids=3,99,1'),
+    ('/products', 'limit=0'),
+    ('/categories', ''),
+    ('/categories/2', ''),
+    ('/categories', 'limit=1'),
+    ('/favorites', ''),
+    ('/favorites', 'user_id=1&expand=product'),
+    ('/favorites', 'user_id=1&expand=category'),
+])
+def test_gets_match_flask(client, asgi, path, query):
+    flask_status, _, flask_body = _flask(client, 'GET', path, query=query)
+    status, _, body = asgi.get(path, query=query)
+
+    assert status == flask_status
+    assert json.loads(body) == json.loads(flask_body)
+
+
+@pytest.mark.parametrize('method, path, body, status, message', [
+    ('POST', '/products', {'name': 'Tie', 'category': 'men', 'price': 15}, 201, 'Product added successfully'),
+    ('POST', '/products', {'name': 'Toy', 'category': 'missing', 'price': 1}, 400, "La categoría 'missing' no existe"),
+    ('POST', '/categories', {'name': 'shoes'}, 201, 'Category added successfully'),
+    ('DELETE', '/categories', {'name': 'kids'}, 400, None),
+    ('DELETE', '/categories', {'name': 'missing'}, 404, 'Categoría no encontrada'),
+    ('POST', '/favorites', {'user_id': 3, 'product_id': 4}, 201, 'Product added to favorites'),
+    ('POST', '/favorites', {'user_id': 1, 'product_id': 1}, 400, 'Este producto ya está en favoritos'),
+    ('DELETE', '/favorites', {'user_id': 1, 'product_id': 1}, 200, 'Product removed from favorites'),
+    ('DELETE', '/favorites', {'user_id': 3, 'product_id': 1}, 404, 'Este favorito no existe'),
+])
+@pytest.mark.parametrize('application', ['flask', 'asgi'])
+def test_writes_answer_like_flask(request, backend, application, method, path, body, status, message):
+    # Ambas aplicaciones comparten el almacén: cada una se prueba desde el estado inicial
+    if application == 'flask':
+        response_status, _, response_body = _flask(request.getfixturevalue('client'), method, path, body)
+    else:
+        response_status, _, response_body = request.getfixturevalue('asgi').request(method, path, body)
+    payload = json.loads(response_body)
+
+    assert response_status == status
+    if message is not None:
+        assert payload['message'] == message
+    else:
+        assert payload['message']
+
+
+def test_missing_field_is_a_bad_request(asgi):
+    status, _, body = asgi.post('/products', {'name': 'Tie', 'category': 'men'})
+
+    assert status == 400
+    assert json.loads(body)['message'] == {'price': 'Price of the product is required'}
+
+
+def test_unknown_routes_are_not_found(asgi):
+    assert asgi.get('/missing')[0] == 404
+    assert asgi.request('PUT', '/products')[0] == 405
+
+
+def test_missing_token_is_rejected(asgi):
+    asgi.token = None
+    status, _, body = asgi.get('/products')
+
+    assert status == 401
+    assert 'message' in json.loads(body)
+
+
+@pytest.mark.parametrize('accept, query, expected', [
+    (None, 'format=ndjson', True),
+    (NDJSON, '', True),
+    (f'{NDJSON}, application/json;q=0.5', '', True),
+    (f'application/json;q=0.1, {NDJSON}', '', True),
+    (f'{NDJSON};q=0.5, application/json', '', False),
+    ('application/json', '', False),
+    ('*/*', '', False),
+    (None, '', False),
+])
+@pytest.mark.parametrize('path', ['/products', '/categories'])
+def test_ndjson_negotiation_matches_flask(client, asgi, path, accept, query, expected):
+    headers = {'Accept': accept} if accept else {}
+    _, flask_headers, flask_body = _flask(client, 'GET', path, headers=headers, query=query)
+    status, asgi_headers, body = asgi.get(path, headers=headers, query=query)
+
+    assert status == 200
+    assert (flask_headers['Content-Type'] == NDJSON) is expected
+    assert (asgi_headers['content-type'] == NDJSON) is expected
+    if expected:
+        assert body.decode().splitlines() == flask_body.decode().splitlines()
+        assert len(body.decode().splitlines()) == len(json.loads(_flask(client, 'GET', path)[2]))
+    else:
+        assert json.loads(body) == json.loads(flask_body)
@@ -0,0 +1,91 @@
+"""
+Pruebas de la carga masiva: 201 si se crean todos los elementos, 207 si
+solo algunos, 400 si ninguno o si el cuerpo no es válido, con el resultado de
+cada elemento en el orden de entrada.
+"""
+
+import pytest
+
+from tests.conftest import SAMPLE_DATA
+
+NDJSON = 'application/x-ndjson'
+
+
+def test_products_all_created(client):
+    response = client.post('/products/bulk', json=[{'name': 'Tie', 'category': 'men', 'price': 15},
+                                                   {'name': 'Cap', 'category': 'Kids', 'price': 7.5}])
+
+    assert response.status_code == 201
+    body = response.get_json()
+    assert (body['created'], body['failed']) == (2, 0)
+    created = [result['product'] for result in body['results']]
+    assert [product['name'] for product in created] == ['Tie', 'Cap']
+    # IDs consecutivos después del mayor existente
+    assert [product['id'] for product in created] == [7, 8]
+    assert client.get('/products/8').get_json()['category'] == 'Kids'
+
+
+def test_products_partial_failure(client):
+    response = client.post('/products/bulk', json=[{'name': 'Tie', 'category': 'men', 'price': 15},
+                                                   {'name': 'Toy', 'category': 'missing', 'price': 10},
+                                                   'not an object'])
+
+    assert response.status_code == 207
+    body = response.get_json()
+    assert (body['created'], body['failed']) == (1, 2)
+    assert [result['status'] for result in body['results']] == [201, 400, 400]
+    assert [result['index'] for result in body['results']] == [0, 1, 2]
+    assert "'missing' no existe" in body['results'][1]['message']
+    assert len(client.get('/products').get_json()) == len(SAMPLE_DATA['products']) + 1
+
+
+@pytest.mark.parametrize('price', [True, '12.5', None, float('inf'), [1]])
+def test_products_price_must_be_a_json_number(client, price):
+    response = client.post('/products/bulk', json=[{'name': 'Tie', 'category': 'men', 'price': price}])
+
+    assert response.status_code == 400
+    assert response.get_json()['results'][0]['message'].startswith('El precio')
+
+
+def test_products_ndjson_body(client):
+    body = b'{"name": "Tie", "category": "men", "price": 15}\n\n{"name": "Cap", "category": "kids", "price": 7}\n'
+    response = client.post('/products/bulk', data=body, content_type=NDJSON + '; charset=utf-8')
+
+    assert response.status_code == 201
+    assert response.get_json()['created'] == 2
+
+
+@pytest.mark.parametrize('arguments, message', [
+    ({'json': {'name': 'Tie'}}, 'arreglo'),
+    ({'json': []}, 'vacío'),
+    ({'data': b'{"name": "Tie"}\n{bad\n', 'content_type': NDJSON}, 'Línea 2'),
+])
+def test_invalid_bodies_are_rejected(client, arguments, message):
+    response = client.post('/products/bulk', **arguments)
+
+    assert response.status_code == 400
+    assert message in response.get_json()['message']
+
+
+def test_bulk_requires_a_token(client):
+    del client.environ_base['HTTP_AUTHORIZATION']
+    assert client.post('/products/bulk', json=[{'name': 'Tie', 'category': 'men', 'price': 1}]).status_code == 401
+
+
+def test_favorites_statuses(client):
+    created = client.post('/favorites/bulk', json=[{'user_id': 3, 'product_id': 4},
+                                                   {'user_id': 3, 'product_id': 5}])
+    assert created.status_code == 201
+
+    partial = client.post('/favorites/bulk', json=[{'user_id': 3, 'product_id': 6},
+                                                   {'user_id': 3, 'product_id': 6},
+                                                   {'user_id': 3, 'product_id': 99},
+                                                   {'user_id': True, 'product_id': 1}])
+    assert partial.status_code == 207
+    assert [result['status'] for result in partial.get_json()['results']] == [201, 400, 400, 400]
+
+    failed = client.post('/favorites/bulk', json=[{'user_id': 3, 'product_id': 4}])
+    assert failed.status_code == 400
+    assert failed.get_json()['results'][0]['message'] == 'Este producto ya está en favoritos'
+    favorites = client.get('/favorites', query_string={'user_id': 3}).get_json()
+    assert [favorite['product_id'] for favorite in favorites] == [4, 5, 6]
@@ -0,0 +1,112 @@
+"""
+Pruebas de los GET condicionales: ETag fuerte y Last-Modified derivados de la
+versión de los datos, 304 sin consultar los repositorios y las mismas reglas
+en app.py y asgi_app.py.
+"""
+
+import time
+
+import pytest
+from werkzeug.http import http_date
+
+from container import AppContainer
+
+
+def _validators(client, path, **kwargs):
+    response = client.get(path, **kwargs)
+    assert response.status_code == 200
+    return response.headers['ETag'], response.headers['Last-Modified']
+
+
+@pytest.mark.parametrize('path', ['/products', '/products/1', '/categories', '/categories/1'])
+def test_matching_etag_is_not_modified(client, path):
+    etag, _ = _validators(client, path)
+
+    response = client.get(path, headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.data == b''
+    assert response.headers['ETag'] == etag
+
+
+def test_etag_is_strong_and_depends_on_the_variant(client):
+    etag, _ = _validators(client, '/products')
+
+    assert etag.startswith('"products-') and not etag.startswith('W/')
+    assert _validators(client, '/products', query_string={'limit': 2})[0] != etag
+    assert _validators(client, '/products', headers={'Accept': 'application/x-ndjson'})[0] != etag
+    assert _validators(client, '/products')[0] == etag
+
+
+@pytest.mark.parametrize('if_none_match, status', [
+    ('"other"', 200),
+    ('*', 304),
+    ('"other", {etag}', 304),
+    ('W/{etag}', 304),
+])
+def test_if_none_match_forms(client, if_none_match, status):
+    etag, _ = _validators(client, '/categories')
+
+    assert client.get('/categories', headers={'If-None-Match': if_none_match.format(etag=etag)}).status_code == status
+
+
+@pytest.mark.parametrize('path, write', [
+    ('/products', lambda client: client.post('/products', json={'name': 'Tie', 'category': 'men', 'price': 1})),
+    ('/categories', lambda client: client.post('/categories', json={'name': 'shoes'})),
+    ('/products', lambda client: client.delete('/categories', json={'name': 'kids'},
+                                               query_string={'cascade': 'true'})),
+])
+def test_writes_change_the_etag(client, path, write):
+    etag, _ = _validators(client, path)
+    assert write(client).status_code in (200, 201)
+
+    response = client.get(path, headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert response.headers['ETag'] != etag
+
+
+def test_if_modified_since(client):
+    _, last_modified = _validators(client, '/categories')
+
+    assert client.get('/categories', headers={'If-Modified-Since': last_modified}).status_code == 304
+    assert client.get('/categories', headers={'If-Modified-Since': http_date(0)}).status_code == 200
+    assert client.get('/categories', headers={'If-Modified-Since': 'not a date'}).status_code == 200
+
+
+def test_if_none_match_takes_precedence_over_if_modified_since(client):
+    _, last_modified = _validators(client, '/categories')
+
+    response = client.get('/categories', headers={'If-None-Match': '"other"',
+                                                  'If-Modified-Since': last_modified})
+    assert response.status_code == 200
+
+
+def test_not_modified_does_not_read_the_repositories(client, monkeypatch):
+    etag, _ = _validators(client, '/products')
+    repository = AppContainer().product_service.repository
+
+    def fail(*args, **kwargs):
+        raise AssertionError('304 no debe consultar el repositorio')
+
+    monkeypatch.setattr(repository, 'get_all', fail)
+    assert client.get('/products', headers={'If-None-Match': etag}).status_code == 304
+
+
+def test_favorites_are_not_conditional(client):
+    response = client.get('/favorites')
+
+    assert response.status_code == 200
+    assert 'ETag' not in response.headers
+
+
+@pytest.mark.parametrize('path, query', [('/products', ''), ('/products', 'limit=2'), ('/categories/2', '')])
+def test_asgi_uses_the_same_validators(client, asgi, path, query):
+    flask_response = client.get(path, query_string=query)
+    status, headers, _ = asgi.get(path, query=query)
+
+    assert status == 200
+    assert headers['etag'] == flask_response.headers['ETag']
+    assert headers['last-modified'] == flask_response.headers['Last-Modified']
+    assert asgi.get(path, query=query, headers={'If-None-Match': headers['etag']})[0] == 304
+    assert asgi.get(path, query=query, headers={'If-Modified-Since': headers['last-modified']})[0] == 304
+    future = http_date(time.time() + 100)
+    assert asgi.get(path, query=query, headers={'If-None-Match': '"x"', 'If-Modified-Since': future})[0] == 200
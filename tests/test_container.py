@@ -0,0 +1,53 @@
+"""
+Pruebas del contenedor de la aplicación: servicios, repositorios y parsers
+se construyen una vez por proceso y las peticiones los reutilizan.
+"""
+
+from container import AppContainer
+from repositories.product_repository import ProductRepository
+from services.product_service import ProductService
+from utils.connection_factory import ConnectionFactory
+
+
+def test_container_is_built_once(db_file):
+    container = AppContainer(db_file)
+    product_service = container.product_service
+
+    again = AppContainer(db_file)
+    assert again is container
+    assert again.product_service is product_service
+    assert container.products() == {'service': product_service, 'parser': container.product_parser}
+    assert container.favorites()['service'] is container.favorite_service
+
+
+def test_services_share_the_store(db_file, backend):
+    container = AppContainer(db_file)
+    store = ConnectionFactory.create(db_file)
+
+    assert container.product_service.repository.db is store
+    assert container.category_service.repository.db is store
+    assert container.favorite_service.product_repository is container.product_service.repository
+    assert container.stats_service.product_repository is container.product_service.repository
+
+
+def test_requests_do_not_build_services_or_parsers(client, monkeypatch):
+    built = []
+    monkeypatch.setattr(ProductService, '__init__', lambda *args, **kwargs: built.append('service'))
+    monkeypatch.setattr(ProductRepository, '__init__', lambda *args, **kwargs: built.append('repository'))
+    parser = AppContainer().product_parser
+    arguments = list(parser.args)
+
+    assert client.get('/products').status_code == 200
+    assert client.post('/products', json={'name': 'Tie', 'category': 'men', 'price': 15}).status_code == 201
+    assert client.post('/products', json={'name': 'Cap', 'category': 'kids', 'price': 7}).status_code == 201
+
+    assert built == []
+    # parse_args no agrega argumentos al parser compartido
+    assert parser.args == arguments
+
+
+def test_asgi_uses_the_same_services(client, asgi):
+    container = AppContainer()
+
+    assert asgi.app.products.service is container.product_service
+    assert asgi.app.favorites.service is container.favorite_service
@@ -0,0 +1,98 @@
+"""
+Pruebas de la lectura de varios productos por ID (GET /products?ids=) y de
+los favoritos con su producto embebido (GET /favorites?expand=product), que
+resuelven todos los IDs con una sola consulta.
+"""
+
+import pytest
+
+from container import AppContainer
+from tests.conftest import SAMPLE_DATA
+
+PRODUCTS = {product['id']: product for product in SAMPLE_DATA['products']}
+
+
+def _count_lookups(monkeypatch, repository):
+    """Cuenta las llamadas a get_by_ids e impide las búsquedas de a un producto."""
+    calls = []
+    get_by_ids = repository.get_by_ids
+
+    def counted(ids):
+        calls.append(list(ids))
+        return get_by_ids(ids)
+
+    def single(*args):
+        raise AssertionError('Se debe usar una sola consulta por IDs')
+
+    monkeypatch.setattr(repository, 'get_by_ids', counted)
+    monkeypatch.setattr(repository, 'get_by_id', single)
+    return calls
+
+
+def test_products_by_ids_keep_the_requested_order(client, monkeypatch):
+    calls = _count_lookups(monkeypatch, AppContainer().product_service.repository)
+    response = client.get('/products', query_string={'ids': '5,99,1,5'})
+
+    assert response.status_code == 200
+    # Los IDs inexistentes se omiten y los repetidos se devuelven una vez
+    assert response.get_json() == [PRODUCTS[5], PRODUCTS[1]]
+    assert calls == [[5, 99, 1]]
+
+
+def test_products_by_ids_with_projection(client):
+    response = client.get('/products', query_string={'ids': '2,3', 'fields': 'id,price'})
+
+    assert response.get_json() == [{'id': 2, 'price': 45.5}, {'id': 3, 'price': 5.0}]
+
+
+@pytest.mark.parametrize('ids, message', [
+    ('', 'vacío'),
+    ('1,a', 'números enteros'),
+    (','.join(str(product_id) for product_id in range(1002)), 'como máximo'),
+])
+def test_invalid_id_lists_are_rejected(client, ids, message):
+    response = client.get('/products', query_string={'ids': ids})
+
+    assert response.status_code == 400
+    assert message in response.get_json()['message']
+
+
+def test_favorites_expand_product_in_one_lookup(client, monkeypatch):
+    calls = _count_lookups(monkeypatch, AppContainer().favorite_service.product_repository)
+    response = client.get('/favorites', query_string={'user_id': 1, 'expand': 'product'})
+
+    assert response.status_code == 200
+    assert response.get_json() == [{'user_id': 1, 'product_id': 1, 'product': PRODUCTS[1]},
+                                   {'user_id': 1, 'product_id': 2, 'product': PRODUCTS[2]}]
+    assert calls == [[1, 2]]
+
+
+def test_expand_all_favorites(client):
+    favorites = client.get('/favorites', query_string={'expand': 'product'}).get_json()
+
+    assert [favorite['product']['name'] for favorite in favorites] == ['Red Shirt', 'Blue Dress', 'Red Pants']
+
+
+def test_expanded_favorites_follow_product_changes(client):
+    client.post('/favorites', json={'user_id': 3, 'product_id': 4})
+    assert client.get('/favorites', query_string={'user_id': 3, 'expand': 'product'}).get_json()[0]['product'] == \
+        PRODUCTS[4]
+
+    # Eliminar la categoría en cascada elimina también los favoritos de sus productos
+    client.delete('/categories', json={'name': 'kids'}, query_string={'cascade': 'true'})
+    assert client.get('/favorites', query_string={'user_id': 3, 'expand': 'product'}).get_json() == []
+
+
+def test_invalid_expand_is_rejected(client):
+    response = client.get('/favorites', query_string={'user_id': 1, 'expand': 'category'})
+
+    assert response.status_code == 400
+    assert 'product' in response.get_json()['message']
+
+
+def test_asgi_expand_matches_flask(client, asgi):
+    query = 'user_id=1&expand=product'
+    status, _, body = asgi.get('/favorites', query=query)
+
+    assert status == 200
+    assert body == client.get('/favorites', query_string=query).data
@@ -0,0 +1,167 @@
+"""
+Pruebas de favoritos con los dos backends: consultas por usuario y por par
+(usuario, producto), altas, bajas y duplicados, y la integridad con los
+productos: no se agregan favoritos de productos inexistentes y la eliminación
+en cascada de una categoría elimina los favoritos de sus productos.
+"""
+
+import pytest
+
+from repositories.category_repository import CategoryRepository
+from repositories.favorite_repository import FavoriteRepository
+from repositories.product_repository import ProductRepository
+from services.category_service import CategoryService
+from services.favorite_service import FavoriteService
+from tests.conftest import read_db
+from utils.connection_factory import ConnectionFactory
+from utils.data_store import DataStore
+from utils.integrity import IntegrityError
+from utils.records import as_dicts
+from utils.storage_config import StorageConfig
+
+
+@pytest.fixture
+def favorites(backend):
+    return FavoriteService(FavoriteRepository(backend), ProductRepository(backend))
+
+
+def _product_ids(favorites, user_id):
+    return [favorite['product_id'] for favorite in favorites.get_user_favorites(user_id)]
+
+
+def test_user_favorites_keep_insertion_order(favorites):
+    favorites.add_favorite(1, 6)
+    favorites.add_favorite(1, 3)
+
+    assert _product_ids(favorites, 1) == [1, 2, 6, 3]
+    assert _product_ids(favorites, 99) == []
+
+
+def test_pair_lookup(favorites):
+    assert favorites.repository.exists(1, 2)
+    assert not favorites.repository.exists(1, 3)
+    assert not favorites.repository.exists(99, 2)
+
+
+def test_duplicate_favorite_is_rejected(favorites):
+    with pytest.raises(ValueError, match='ya está en favoritos'):
+        favorites.add_favorite(1, 2)
+    assert _product_ids(favorites, 1) == [1, 2]
+
+
+def test_remove_favorite(favorites):
+    assert favorites.remove_favorite(1, 1)
+
+    assert _product_ids(favorites, 1) == [2]
+    assert not favorites.repository.exists(1, 1)
+    with pytest.raises(ValueError, match='no existe'):
+        favorites.remove_favorite(1, 1)
+    # Volver a agregar lo deja al final
+    favorites.add_favorite(1, 1)
+    assert _product_ids(favorites, 1) == [2, 1]
+
+
+def test_last_favorite_of_a_user_can_be_removed_and_added_again(favorites):
+    favorites.remove_favorite(2, 3)
+    assert _product_ids(favorites, 2) == []
+    favorites.add_favorite(2, 3)
+    assert _product_ids(favorites, 2) == [3]
+
+
+def test_product_ids_count_each_pair_once(favorites, backend):
+    store = ConnectionFactory.create(backend)
+    # Un par repetido en los datos cuenta una sola vez
+    store.apply_favorite_changes([('add', {'user_id': 2, 'product_id': 4}),
+                                  ('add', {'user_id': 2, 'product_id': 4})])
+
+    assert sorted(store.get_favorite_product_ids()) == [1, 2, 3, 4]
+    assert as_dicts(favorites.get_user_favorites(2)) == [{'user_id': 2, 'product_id': 3},
+                                                        {'user_id': 2, 'product_id': 4}]
+
+
+def test_favorite_requires_an_existing_product(favorites):
+    with pytest.raises(ValueError, match='El producto no existe'):
+        favorites.add_favorite(1, 99)
+    results = favorites.add_favorites([{'user_id': 3, 'product_id': 99},
+                                       {'user_id': 3, 'product_id': 4}])
+    assert [result['status'] for result in results] == [400, 201]
+    assert _product_ids(favorites, 3) == [4]
+
+
+def test_store_rejects_a_batch_with_a_missing_product(backend):
+    store = ConnectionFactory.create(backend)
+
+    with pytest.raises(IntegrityError):
+        store.add_favorites([{'user_id': 3, 'product_id': 4}, {'user_id': 3, 'product_id': 99}])
+
+    # Todo el lote o nada
+    assert as_dicts(store.get_user_favorites(3)) == []
+
+
+def test_product_deleted_after_validation_is_rejected_by_the_store(favorites):
+    # Simula un producto eliminado entre la validación del servicio y la escritura:
+    # la primera consulta lo encuentra y las siguientes ya no
+    lookup = favorites.product_repository.get_by_ids
+
+    def stale_lookup(ids):
+        favorites.product_repository.get_by_ids = lookup
+        return [{'id': product_id} for product_id in ids]
+
+    favorites.product_repository.get_by_ids = stale_lookup
+
+    results = favorites.add_favorites([{'user_id': 3, 'product_id': 99},
+                                       {'user_id': 3, 'product_id': 4}])
+
+    # El lote se reintenta sin el elemento que rechazó el almacén
+    assert results[0] == {'index': 0, 'status': 400, 'message': 'El producto no existe'}
+    assert results[1]['status'] == 201
+    assert _product_ids(favorites, 3) == [4]
+
+
+def test_grouped_changes_reject_only_missing_products(backend):
+    store = ConnectionFactory.create(backend)
+
+    errors = store.apply_favorite_changes([('add', {'user_id': 3, 'product_id': 99}),
+                                           ('add', {'user_id': 3, 'product_id': 4}),
+                                           ('remove', {'user_id': 1, 'product_id': 1})])
+
+    assert isinstance(errors[0], IntegrityError)
+    assert errors[1:] == [None, None]
+    assert as_dicts(store.get_user_favorites(3)) == [{'user_id': 3, 'product_id': 4}]
+    assert not store.has_favorite(1, 1)
+
+
+def test_group_commit_reports_a_missing_product_to_its_request(backend, monkeypatch):
+    monkeypatch.setenv('DB_GROUP_COMMIT_ENABLED', '1')
+    favorites = FavoriteService(FavoriteRepository(backend), ProductRepository(backend))
+    assert favorites.repository.write_queue is not None
+
+    with pytest.raises(ValueError, match='El producto no existe'):
+        favorites.add_favorite(3, 99)
+    favorites.add_favorite(3, 4)
+    assert _product_ids(favorites, 3) == [4]
+
+
+def test_cascade_removes_the_favorites_of_deleted_products(backend):
+    favorites = FavoriteService(FavoriteRepository(backend), ProductRepository(backend))
+    categories = CategoryService(CategoryRepository(backend))
+    store = ConnectionFactory.create(backend)
+
+    categories.delete_category('men', 'true')
+
+    # (1, 1) referenciaba a Red Shirt y (2, 3) a Red Pants, ambos de men
+    assert as_dicts(store.get_favorites()) == [{'user_id': 1, 'product_id': 2}]
+    assert _product_ids(favorites, 2) == []
+    assert sorted(store.get_favorite_product_ids()) == [2]
+
+
+def test_cascade_of_favorites_survives_journal_replay(db_file, journaled):
+    CategoryService(CategoryRepository(db_file)).delete_category('men', 'true')
+    # El snapshot no cambió: las eliminaciones solo están en el journal
+    assert len(read_db(db_file)['favorites']) == 3
+
+    DataStore._instances.clear()
+    StorageConfig._instance = None
+    assert as_dicts(DataStore(db_file).get_favorites()) == [{'user_id': 1, 'product_id': 2}]
+    DataStore(db_file).db.compact()
+    assert read_db(db_file)['favorites'] == [{'user_id': 1, 'product_id': 2}]
@@ -0,0 +1,112 @@
+"""
+Pruebas de escritura concurrente desde varios procesos: el bloqueo de
+archivo serializa los flush y cada proceso recarga lo escrito por los demás
+antes de escribir, así no se pierde ninguna mutación.
+"""
+
+import glob
+import multiprocessing
+import threading
+
+import pytest
+
+from tests.conftest import read_db
+from utils.database_connection import DatabaseConnection
+from utils.file_lock import FileLock
+
+WORKERS = 4
+WRITES_PER_WORKER = 25
+
+
+def _add_categories(db_file, journaled, worker):
+    connection = DatabaseConnection(db_file, journaled=journaled)
+    connection.connect()
+    for index in range(WRITES_PER_WORKER):
+        connection.add_category({'id': 100 * (worker + 1) + index, 'name': f'w{worker}-{index}'})
+
+
+def _run_workers(db_file, journaled):
+    context = multiprocessing.get_context('fork')
+    processes = [context.Process(target=_add_categories, args=(db_file, journaled, worker))
+                 for worker in range(WORKERS)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join(60)
+    assert [process.exitcode for process in processes] == [0] * WORKERS
+
+
+@pytest.mark.parametrize('journaled', [False, True], ids=['snapshot', 'journal'])
+def test_concurrent_processes_do_not_lose_writes(db_file, journaled):
+    _run_workers(db_file, journaled)
+
+    connection = DatabaseConnection(db_file, journaled=journaled)
+    connection.connect()
+    names = [category['name'] for category in connection.get_categories()]
+    expected = {f'w{worker}-{index}' for worker in range(WORKERS) for index in range(WRITES_PER_WORKER)}
+    assert len(names) == 3 + WORKERS * WRITES_PER_WORKER
+    assert expected <= set(names)
+    # Ningún archivo temporal queda sin reemplazar
+    assert not glob.glob(db_file + '.*.tmp')
+
+
+def test_snapshot_is_always_complete_json(db_file):
+    _run_workers(db_file, journaled=False)
+    assert len(read_db(db_file)['categories']) == 3 + WORKERS * WRITES_PER_WORKER
+
+
+def test_writer_reloads_changes_from_another_process(db_file):
+    first = DatabaseConnection(db_file)
+    first.connect()
+    second = DatabaseConnection(db_file)
+    second.connect()
+
+    first.add_category({'id': 4, 'name': 'shoes'})
+    # second aún tiene la copia anterior: al escribir debe recargar y conservar 'shoes'
+    second.add_category({'id': 5, 'name': 'sports'})
+
+    assert [category['name'] for category in read_db(db_file)['categories']][-2:] == ['shoes', 'sports']
+
+
+def test_file_lock_excludes_other_processes(tmp_path):
+    lock_path = str(tmp_path / 'db.json.lock')
+    context = multiprocessing.get_context('fork')
+    start = context.Event()
+    acquired = context.Event()
+
+    def take_lock():
+        start.wait(10)
+        with FileLock(lock_path):
+            acquired.set()
+
+    # El proceso se crea antes de tomar el lock: un fork no hereda el estado del hilo que lo tiene
+    process = context.Process(target=take_lock)
+    process.start()
+    with FileLock(lock_path):
+        start.set()
+        # Mientras este proceso tenga el lock, el otro no puede tomarlo
+        assert not acquired.wait(0.3)
+    assert acquired.wait(10)
+    process.join(10)
+    assert process.exitcode == 0
+
+
+def test_failed_acquire_releases_the_thread_lock(tmp_path):
+    # La carpeta no existe: open falla al tomar el lock
+    lock = FileLock(str(tmp_path / 'missing' / 'db.json.lock'))
+    with pytest.raises(FileNotFoundError):
+        with lock:
+            pass
+
+    # Otro hilo puede volver a intentarlo sin quedar bloqueado
+    (tmp_path / 'missing').mkdir()
+    acquired = threading.Event()
+
+    def take_lock():
+        with lock:
+            acquired.set()
+
+    thread = threading.Thread(target=take_lock, daemon=True)
+    thread.start()
+    assert acquired.wait(5)
+    thread.join(5)
@@ -0,0 +1,118 @@
+"""
+Pruebas del group commit: las mutaciones concurrentes se guardan en grupos
+y cada petición recibe el error de la escritura de su grupo.
+"""
+
+import threading
+import time
+
+import pytest
+
+from repositories.favorite_repository import FavoriteRepository
+from utils.group_commit import GroupCommitQueue
+from utils.records import Favorite
+
+
+def _submit_concurrently(queue, changes):
+    """Envía cada cambio desde su propio hilo y retorna {cambio: excepción o None}."""
+    results = {}
+
+    def submit(change):
+        try:
+            queue.submit(change, timeout=10)
+            results[change] = None
+        except Exception as e:
+            results[change] = e
+
+    threads = [threading.Thread(target=submit, args=(change,)) for change in changes]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(15)
+    return results
+
+
+def test_concurrent_writes_are_grouped():
+    batches = []
+
+    def commit_batch(changes):
+        time.sleep(0.01)
+        batches.append(list(changes))
+
+    queue = GroupCommitQueue('test-grouped', commit_batch, batch_size=64, max_delay_ms=20)
+    results = _submit_concurrently(queue, range(40))
+
+    assert all(error is None for error in results.values())
+    assert sorted(change for batch in batches for change in batch) == list(range(40))
+    assert len(batches) < 40
+    stats = queue.stats()
+    assert stats['writes'] == 40
+    assert stats['batches'] == len(batches)
+
+
+def test_batches_respect_batch_size():
+    batches = []
+    queue = GroupCommitQueue('test-batch-size', lambda changes: batches.append(list(changes)),
+                             batch_size=4, max_delay_ms=20)
+    _submit_concurrently(queue, range(20))
+
+    assert max(len(batch) for batch in batches) <= 4
+    assert sum(len(batch) for batch in batches) == 20
+
+
+def test_write_error_is_raised_in_every_request_of_the_group():
+    failing = threading.Event()
+    failing.set()
+
+    def commit_batch(changes):
+        if failing.is_set():
+            raise ValueError("disco lleno")
+
+    queue = GroupCommitQueue('test-errors', commit_batch, batch_size=64, max_delay_ms=20)
+    results = _submit_concurrently(queue, range(10))
+    assert all(isinstance(error, ValueError) and str(error) == "disco lleno" for error in results.values())
+
+    # El hilo escritor sigue funcionando después del error
+    failing.clear()
+    queue.submit('ok', timeout=10)
+
+
+def test_abandoned_write_is_never_applied():
+    applied = []
+    release = threading.Event()
+
+    def commit_batch(changes):
+        release.wait(10)
+        applied.extend(changes)
+
+    queue = GroupCommitQueue('test-abandoned', commit_batch, batch_size=1, max_delay_ms=0)
+    blocker = threading.Thread(target=queue.submit, args=('first',))
+    blocker.start()
+    time.sleep(0.05)  # El hilo escritor toma 'first' y queda esperando
+
+    with pytest.raises(Exception, match="Tiempo de espera agotado"):
+        queue.submit('late', timeout=0.1)
+    release.set()
+    blocker.join(10)
+    queue.submit('after', timeout=10)
+
+    assert applied == ['first', 'after']
+
+
+def test_repository_writes_favorites_through_the_queue(db_file):
+    repository = FavoriteRepository(db_file)
+    assert repository.write_queue is not None
+
+    def add(index):
+        repository.add(Favorite(index % 5 + 10, 1))
+
+    threads = [threading.Thread(target=add, args=(index,)) for index in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(15)
+
+    # Los pares repetidos dentro de un grupo o entre grupos se guardan una sola vez
+    pairs = [(favorite['user_id'], favorite['product_id']) for favorite in repository.get_all()]
+    assert sorted(pair for pair in pairs if pair[0] >= 10) == [(user_id, 1) for user_id in range(10, 15)]
+    assert repository.write_queue.stats()['writes'] == 20
@@ -0,0 +1,115 @@
+"""
+Pruebas de integridad referencial entre productos y categorías, con los dos
+backends: una categoría con productos solo se elimina con cascade y ningún
+producto se guarda con una categoría inexistente.
+"""
+
+import pytest
+
+from repositories.category_repository import CategoryRepository
+from repositories.product_repository import ProductRepository
+from services.category_service import CategoryService
+from services.product_service import ProductService
+from tests.conftest import read_db
+from utils.connection_factory import ConnectionFactory
+from utils.data_store import DataStore
+from utils.integrity import IntegrityError
+from utils.storage_config import StorageConfig
+
+
+@pytest.fixture
+def categories(backend):
+    return CategoryService(CategoryRepository(backend))
+
+
+@pytest.fixture
+def products(backend):
+    return ProductService(ProductRepository(backend), CategoryRepository(backend))
+
+
+def _ids(products):
+    return sorted(product['id'] for product in products)
+
+
+def test_restrict_keeps_a_category_with_products(categories, products):
+    with pytest.raises(IntegrityError, match='tiene 3 productos'):
+        categories.delete_category('men')
+
+    assert categories.repository.get_by_name('men') is not None
+    assert _ids(products.get_products_by_category('men')) == [1, 3, 6]
+
+
+def test_empty_category_is_deleted_without_cascade(categories):
+    categories.create_category('shoes')
+
+    assert categories.delete_category('SHOES') == 0
+    assert categories.repository.get_by_name('shoes') is None
+
+
+def test_cascade_deletes_the_category_and_its_products(categories, products):
+    assert categories.delete_category('Men', 'true') == 3
+
+    assert categories.repository.get_by_name('men') is None
+    assert products.get_products_by_category('men') == []
+    assert _ids(products.get_all_products()) == [2, 4, 5]
+    assert products.get_product_by_id(1) is None
+    # Los índices de búsqueda y de precio tampoco conservan los productos eliminados
+    assert _ids(products.search_products('red')) == [4]
+    assert _ids(products.get_products_by_price(None, '10', None, None, None, None)['items']) == [4]
+
+
+def test_unknown_category_is_not_found(categories):
+    with pytest.raises(ValueError, match='no encontrada'):
+        categories.delete_category('missing', 'true')
+
+
+def test_invalid_cascade_flag_is_rejected(categories):
+    with pytest.raises(ValueError, match='cascade'):
+        categories.delete_category('men', 'maybe')
+
+
+def test_products_require_an_existing_category(categories, products):
+    categories.delete_category('kids', 'true')
+
+    with pytest.raises(ValueError, match="'kids' no existe"):
+        products.create_product('Toy', 'kids', 10.0)
+    results = products.create_products([{'name': 'Toy', 'category': 'kids', 'price': 10},
+                                        {'name': 'Tie', 'category': 'men', 'price': 15}])
+    assert [result['status'] for result in results] == [400, 201]
+
+
+def test_store_rejects_a_batch_with_a_missing_category(backend):
+    store = ConnectionFactory.create(backend)
+    before = len(store.get_products())
+
+    with pytest.raises(IntegrityError):
+        store.add_products([{'id': 50, 'name': 'Tie', 'category': 'men', 'price': 15.0},
+                            {'id': 51, 'name': 'Toy', 'category': 'missing', 'price': 10.0}])
+
+    # Todo el lote o nada
+    assert len(store.get_products()) == before
+
+
+def test_category_deleted_after_validation_is_rejected_by_the_store(categories, products):
+    # Simula una categoría eliminada entre la validación del servicio y la escritura
+    products.category_repository.get_by_name = lambda name: {'name': name}
+    categories.delete_category('kids', 'true')
+
+    with pytest.raises(IntegrityError):
+        products.create_product('Toy', 'kids', 10.0)
+    assert products.get_products_by_category('kids') == []
+
+
+def test_cascade_survives_journal_replay(db_file, journaled):
+    categories = CategoryService(CategoryRepository(db_file))
+    assert categories.delete_category('women', 'true') == 2
+    # El snapshot no cambió: la eliminación solo está en el journal
+    assert len(read_db(db_file)['products']) == 6
+
+    # Otro proceso que arranca desde el snapshot y el journal
+    DataStore._instances.clear()
+    StorageConfig._instance = None
+    reloaded = ProductService(ProductRepository(db_file), CategoryRepository(db_file))
+    assert reloaded.get_products_by_category('women') == []
+    assert _ids(reloaded.get_all_products()) == [1, 3, 4, 6]
+    assert CategoryRepository(db_file).get_by_name('women') is None
@@ -0,0 +1,92 @@
+"""
+Pruebas del journal (write-ahead log) de DatabaseConnection: las mutaciones
+se agregan al log sin reescribir db.json, se reaplican al cargar y la
+compactación las consolida en el snapshot.
+"""
+
+import os
+
+from tests.conftest import read_db
+from utils.database_connection import DatabaseConnection, JOURNAL_KEY
+
+
+def _connect(db_file):
+    connection = DatabaseConnection(db_file, journaled=True)
+    connection.connect()
+    return connection
+
+
+def _product_names(connection):
+    return [product['name'] for product in connection.get_products()]
+
+
+def test_mutations_are_appended_to_the_log_without_rewriting_the_snapshot(db_file):
+    with open(db_file, 'rb') as json_file:
+        snapshot = json_file.read()
+
+    connection = _connect(db_file)
+    connection.add_product({'id': 7, 'name': 'Scarf', 'price': 9.5, 'category': 'women'})
+    connection.add_category({'id': 4, 'name': 'shoes'})
+
+    with open(db_file, 'rb') as json_file:
+        assert json_file.read() == snapshot
+    with open(connection.journal_path) as journal_file:
+        assert len(journal_file.readlines()) == 2
+    assert connection.pending_journal_entries() == 2
+
+
+def test_journal_is_replayed_on_load(db_file):
+    connection = _connect(db_file)
+    connection.add_product({'id': 7, 'name': 'Scarf', 'price': 9.5, 'category': 'women'})
+    connection.remove_favorite(1, 2)
+
+    reloaded = _connect(db_file)
+    assert _product_names(reloaded)[-1] == 'Scarf'
+    assert [(favorite['user_id'], favorite['product_id']) for favorite in reloaded.get_favorites()] == [(1, 1), (2, 3)]
+
+
+def test_incomplete_last_entry_is_ignored(db_file):
+    connection = _connect(db_file)
+    connection.add_product({'id': 7, 'name': 'Scarf', 'price': 9.5, 'category': 'women'})
+    with open(connection.journal_path, 'a') as journal_file:
+        journal_file.write('{"op": "add", "collection": "products", "item": {"id": 8')
+
+    reloaded = _connect(db_file)
+    assert _product_names(reloaded)[-1] == 'Scarf'
+    assert len(reloaded.get_products()) == 7
+
+
+def test_compaction_folds_the_log_into_the_snapshot(db_file):
+    connection = _connect(db_file)
+    connection.add_product({'id': 7, 'name': 'Scarf', 'price': 9.5, 'category': 'women'})
+    connection.add_category({'id': 4, 'name': 'shoes'})
+
+    connection.compact()
+
+    assert os.path.getsize(connection.journal_path) == 0
+    assert connection.pending_journal_entries() == 0
+    data = read_db(db_file)
+    assert data[JOURNAL_KEY] == {'seq': 2}
+    assert data['products'][-1]['name'] == 'Scarf'
+    assert data['categories'][-1]['name'] == 'shoes'
+
+    # Tras compactar, las entradas nuevas continúan la secuencia y nada se aplica dos veces
+    connection.add_product({'id': 8, 'name': 'Boots', 'price': 60.0, 'category': 'women'})
+    reloaded = _connect(db_file)
+    assert _product_names(reloaded)[-2:] == ['Scarf', 'Boots']
+    assert len(reloaded.get_products()) == 8
+    assert len(reloaded.get_categories()) == 4
+
+
+def test_entries_already_in_the_snapshot_are_skipped(db_file):
+    connection = _connect(db_file)
+    connection.add_product({'id': 7, 'name': 'Scarf', 'price': 9.5, 'category': 'women'})
+    with open(connection.journal_path) as journal_file:
+        stale_entries = journal_file.read()
+    connection.compact()
+    # Una caída entre el reemplazo del snapshot y el vaciado del log deja entradas ya consolidadas
+    with open(connection.journal_path, 'w') as journal_file:
+        journal_file.write(stale_entries)
+
+    reloaded = _connect(db_file)
+    assert len(reloaded.get_products()) == 7
@@ -0,0 +1,105 @@
+"""
+Pruebas de la carga perezosa de db.json: cada colección se parsea recién al
+pedirla, las mutaciones sobre colecciones sin parsear se aplican al leerlas
+y el documento se vuelve a escribir con el mismo formato.
+"""
+
+import json
+
+from tests.conftest import SAMPLE_DATA, read_db, write_db
+from utils.data_store import DataStore
+from utils.lazy_json import LazyDocument, scan_sections
+from utils.records import RecordCodec, as_dict, as_dicts
+
+
+def test_sections_are_located_without_parsing(db_file):
+    with open(db_file, 'rb') as json_file:
+        buffer = json_file.read()
+    sections = scan_sections(buffer)
+
+    assert list(sections) == ['products', 'categories', 'favorites']
+    for key, (start, end) in sections.items():
+        assert json.loads(buffer[start:end]) == SAMPLE_DATA[key]
+
+
+def test_compact_json_has_no_sections():
+    assert scan_sections(json.dumps(SAMPLE_DATA).encode()) is None
+
+
+def test_collections_are_parsed_on_first_access(db_file):
+    document = LazyDocument(db_file, RecordCodec())
+    assert not any(document.is_parsed(key) for key in SAMPLE_DATA)
+
+    assert document.get('categories') == SAMPLE_DATA['categories']
+
+    assert document.is_parsed('categories')
+    assert not document.is_parsed('products')
+    assert not document.is_parsed('favorites')
+    assert as_dicts(document.get('products')) == SAMPLE_DATA['products']
+    assert document.get('missing', []) == []
+
+
+def test_mutations_on_unparsed_collections_are_deferred(db_file):
+    document = LazyDocument(db_file, RecordCodec())
+    scarf = {'id': 7, 'name': 'Scarf', 'price': 9.5, 'category': 'women'}
+
+    document.apply({'op': 'add', 'collection': 'products', 'item': scarf})
+
+    assert not document.is_parsed('products')
+    assert as_dict(document.get('products')[-1]) == scarf
+    assert len(document.get('products')) == 7
+
+
+def test_untouched_document_is_serialized_byte_for_byte(db_file):
+    document = LazyDocument(db_file, RecordCodec())
+    with open(db_file) as json_file:
+        assert document.serialize() == json_file.read()
+
+
+def test_serialize_mixes_parsed_and_raw_collections(db_file):
+    document = LazyDocument(db_file, RecordCodec())
+    document.apply({'op': 'add', 'collection': 'categories', 'item': {'id': 4, 'name': 'shoes'}})
+    document.apply({'op': 'remove', 'collection': 'favorites', 'match': {'user_id': 1, 'product_id': 2}})
+
+    expected = json.loads(json.dumps(SAMPLE_DATA))
+    expected['categories'].append({'id': 4, 'name': 'shoes'})
+    del expected['favorites'][1]
+    expected['_journal'] = {'seq': 3}
+    serialized = document.serialize({'_journal': {'seq': 3}})
+
+    assert serialized == json.dumps(expected, indent=4)
+    assert not document.is_parsed('products')
+
+
+def test_compact_json_is_parsed_eagerly(tmp_path):
+    path = tmp_path / 'db.json'
+    path.write_text(json.dumps(SAMPLE_DATA))
+    document = LazyDocument(str(path), RecordCodec())
+
+    assert all(document.is_parsed(key) for key in SAMPLE_DATA)
+    assert as_dicts(document.get('products')) == SAMPLE_DATA['products']
+
+
+def test_store_only_parses_the_collections_it_uses(db_file):
+    store = DataStore(db_file)
+
+    assert [category['name'] for category in store.get_categories()] == ['men', 'women', 'kids']
+    assert not store.db.data.is_parsed('products')
+    assert not store.db.data.is_parsed('favorites')
+
+    store.add_category({'id': 4, 'name': 'shoes'})
+    assert not store.db.data.is_parsed('products')
+    data = read_db(db_file)
+    assert data['products'] == SAMPLE_DATA['products']
+    assert data['categories'][-1] == {'id': 4, 'name': 'shoes'}
+
+
+def test_store_reloads_lazily_after_an_external_write(db_file):
+    store = DataStore(db_file)
+    assert len(store.get_products()) == 6
+
+    data = read_db(db_file)
+    data['products'].append({'id': 7, 'name': 'Scarf', 'price': 9.5, 'category': 'women'})
+    write_db(db_file, data)
+
+    assert store.get_product(7)['name'] == 'Scarf'
@@ -0,0 +1,48 @@
+"""
+Pruebas del endpoint /metrics en las dos aplicaciones: solo existe con
+METRICS_ENABLED, requiere token y expone los histogramas en formato Prometheus.
+"""
+
+import pytest
+
+from utils.metrics import PROMETHEUS_MIMETYPE
+
+
+@pytest.fixture
+def metrics_enabled(monkeypatch):
+    monkeypatch.setenv('METRICS_ENABLED', '1')
+
+
+def test_flask_metrics_require_a_token(metrics_enabled, client):
+    client.get('/categories')
+    response = client.get('/metrics')
+
+    assert response.status_code == 200
+    assert response.content_type == PROMETHEUS_MIMETYPE
+    text = response.get_data(as_text=True)
+    assert 'app_request_duration_seconds' in text
+    assert 'endpoint="/categories",method="GET",status="200"' in text
+
+    del client.environ_base['HTTP_AUTHORIZATION']
+    assert client.get('/metrics').status_code == 401
+
+
+def test_flask_metrics_are_not_registered_by_default(client):
+    assert client.get('/metrics').status_code == 404
+
+
+def test_asgi_metrics_require_a_token(metrics_enabled, asgi):
+    asgi.get('/categories')
+    status, headers, body = asgi.get('/metrics')
+
+    assert status == 200
+    assert headers['content-type'] == PROMETHEUS_MIMETYPE
+    assert b'app_request_duration_seconds' in body
+    assert b'method="GET",status="200"' in body
+
+    asgi.token = None
+    assert asgi.get('/metrics')[0] == 401
+
+
+def test_asgi_metrics_are_not_registered_by_default(asgi):
+    assert asgi.get('/metrics')[0] == 404
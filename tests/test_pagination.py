@@ -0,0 +1,112 @@
+"""
+Pruebas de la paginación por cursor, la proyección de campos y la exportación
+NDJSON de GET /products y GET /categories, con los dos backends.
+"""
+
+import json
+
+import pytest
+
+from tests.conftest import SAMPLE_DATA
+from utils.pagination import MAX_PAGE_SIZE
+
+NDJSON = 'application/x-ndjson'
+
+
+def _pages(client, path, limit, **params):
+    """Recorre todas las páginas siguiendo next_cursor; retorna la lista de páginas."""
+    pages, cursor = [], None
+    while True:
+        query = dict(params, limit=limit)
+        if cursor is not None:
+            query['cursor'] = cursor
+        response = client.get(path, query_string=query)
+        assert response.status_code == 200
+        page = response.get_json()
+        pages.append(page)
+        cursor = page['next_cursor']
+        if cursor is None:
+            return pages
+
+
+@pytest.mark.parametrize('path, collection, expected', [
+    ('/products', 'products', [[1, 2], [3, 4], [5, 6]]),
+    ('/categories', 'categories', [[1, 2], [3]]),
+])
+def test_cursor_pages_through_the_collection_in_id_order(client, path, collection, expected):
+    pages = _pages(client, path, 2)
+
+    assert [[item['id'] for item in page['items']] for page in pages] == expected
+    assert [item for page in pages for item in page['items']] == SAMPLE_DATA[collection]
+    assert pages[0]['next_cursor'] == '2'
+
+
+def test_last_full_page_has_no_next_cursor(client):
+    page = client.get('/products', query_string={'limit': 6}).get_json()
+
+    assert len(page['items']) == 6
+    assert page['next_cursor'] is None
+
+
+def test_cursor_is_stable_under_inserts(client):
+    first = client.get('/products', query_string={'limit': 3}).get_json()
+    client.post('/products', json={'name': 'Tie', 'category': 'men', 'price': 15})
+
+    rest = _pages(client, '/products', 3, cursor=first['next_cursor'])
+    ids = [item['id'] for page in rest for item in page['items']]
+    # Ni se repiten ni se pierden productos; el nuevo aparece al final
+    assert ids == [4, 5, 6, 7]
+
+
+def test_fields_projection(client):
+    page = client.get('/products', query_string={'limit': 2, 'fields': 'id, name,missing'}).get_json()
+    assert page['items'] == [{'id': 1, 'name': 'Red Shirt'}, {'id': 2, 'name': 'Blue Dress'}]
+
+    assert client.get('/products/3', query_string={'fields': 'price'}).get_json() == {'price': 5.0}
+    assert client.get('/categories', query_string={'fields': 'name'}).get_json() == \
+        [{'name': 'men'}, {'name': 'women'}, {'name': 'kids'}]
+    by_category = client.get('/products', query_string={'category': 'kids', 'fields': 'id,category'})
+    assert by_category.get_json() == [{'id': 4, 'category': 'kids'}]
+
+
+@pytest.mark.parametrize('path', ['/products', '/categories'])
+@pytest.mark.parametrize('query, message', [
+    ({'limit': '0'}, 'limit'),
+    ({'limit': str(MAX_PAGE_SIZE + 1)}, 'limit'),
+    ({'limit': 'ten'}, 'limit'),
+    ({'cursor': 'abc'}, 'cursor'),
+])
+def test_invalid_page_parameters_are_rejected(client, path, query, message):
+    response = client.get(path, query_string=query)
+
+    assert response.status_code == 400
+    assert message in response.get_json()['message']
+
+
+@pytest.mark.parametrize('path, collection', [('/products', 'products'), ('/categories', 'categories')])
+def test_ndjson_export_streams_every_row(client, path, collection):
+    response = client.get(path, query_string={'format': 'ndjson'})
+
+    assert response.status_code == 200
+    assert response.mimetype == NDJSON
+    assert response.is_streamed
+    rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert rows == SAMPLE_DATA[collection]
+
+
+def test_ndjson_export_applies_the_projection(client):
+    response = client.get('/products', query_string={'fields': 'id'}, headers={'Accept': NDJSON})
+
+    assert [json.loads(line) for line in response.get_data(as_text=True).splitlines()] == \
+        [{'id': product['id']} for product in SAMPLE_DATA['products']]
+
+
+def test_asgi_pages_match_flask(client, asgi):
+    status, _, body = asgi.get('/products', query='limit=4&fields=id,price')
+    assert status == 200
+    page = json.loads(body)
+    assert page == client.get('/products', query_string={'limit': 4, 'fields': 'id,price'}).get_json()
+
+    status, headers, body = asgi.get('/categories', query='format=ndjson')
+    assert headers['content-type'] == NDJSON
+    assert [json.loads(line) for line in body.decode().splitlines()] == SAMPLE_DATA['categories']
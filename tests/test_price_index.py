@@ -0,0 +1,85 @@
+"""
+Pruebas de la consulta por rango de precios: orden por (precio, ID) y
+paginación con cursor 'precio:ID' estable ante empates y altas nuevas.
+"""
+
+import pytest
+
+from repositories.category_repository import CategoryRepository
+from repositories.product_repository import ProductRepository
+from services.product_service import ProductService
+from tests.conftest import SAMPLE_DATA
+
+
+@pytest.fixture
+def service(db_file):
+    return ProductService(ProductRepository(db_file), CategoryRepository(db_file))
+
+
+def _all_pages(service, limit='2', **filters):
+    """Recorre todas las páginas siguiendo next_cursor; retorna (IDs, cantidad de páginas)."""
+    ids, pages, cursor = [], 0, None
+    while True:
+        page = service.get_products_by_price(filters.get('min_price'), filters.get('max_price'), 'price',
+                                             filters.get('category'), cursor, limit)
+        ids.extend(product['id'] for product in page['items'])
+        pages += 1
+        cursor = page['next_cursor']
+        if cursor is None:
+            return ids, pages
+
+
+def _expected(min_price=None, max_price=None, category=None):
+    products = [product for product in SAMPLE_DATA['products']
+                if (min_price is None or product['price'] >= min_price)
+                and (max_price is None or product['price'] <= max_price)
+                and (category is None or product['category'] == category)]
+    return [product['id'] for product in sorted(products, key=lambda product: (product['price'], product['id']))]
+
+
+def test_cursor_pages_through_every_product_in_price_order(service):
+    ids, pages = _all_pages(service)
+    assert ids == _expected() == [6, 3, 4, 5, 1, 2]
+    assert pages == 3
+
+
+def test_cursor_splits_products_with_the_same_price(service):
+    # Los productos 3 y 4 cuestan 5.0: el ID desempata y ninguno se repite ni se pierde
+    first = service.get_products_by_price(None, None, None, None, None, '2')
+    assert [product['id'] for product in first['items']] == [6, 3]
+    assert first['next_cursor'] == '5.0:3'
+    second = service.get_products_by_price(None, None, None, None, first['next_cursor'], '1')
+    assert [product['id'] for product in second['items']] == [4]
+
+
+def test_range_bounds_are_inclusive(service):
+    assert _all_pages(service, min_price='5', max_price='20')[0] == _expected(5, 20) == [3, 4, 5, 1]
+    assert _all_pages(service, min_price='46')[0] == []
+
+
+def test_range_within_a_category(service):
+    assert _all_pages(service, limit='1', max_price='25', category='MEN')[0] == _expected(None, 25, 'men')
+    assert _all_pages(service, category='missing')[0] == []
+
+
+def test_new_products_are_indexed_in_price_order(service):
+    first_page_cursor = service.get_products_by_price(None, None, None, None, None, '2')['next_cursor']
+    created = service.create_product('Cheap Tie', 'men', 5.0)
+
+    ids, _ = _all_pages(service)
+    assert ids == [6, 3, 4, created['id'], 5, 1, 2]
+    # Un cursor emitido antes del alta sigue siendo válido y no repite productos
+    after = service.get_products_by_price(None, None, None, None, first_page_cursor, '10')
+    assert [product['id'] for product in after['items']] == [4, created['id'], 5, 1, 2]
+
+
+@pytest.mark.parametrize('arguments, message', [
+    (('30', '10', None, None, None, None), 'min_price no puede ser mayor'),
+    (('abc', None, None, None, None, None), 'min_price'),
+    ((None, None, 'name', None, None, None), 'sort'),
+    ((None, None, None, None, 'bad', None), 'cursor'),
+    ((None, None, None, ' ', None, None), 'categoría'),
+])
+def test_invalid_parameters_are_rejected(service, arguments, message):
+    with pytest.raises(ValueError, match=message):
+        service.get_products_by_price(*arguments)
@@ -0,0 +1,108 @@
+"""
+Pruebas de los registros compactos: conversión desde y hacia db.json sin
+cambiar el formato del archivo, columnas de favoritos y semántica de dict.
+"""
+
+import json
+
+import pytest
+
+from tests.conftest import SAMPLE_DATA
+from utils.data_store import DataStore
+from utils.records import Favorite, FavoriteTable, Product, RecordCodec, as_dict, as_dicts
+
+
+def test_records_read_like_the_dicts_they_replace():
+    product = Product(1, 'Red Shirt', 'men', 20.0, {'color': 'red'})
+
+    assert product['name'] == 'Red Shirt'
+    assert product.get('color') == 'red'
+    assert product.get('missing') is None
+    assert product == {'id': 1, 'name': 'Red Shirt', 'price': 20.0, 'category': 'men', 'color': 'red'}
+    assert Favorite(1, 2) == {'user_id': 1, 'product_id': 2}
+    with pytest.raises(KeyError):
+        Favorite(1, 2)['missing']
+
+
+def test_records_are_not_hashable_like_dicts():
+    with pytest.raises(TypeError):
+        {Product(1, 'Red Shirt', 'men', 20.0)}
+    with pytest.raises(TypeError):
+        {Favorite(1, 2): True}
+
+
+def test_products_keep_the_key_order_of_the_file():
+    raw = json.dumps([{'id': 1, 'name': 'A', 'category': 'men', 'price': 1.0},
+                      {'id': 2, 'name': 'B', 'price': 2.0, 'category': 'men'},
+                      {'category': 'men', 'id': 3, 'name': 'C', 'price': 3.0, 'color': 'red'}]).encode()
+    products = RecordCodec().decode('products', raw)
+
+    assert all(isinstance(product, Product) for product in products)
+    assert [list(as_dict(product)) for product in products] == [
+        ['id', 'name', 'category', 'price'],
+        ['id', 'name', 'price', 'category'],
+        ['category', 'id', 'name', 'price', 'color'],
+    ]
+    assert json.loads(RecordCodec().dumps(products)) == json.loads(raw)
+
+
+def test_saving_does_not_rewrite_existing_rows(tmp_path):
+    data = json.loads(json.dumps(SAMPLE_DATA))
+    data['products'][0] = {'id': 1, 'name': 'Red Shirt', 'category': 'men', 'price': 20.0}
+    path = str(tmp_path / 'db.json')
+    with open(path, 'w') as json_file:
+        json_file.write(json.dumps(data, indent=4) + '\n')
+
+    store = DataStore(path)
+    store.get_products()
+    store.get_favorites()
+    store.add_category({'id': 4, 'name': 'shoes'})
+
+    data['categories'].append({'id': 4, 'name': 'shoes'})
+    with open(path) as json_file:
+        assert json_file.read() == json.dumps(data, indent=4) + '\n'
+
+
+def test_favorites_are_decoded_into_columns():
+    raw = json.dumps(SAMPLE_DATA['favorites'], indent=4).encode()
+    table = RecordCodec().decode('favorites', raw)
+
+    assert isinstance(table, FavoriteTable)
+    assert list(table.user_ids) == [1, 1, 2]
+    assert list(table.product_ids) == [1, 2, 3]
+    assert table.dumps() == raw.decode()
+
+
+@pytest.mark.parametrize('rows', [
+    [{'user_id': 1, 'product_id': 2, 'note': 'x'}],
+    [{'product_id': 2, 'user_id': 1}],
+    [{'user_id': 1, 'product_id': '2'}],
+    [{'user_id': 1, 'product_id': True}],
+    [{'user_id': 2 ** 70, 'product_id': 1}],
+    [{'user_id': 1, 'product_id': 2}, [1, 2]],
+    {'user_id': 1, 'product_id': 2},
+])
+def test_unusual_favorites_are_kept_as_written(rows):
+    favorites = RecordCodec().decode('favorites', json.dumps(rows).encode())
+
+    assert not isinstance(favorites, FavoriteTable)
+    assert favorites == rows
+    assert RecordCodec().convert('favorites', rows) == rows
+
+
+def test_favorite_table_removes_and_compacts():
+    table = FavoriteTable()
+    table.extend([Favorite(1, 1), Favorite(1, 2), Favorite(2, 1), Favorite(1, 2)])
+
+    table.remove(1, 2)
+    assert as_dicts(table) == [{'user_id': 1, 'product_id': 1}, {'user_id': 2, 'product_id': 1}]
+    table.remove(1, 1)
+    assert list(table.pairs()) == [(2, 1)]
+    assert len(table.user_ids) == 1  # Con más de la mitad de filas marcadas se compacta
+
+
+def test_compact_records_round_trip_through_the_store(db_file):
+    store = DataStore(db_file)
+
+    assert as_dicts(store.get_products()) == SAMPLE_DATA['products']
+    assert as_dicts(store.get_favorites()) == SAMPLE_DATA['favorites']
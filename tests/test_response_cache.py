@@ -0,0 +1,114 @@
+"""
+Pruebas de la caché de respuestas GET: aciertos y fallos, invalidación al
+escribir, límites LRU y clave compartida entre app.py y asgi_app.py.
+"""
+
+import pytest
+
+from container import AppContainer
+from utils.response_cache import ResponseCache
+
+
+def _get(client, path, **kwargs):
+    response = client.get(path, **kwargs)
+    assert response.status_code == 200
+    return response
+
+
+def test_second_get_is_a_hit(client):
+    first = _get(client, '/products')
+    second = _get(client, '/products')
+
+    assert first.headers['X-Cache'] == 'MISS'
+    assert second.headers['X-Cache'] == 'HIT'
+    assert second.data == first.data
+    stats = client.get('/cache/stats').get_json()
+    assert (stats['hits'], stats['misses'], stats['entries']) == (1, 1, 1)
+
+
+def test_query_and_accept_are_part_of_the_key(client):
+    _get(client, '/products')
+    assert _get(client, '/products', query_string={'category': 'men'}).headers['X-Cache'] == 'MISS'
+    assert _get(client, '/products', headers={'Accept': 'application/json'}).headers['X-Cache'] == 'MISS'
+    # Otro Accept con el mismo tipo preferido comparte la entrada
+    assert _get(client, '/products', headers={'Accept': 'application/json, */*;q=0.1'}).headers['X-Cache'] == 'HIT'
+
+
+@pytest.mark.parametrize('write, path', [
+    (lambda client: client.post('/products', json={'name': 'Tie', 'category': 'men', 'price': 15}), '/products'),
+    (lambda client: client.post('/products/bulk', json=[{'name': 'Tie', 'category': 'men', 'price': 15}]),
+     '/products'),
+    (lambda client: client.post('/categories', json={'name': 'shoes'}), '/categories'),
+    (lambda client: client.delete('/categories', json={'name': 'kids'}, query_string={'cascade': 'true'}),
+     '/products'),
+    (lambda client: client.post('/favorites', json={'user_id': 3, 'product_id': 4}), '/favorites'),
+    (lambda client: client.delete('/favorites', json={'user_id': 1, 'product_id': 1}), '/favorites'),
+])
+def test_writes_invalidate_cached_responses(client, write, path):
+    before = _get(client, path)
+    assert write(client).status_code in (200, 201)
+
+    after = _get(client, path)
+    assert after.headers['X-Cache'] == 'MISS'
+    assert after.data != before.data
+
+
+def test_cascade_invalidates_favorites(client):
+    before = _get(client, '/favorites').get_json()
+    client.delete('/categories', json={'name': 'men'}, query_string={'cascade': 'true'})
+
+    after = _get(client, '/favorites')
+    assert after.headers['X-Cache'] == 'MISS'
+    assert len(after.get_json()) < len(before)
+
+
+def test_write_from_another_process_changes_the_key(client, backend):
+    _get(client, '/categories')
+    # Otro proceso escribe en el almacén sin pasar por invalidates
+    AppContainer().category_service.repository.db.add_category({'id': 9, 'name': 'shoes'})
+
+    response = _get(client, '/categories')
+    assert response.headers['X-Cache'] == 'MISS'
+    assert 'shoes' in [category['name'] for category in response.get_json()]
+
+
+def test_version_is_read_once_per_request(client, monkeypatch):
+    service = AppContainer().category_service
+    calls = []
+    get_data_version = service.get_data_version
+
+    def counted():
+        calls.append(1)
+        return get_data_version()
+
+    monkeypatch.setattr(service, 'get_data_version', counted)
+    _get(client, '/categories')
+    _get(client, '/categories')
+
+    assert len(calls) == 2
+
+
+def test_least_recently_used_entries_are_evicted(client, monkeypatch):
+    monkeypatch.setenv('RESPONSE_CACHE_MAX_ENTRIES', '2')
+    monkeypatch.setattr(ResponseCache, '_instance', None)
+    for product_id in (1, 2):
+        _get(client, f'/products/{product_id}')
+    _get(client, '/products/1')
+    _get(client, '/products/3')
+
+    assert _get(client, '/products/1').headers['X-Cache'] == 'HIT'
+    assert _get(client, '/products/2').headers['X-Cache'] == 'MISS'
+    assert client.get('/cache/stats').get_json()['entries'] == 2
+
+
+def test_flask_and_asgi_share_entries(client, asgi):
+    # Distintos Accept con el mismo tipo preferido son la misma variante en las dos aplicaciones
+    flask_response = _get(client, '/products', headers={'Accept': 'application/json'},
+                          query_string='category=men')
+    status, asgi_headers, body = asgi.get('/products', headers={'Accept': 'application/json, */*;q=0.5'},
+                                          query='category=men')
+
+    assert status == 200
+    assert asgi_headers['x-cache'] == 'HIT'
+    assert body == flask_response.data
+    assert asgi_headers['etag'] == flask_response.headers['ETag']
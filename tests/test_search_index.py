@@ -0,0 +1,118 @@
+"""
+Pruebas del índice invertido de nombres de producto: coincidencia completa
+y por prefijo, ranking, altas y bajas, y búsqueda restringida a una categoría.
+"""
+
+from array import array
+
+from services.product_service import ProductService
+from repositories.category_repository import CategoryRepository
+from repositories.product_repository import ProductRepository
+from utils import search_index
+from utils.search_index import SearchIndex, tokenize
+
+DOCUMENTS = [
+    (1, 'Red Shirt'),
+    (2, 'Redwood Table'),
+    (3, 'Blue Shirt'),
+    (4, 'Red Cap'),
+    (5, 'Blue Denim Shirt'),
+]
+
+
+def _index(documents=DOCUMENTS):
+    index = SearchIndex()
+    index.build(documents)
+    return index
+
+
+def test_tokenize_normalizes_and_deduplicates():
+    assert tokenize('Red-red SHIRT, Ñandú 2') == ['red', 'shirt', 'ñandú', '2']
+    assert tokenize(None) == []
+
+
+def test_all_words_must_match():
+    index = _index()
+    assert index.search('blue shirt', 10) == [3, 5]
+    assert index.search('red shirt', 10) == [1]
+    assert index.search('green', 10) == []
+    assert index.search('', 10) == []
+
+
+def test_exact_matches_rank_above_prefix_matches():
+    # 'red' coincide completa en 1 y 4, y por prefijo en 'redwood' (2)
+    assert _index().search('red', 10) == [1, 4, 2]
+
+
+def test_rarer_terms_score_higher_and_ties_sort_by_id():
+    index = _index()
+    # 'denim' solo aparece en 5: pesa más que 'shirt', presente en tres documentos
+    assert index.search('shirt denim', 10) == [5]
+    assert index.search('shirt', 10) == [1, 3, 5]
+    assert index.search('shirt', 2) == [1, 3]
+
+
+def test_last_word_can_be_a_prefix():
+    index = _index()
+    assert index.search('blue sh', 10) == [3, 5]
+    assert index.search('redw', 10) == [2]
+
+
+def test_add_and_remove_update_results():
+    index = _index()
+    index.add(6, 'Red Scarf')
+    assert index.search('scarf', 10) == [6]
+    assert index.search('red', 10) == [1, 4, 6, 2]
+
+    index.remove([(6, 'Red Scarf'), (1, 'Red Shirt')])
+    assert index.search('scarf', 10) == []
+    assert index.search('sc', 10) == []
+    assert index.search('red', 10) == [4, 2]
+    assert index.search('shirt', 10) == [3, 5]
+
+
+def test_search_within_matches_unrestricted_search():
+    index = _index()
+    within = array('q', [2, 3, 4])
+    # Con limit 10 se recorre within; con limit 1, las listas del índice
+    assert index.search('red', 10, within) == [4, 2]
+    assert index.search('red', 1, within) == [4]
+    assert index.search('shirt', 10, within) == [3]
+    assert index.search('shirt', 10, array('q')) == []
+
+
+def test_prefix_expansion_keeps_the_most_common_terms(monkeypatch):
+    monkeypatch.setattr(search_index, 'MAX_EXPANSIONS', 3)
+    documents = [(1, 'ab')]
+    doc_id = 2
+    # 'abN' aparece en N documentos: los de menor N quedan fuera de la expansión
+    for size in range(1, 7):
+        for _ in range(size):
+            documents.append((doc_id, f'ab{size}'))
+            doc_id += 1
+    index = _index(documents)
+
+    found = set(index.search('ab', 100))
+    names = dict(documents)
+    assert 1 in found  # La palabra exacta siempre se conserva
+    assert {names[found_id] for found_id in found} == {'ab', 'ab5', 'ab6'}
+
+
+def test_prefix_ranking_is_recomputed_after_changes(monkeypatch):
+    monkeypatch.setattr(search_index, 'MAX_EXPANSIONS', 1)
+    index = _index([(1, 'abc'), (2, 'abc'), (3, 'abd')])
+    assert index.search('ab', 10) == [1, 2]
+
+    for doc_id in range(4, 7):
+        index.add(doc_id, 'abd')
+    assert index.search('ab', 10) == [3, 4, 5, 6]
+
+
+def test_store_search_by_category(db_file):
+    service = ProductService(ProductRepository(db_file), CategoryRepository(db_file))
+
+    assert [product['id'] for product in service.search_products('red', '10')] == [1, 3, 4]
+    assert [product['id'] for product in service.search_products('red', '10', 'MEN')] == [1, 3]
+
+    new_product = service.create_product('Red Boots', 'kids', 30.0)
+    assert [product['id'] for product in service.search_products('red', '10', 'kids')] == [new_product['id'], 4]
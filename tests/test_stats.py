@@ -0,0 +1,83 @@
+"""
+Pruebas de GET /stats: resúmenes de precios comparados con NumPy, conteo y
+ranking de favoritos, recálculo por versión y respuesta 501 sin NumPy.
+Las que calculan estadísticas se omiten si NumPy no está instalado.
+"""
+
+import pytest
+
+from services import stats_service
+from tests.conftest import SAMPLE_DATA
+
+requires_numpy = pytest.mark.skipif(stats_service.np is None, reason='NumPy no está instalado')
+
+
+def _prices(category=None):
+    return [product['price'] for product in SAMPLE_DATA['products']
+            if category is None or product['category'] == category]
+
+
+def test_percentiles_match_numpy(client):
+    np = pytest.importorskip('numpy')
+    stats = client.get('/stats').get_json()
+
+    summaries = {summary['category']: summary for summary in stats['categories']}
+    assert list(summaries) == ['kids', 'men', 'women']
+    for category, summary in [(None, stats['products'])] + list(summaries.items()):
+        prices = _prices(category)
+        assert summary['count'] == len(prices)
+        assert summary['min_price'] == min(prices)
+        assert summary['max_price'] == max(prices)
+        assert summary['mean_price'] == round(float(np.mean(prices)), 2)
+        assert summary['percentiles'] == {f'p{percentile}': round(float(np.percentile(prices, percentile)), 2)
+                                          for percentile in stats_service.PERCENTILES}
+
+
+def test_percentiles_match_numpy_on_random_groups():
+    np = pytest.importorskip('numpy')
+    generator = np.random.default_rng(7)
+    codes = generator.integers(0, 5, 2000)
+    prices = np.round(generator.uniform(0, 500, 2000), 2)
+
+    for code, summary in enumerate(stats_service._summaries(codes, prices, 5)):
+        group = prices[codes == code]
+        assert summary['count'] == len(group)
+        assert summary['percentiles'] == {f'p{percentile}': round(float(np.percentile(group, percentile)), 2)
+                                          for percentile in stats_service.PERCENTILES}
+
+
+@requires_numpy
+def test_favorites_counts_and_ranking(client):
+    client.post('/favorites', json={'user_id': 3, 'product_id': 2})
+    stats = client.get('/stats', query_string={'limit': 2}).get_json()
+
+    favorites = stats['favorites']
+    assert favorites['count'] == 4
+    assert favorites['products_with_favorites'] == 3
+    assert favorites['top_products'] == [{'product_id': 2, 'favorites': 2},
+                                         {'product_id': 1, 'favorites': 1}]
+    by_category = {summary['category']: summary['favorites'] for summary in stats['categories']}
+    assert by_category == {'kids': 0, 'men': 2, 'women': 2}
+
+
+@requires_numpy
+def test_stats_follow_writes(client):
+    before = client.get('/stats').get_json()
+    client.post('/products', json={'name': 'Gold Watch', 'category': 'men', 'price': 500})
+
+    after = client.get('/stats').get_json()
+    assert after['products']['count'] == before['products']['count'] + 1
+    assert after['products']['max_price'] == 500
+
+
+@requires_numpy
+def test_invalid_limit_is_rejected(client):
+    assert client.get('/stats', query_string={'limit': 'x'}).status_code == 400
+
+
+def test_stats_are_not_implemented_without_numpy(client, monkeypatch):
+    monkeypatch.setattr(stats_service, 'np', None)
+    response = client.get('/stats')
+
+    assert response.status_code == 501
+    assert 'NumPy' in response.get_json()['message']
@@ -0,0 +1,139 @@
+"""
+Pruebas de los tokens firmados: emisión, expiración, revocación compartida
+entre procesos y compactación del archivo de revocaciones.
+"""
+
+import json
+import time
+
+import pytest
+
+from utils.auth import revocation_list
+from utils.auth.auth_config import AuthConfig
+from utils.auth.revocation_list import RevocationList
+from utils.auth.token_service import TokenService
+
+
+@pytest.fixture
+def revocation_file(tmp_path, monkeypatch):
+    path = str(tmp_path / 'db.json.revoked')
+    monkeypatch.setenv('AUTH_REVOCATION_FILE', path)
+    monkeypatch.setenv('AUTH_REVOCATION_SYNC_MS', '0')
+    return path
+
+
+def test_issued_token_is_valid(revocation_file):
+    tokens = TokenService()
+    token = tokens.issue('student')
+
+    assert tokens.is_valid(token)
+    assert tokens.is_valid(token)  # Segunda consulta desde el LRU
+    claims = tokens.verify(token)
+    assert claims['sub'] == 'student'
+    assert claims['exp'] > time.time()
+
+
+def test_tampered_or_foreign_token_is_rejected(revocation_file, monkeypatch):
+    token = TokenService().issue('student')
+    payload, _, signature = token.partition('.')
+
+    assert not TokenService().is_valid(payload + '.' + signature[::-1])
+    assert not TokenService().is_valid(payload)
+    assert not TokenService().is_valid('')
+
+    # Otro proceso con otra clave no acepta el token
+    monkeypatch.setattr(TokenService, '_instance', None)
+    monkeypatch.setattr(AuthConfig, '_instance', None)
+    monkeypatch.setenv('AUTH_SECRET_KEY', 'other-secret')
+    assert not TokenService().is_valid(token)
+
+
+def test_expired_token_is_rejected_even_if_cached(revocation_file, monkeypatch):
+    tokens = TokenService()
+    token = tokens.issue('student')
+    assert tokens.is_valid(token)
+
+    expired_at = time.time() + AuthConfig().TOKEN_TTL + 1
+    monkeypatch.setattr(time, 'time', lambda: expired_at)
+    assert not tokens.is_valid(token)
+    assert tokens.verify(token) is None
+
+
+def test_static_token_is_rejected_by_default(revocation_file, monkeypatch):
+    assert not TokenService().is_valid(AuthConfig().VALID_TOKEN)
+
+    monkeypatch.setattr(TokenService, '_instance', None)
+    monkeypatch.setattr(AuthConfig, '_instance', None)
+    monkeypatch.setenv('AUTH_ACCEPT_LEGACY_TOKEN', '1')
+    assert TokenService().is_valid(AuthConfig().VALID_TOKEN)
+
+
+def test_revoked_token_is_rejected_even_if_cached(revocation_file):
+    tokens = TokenService()
+    token = tokens.issue('student')
+    other = tokens.issue('student')
+    assert tokens.is_valid(token)
+
+    assert tokens.revoke(token)
+    assert not tokens.is_valid(token)
+    assert not tokens.revoke(token)
+    assert tokens.is_valid(other)
+
+
+def test_revocation_is_visible_to_other_processes(revocation_file):
+    token = TokenService().issue('student')
+    jti = TokenService().verify(token)['jti']
+    # Otro proceso: misma clave y mismo archivo, su propia lista en memoria
+    other_process = RevocationList(revocation_file)
+    assert jti not in other_process
+
+    TokenService().revoke(token)
+
+    assert jti in other_process
+    with open(revocation_file) as revoked:
+        assert [json.loads(line)['jti'] for line in revoked] == [jti]
+
+
+def test_sync_interval_throttles_reads(tmp_path):
+    path = str(tmp_path / 'revoked')
+    writer = RevocationList(path)
+    reader = RevocationList(path, sync_interval=3600)
+    assert 'a' not in reader
+
+    writer.add('a', int(time.time()) + 60)
+
+    assert 'a' not in reader  # Dentro del intervalo no se vuelve a leer el archivo
+    reader._next_sync = 0
+    assert 'a' in reader
+
+
+def test_compaction_drops_expired_revocations(tmp_path, monkeypatch):
+    monkeypatch.setattr(revocation_list, 'COMPACT_LINES', 4)
+    path = str(tmp_path / 'revoked')
+    revoked = RevocationList(path)
+    reader = RevocationList(path)
+    now = int(time.time())
+
+    revoked.add('live', now + 3600)
+    revoked.add('expired-0', now - 1)
+    assert 'expired-0' in reader
+    for index in range(1, 4):
+        revoked.add(f'expired-{index}', now - 1)
+
+    with open(path) as revocation_file:
+        assert [json.loads(line)['jti'] for line in revocation_file] == ['live']
+    assert 'live' in revoked and 'expired-0' not in revoked
+    # Un lector con el archivo anterior detecta el reemplazo y lo vuelve a leer
+    assert 'live' in reader and 'expired-3' not in reader
+
+
+def test_interrupted_write_does_not_corrupt_the_next_one(tmp_path):
+    path = str(tmp_path / 'revoked')
+    with open(path, 'w') as revocation_file:
+        revocation_file.write('{"jti": "interrupted"')
+    revoked = RevocationList(path)
+
+    revoked.add('next', int(time.time()) + 60)
+
+    assert 'next' in revoked
+    assert 'interrupted' not in revoked
@@ -2,6 +2,11 @@
 Configuración de autenticación centralizada usando Singleton Pattern
 """
 
+import hmac
+import os
+import secrets
+import warnings
+
 class AuthConfig:
     """
     Singleton para configuración de autenticación.
@@ -24,6 +29,26 @@ class AuthConfig:
                 'username': 'student',
                 'password': 'desingp'
             }
+            # Clave de firma de los tokens; debe ser la misma en todos los procesos.
+            # Sin AUTH_SECRET_KEY se genera una por proceso: solo sirve con un único proceso.
+            self.SECRET_KEY = os.environ.get('AUTH_SECRET_KEY')
+            if not self.SECRET_KEY:
+                warnings.warn("AUTH_SECRET_KEY no está definida: se generó una clave aleatoria para "
+                              "este proceso. Los tokens emitidos no son válidos en otros workers ni "
+                              "después de reiniciar; defina AUTH_SECRET_KEY si ejecuta más de un proceso.",
+                              RuntimeWarning, stacklevel=2)
+                self.SECRET_KEY = secrets.token_hex(32)
+            # Segundos de validez de un token emitido por /auth
+            self.TOKEN_TTL = int(os.environ.get('AUTH_TOKEN_TTL', '3600'))
+            # Aceptar también el token estático VALID_TOKEN (desactivado salvo que se pida)
+            legacy = os.environ.get('AUTH_ACCEPT_LEGACY_TOKEN', '0')
+            self.ACCEPT_LEGACY_TOKEN = legacy.strip().lower() in ('1', 'true', 'yes', 'on')
+            # Tokens verificados recordados para no recalcular su firma
+            self.VERIFIED_CACHE_SIZE = int(os.environ.get('AUTH_VERIFIED_CACHE_SIZE', '10000'))
+            # Archivo compartido por los procesos con los tokens revocados
+            self.REVOCATION_FILE = os.environ.get('AUTH_REVOCATION_FILE', 'db.json.revoked')
+            # Milisegundos máximos hasta ver en este proceso una revocación hecha en otro
+            self.REVOCATION_SYNC_MS = float(os.environ.get('AUTH_REVOCATION_SYNC_MS', '100'))
             self._initialized = True
     
     def is_valid_token(self, token: str) -> bool:
@@ -38,7 +63,7 @@ class AuthConfig:
         """
         if not token:
             return False
-        return token.strip() == self.VALID_TOKEN
+        return hmac.compare_digest(token.strip().encode(), self.VALID_TOKEN.encode())
     
     def validate_credentials(self, username: str, password: str) -> bool:
         """
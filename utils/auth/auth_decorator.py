@@ -5,7 +5,7 @@ Implementa el Decorator Pattern para centralizar la lógica de autenticación.
 
 from functools import wraps
 from flask import request
-from utils.auth.auth_config import AuthConfig
+from utils.auth.token_service import TokenService
 
 def token_required(f):
     """
@@ -19,15 +19,16 @@ def token_required(f):
     Returns:
         función decorada que valida el token antes de ejecutarse
     """
+    tokens = TokenService()
+    
     @wraps(f)
     def decorated_function(*args, **kwargs):
-        auth_config = AuthConfig()
         token = request.headers.get('Authorization')
         
         if not token:
             return {'message': 'Unauthorized: access token not found'}, 401
         
-        if not auth_config.is_valid_token(token):
+        if not tokens.is_valid(token):
             return {'message': 'Unauthorized: invalid token'}, 401
         
         return f(*args, **kwargs)
@@ -0,0 +1,132 @@
+"""
+Tokens revocados compartidos entre procesos.
+Cada revocación se agrega como una línea JSON a un archivo, bajo un bloqueo
+de archivo. Cada proceso lee solo las líneas nuevas y las guarda en un set,
+así la consulta por petición es, como mucho, un stat del archivo y una
+búsqueda en memoria.
+"""
+
+import json
+import os
+import threading
+import time
+from typing import Optional, Set, Tuple
+from utils.file_lock import FileLock
+
+# Con más líneas que esta cantidad, la revocación reescribe el archivo sin los tokens ya vencidos
+# (y el umbral pasa a ser el doble de las que quedaron, para no reescribirlo en cada revocación)
+COMPACT_LINES = 1024
+
+
+class RevocationList:
+    """
+    Registro de revocaciones en un archivo de solo agregado. Una revocación
+    vale de inmediato en el proceso que la hace y en los demás a más tardar
+    sync_interval segundos después. Si el archivo cambia de inode
+    (compactación) se vuelve a leer completo.
+    """
+
+    def __init__(self, path: str, sync_interval: float = 0.0):
+        """
+        Args:
+            path: Archivo compartido con las revocaciones
+            sync_interval: Segundos entre consultas al archivo desde el camino rápido
+        """
+        self.path = path
+        self.sync_interval = sync_interval
+        self._file_lock = FileLock(path + '.lock')
+        self._lock = threading.Lock()
+        self._revoked: Set[str] = set()
+        self._identity: Optional[Tuple[int, int]] = None
+        self._offset = 0
+        self._lines = 0
+        self._compact_at = COMPACT_LINES
+        self._next_sync = 0.0
+
+    def add(self, jti: str, exp: int) -> None:
+        """
+        Registra un token revocado hasta su expiración.
+
+        Args:
+            jti: Identificador único del token
+            exp: Timestamp de expiración; después la revocación puede descartarse
+        """
+        line = (json.dumps({'jti': jti, 'exp': exp}) + '\n').encode()
+        with self._file_lock:
+            with open(self.path, 'a+b') as revocation_file:
+                if revocation_file.seek(0, os.SEEK_END):
+                    revocation_file.seek(-1, os.SEEK_END)
+                    if revocation_file.read(1) != b'\n':
+                        line = b'\n' + line  # Línea incompleta de una escritura interrumpida
+                revocation_file.write(line)
+                revocation_file.flush()
+                os.fsync(revocation_file.fileno())
+            self._sync()
+            if self._lines > self._compact_at:
+                self._compact()
+
+    def __contains__(self, jti: str) -> bool:
+        if time.monotonic() >= self._next_sync:
+            self._sync()
+        return jti in self._revoked
+
+    def _sync(self) -> None:
+        """Incorpora las líneas agregadas por cualquier proceso desde la última lectura."""
+        self._next_sync = time.monotonic() + self.sync_interval
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            stat = None
+        with self._lock:
+            if stat is None:
+                if self._identity is not None:
+                    self._reset(None)
+                return
+            if (stat.st_dev, stat.st_ino) == self._identity and stat.st_size == self._offset:
+                return
+            try:
+                revocation_file = open(self.path, 'rb')
+            except FileNotFoundError:
+                return
+            with revocation_file:
+                opened = os.fstat(revocation_file.fileno())
+                identity = (opened.st_dev, opened.st_ino)
+                if identity != self._identity or opened.st_size < self._offset:
+                    self._reset(identity)
+                revocation_file.seek(self._offset)
+                data = revocation_file.read()
+            # Solo líneas completas; una escritura en curso se lee en la próxima consulta
+            end = data.rfind(b'\n') + 1
+            for line in data[:end].splitlines():
+                try:
+                    self._revoked.add(json.loads(line)['jti'])
+                except (ValueError, KeyError, TypeError):
+                    continue  # Línea ilegible: se ignora
+                self._lines += 1
+            self._offset += end
+
+    def _reset(self, identity: Optional[Tuple[int, int]]) -> None:
+        self._revoked = set()
+        self._identity = identity
+        self._offset = 0
+        self._lines = 0
+
+    def _compact(self) -> None:
+        """Reescribe el archivo sin las revocaciones de tokens ya vencidos (con el bloqueo tomado)."""
+        now = time.time()
+        kept = []
+        with open(self.path, 'rb') as revocation_file:
+            for line in revocation_file:
+                try:
+                    if json.loads(line)['exp'] > now:
+                        kept.append(line)
+                except (ValueError, KeyError, TypeError):
+                    continue
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'wb') as tmp_file:
+            tmp_file.writelines(kept)
+            tmp_file.flush()
+            os.fsync(tmp_file.fileno())
+        os.replace(tmp_path, self.path)
+        self._compact_at = max(COMPACT_LINES, 2 * len(kept))
+        self._sync()
@@ -0,0 +1,141 @@
+"""
+Tokens firmados con HMAC y expiración usando Singleton Pattern.
+Un token se valida con la clave secreta, sin consultar ningún almacén, por
+lo que cualquier proceso con la misma clave puede validarlo. Las
+revocaciones se comparten entre procesos a través de RevocationList.
+
+Formato: <payload base64url>.<firma base64url>, con payload
+{"sub": usuario, "exp": timestamp, "jti": identificador único}.
+"""
+
+import base64
+import hashlib
+import hmac
+import json
+import secrets
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from utils.auth.auth_config import AuthConfig
+from utils.auth.revocation_list import RevocationList
+from utils.metrics import instrument
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b'=').decode()
+
+
+def _b64decode(data: str) -> bytes:
+    return base64.urlsafe_b64decode(data + '=' * (-len(data) % 4))
+
+
+@instrument('auth')
+class TokenService:
+    """
+    Singleton que emite, valida y revoca tokens.
+    Guarda en un LRU los tokens ya verificados para no recalcular la firma
+    en peticiones repetidas; las revocaciones se consultan en cada petición,
+    también para los tokens del LRU.
+    """
+    _instance = None
+    _initialized = False
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(TokenService, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not self._initialized:
+            self.config = AuthConfig()
+            self._key = self.config.SECRET_KEY.encode()
+            # token -> (exp, jti) de los tokens con firma ya verificada
+            self._verified: 'OrderedDict[str, Tuple[int, str]]' = OrderedDict()
+            self._lock = threading.Lock()
+            self._revoked = RevocationList(self.config.REVOCATION_FILE,
+                                           self.config.REVOCATION_SYNC_MS / 1000)
+            self._initialized = True
+
+    def _sign(self, payload: str) -> str:
+        return _b64encode(hmac.new(self._key, payload.encode(), hashlib.sha256).digest())
+
+    def issue(self, username: str) -> str:
+        """
+        Emite un token firmado para un usuario.
+
+        Args:
+            username: Usuario autenticado
+
+        Returns:
+            Token con expiración de TOKEN_TTL segundos
+        """
+        claims = {'sub': username, 'exp': int(time.time()) + self.config.TOKEN_TTL,
+                  'jti': secrets.token_hex(8)}
+        payload = _b64encode(json.dumps(claims, separators=(',', ':')).encode())
+        return f'{payload}.{self._sign(payload)}'
+
+    def verify(self, token: str) -> Optional[Dict[str, Any]]:
+        """
+        Valida firma, expiración y revocación de un token.
+
+        Returns:
+            Claims del token, o None si no es válido
+        """
+        payload, _, signature = token.partition('.')
+        if not signature or not hmac.compare_digest(signature.encode(), self._sign(payload).encode()):
+            return None
+        try:
+            claims = json.loads(_b64decode(payload))
+        except ValueError:
+            return None
+        if claims.get('exp', 0) <= time.time() or claims.get('jti') in self._revoked:
+            return None
+        return claims
+
+    def is_valid(self, token: Optional[str]) -> bool:
+        """
+        Camino rápido usado por token_required: consulta primero el LRU de
+        tokens verificados y solo recalcula la firma si el token es nuevo.
+        """
+        if not token:
+            return False
+        token = token.strip()
+        with self._lock:
+            cached = self._verified.get(token)
+            if cached is not None:
+                self._verified.move_to_end(token)
+        if cached is not None:
+            exp, jti = cached
+            if exp > time.time() and jti not in self._revoked:
+                return True
+            with self._lock:
+                self._verified.pop(token, None)
+            return False
+
+        if self.config.ACCEPT_LEGACY_TOKEN and self.config.is_valid_token(token):
+            return True
+        claims = self.verify(token)
+        if claims is None:
+            return False
+        with self._lock:
+            self._verified[token] = (claims['exp'], claims.get('jti'))
+            while len(self._verified) > self.config.VERIFIED_CACHE_SIZE:
+                self._verified.popitem(last=False)
+        return True
+
+    def revoke(self, token: str) -> bool:
+        """
+        Revoca un token firmado antes de su expiración, en todos los procesos
+        que comparten el archivo de revocaciones.
+
+        Returns:
+            True si el token era válido y quedó revocado
+        """
+        claims = self.verify(token.strip())
+        if claims is None:
+            return False
+        self._revoked.add(claims['jti'], claims['exp'])
+        with self._lock:
+            self._verified.pop(token.strip(), None)
+        return True
@@ -0,0 +1,63 @@
+"""
+Lectura del cuerpo de las peticiones de carga masiva.
+Acepta un arreglo JSON o NDJSON (un objeto por línea) leído en streaming.
+"""
+
+import json
+import os
+from typing import Any, List
+from utils.pagination import NDJSON_MIMETYPE
+from utils.records import as_dict
+
+MAX_BULK_ITEMS = int(os.environ.get('BULK_MAX_ITEMS', '50000'))
+
+
+def read_bulk_items(request) -> List[Any]:
+    """
+    Obtiene los elementos de una petición bulk.
+
+    Args:
+        request: Petición de Flask o de asgi_app
+
+    Returns:
+        Lista de elementos (sin validar)
+
+    Raises:
+        ValueError: Si el cuerpo no es válido o supera MAX_BULK_ITEMS
+    """
+    if request.mimetype == NDJSON_MIMETYPE:
+        items = []
+        for line_number, line in enumerate(request.stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                items.append(json.loads(line))
+            except ValueError:
+                raise ValueError(f"Línea {line_number} no es JSON válido")
+            if len(items) > MAX_BULK_ITEMS:
+                break
+    else:
+        items = request.get_json(silent=True)
+        if not isinstance(items, list):
+            raise ValueError("El cuerpo debe ser un arreglo JSON o NDJSON")
+
+    if not items:
+        raise ValueError("El lote está vacío")
+    if len(items) > MAX_BULK_ITEMS:
+        raise ValueError(f"El lote no puede exceder {MAX_BULK_ITEMS} elementos")
+    return items
+
+
+def bulk_response(results: List[dict]) -> tuple:
+    """
+    Arma la respuesta de una carga masiva con el resultado por elemento.
+
+    Returns:
+        201 si todos se crearon, 207 si hubo errores parciales, 400 si ninguno se creó
+    """
+    created = sum(1 for result in results if result['status'] == 201)
+    failed = len(results) - created
+    status = 201 if not failed else (207 if created else 400)
+    # Los servicios devuelven registros compactos; aquí se convierten a dict
+    results = [{key: as_dict(value) for key, value in result.items()} for result in results]
+    return {'created': created, 'failed': failed, 'results': results}, status
@@ -0,0 +1,35 @@
+"""
+Factory Pattern para la creación del almacén de datos.
+Los repositorios piden su conexión aquí en lugar de instanciar un backend concreto.
+"""
+
+from utils.storage_config import StorageConfig
+
+
+class ConnectionFactory:
+    """
+    Crea (o reutiliza) el backend de almacenamiento según la configuración.
+    """
+
+    @staticmethod
+    def create(db_file: str = 'db.json'):
+        """
+        Obtiene el almacén de datos configurado.
+
+        Args:
+            db_file: Ruta al archivo JSON (solo se usa con el backend 'json')
+
+        Returns:
+            DataStore o SQLiteConnection, ambos con la misma interfaz
+
+        Raises:
+            ValueError: Si el backend configurado no existe
+        """
+        config = StorageConfig()
+        if config.STORAGE_BACKEND == 'json':
+            from utils.data_store import DataStore
+            return DataStore(db_file)
+        if config.STORAGE_BACKEND == 'sqlite':
+            from utils.sqlite_connection import SQLiteConnection
+            return SQLiteConnection(config.SQLITE_PATH)
+        raise ValueError(f"Backend de almacenamiento desconocido: {config.STORAGE_BACKEND}")
@@ -0,0 +1,678 @@
+"""
+Almacén de datos compartido en memoria.
+Mantiene una única copia de los datos por proceso y por archivo, de modo
+que los repositorios no vuelvan a leer el JSON en cada petición.
+"""
+
+import hashlib
+import math
+import os
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right, insort
+from itertools import compress, repeat
+from typing import List, Optional, Dict, Any, Set, Tuple
+from utils.database_connection import DatabaseConnection
+from utils.storage_config import StorageConfig
+from utils.id_sequence import IdSequence
+from utils.integrity import IntegrityError
+from utils.metrics import instrument
+from utils.records import Favorite, FavoriteTable, ProductColumns
+from utils.search_index import SearchIndex
+
+# Por encima de esta cantidad, quitar registros de una lista ordenada la recorre una sola vez
+SORTED_REMOVE_LIMIT = 64
+
+
+def _record_id(record: Dict[str, Any]) -> int:
+    return record['id']
+
+
+def _insert_by_id(records: List[Dict[str, Any]], record: Dict[str, Any]) -> None:
+    """Inserta manteniendo el orden por ID; con IDs monotónicos es un simple append."""
+    if not records or records[-1]['id'] <= record['id']:
+        records.append(record)
+    else:
+        insort(records, record, key=_record_id)
+
+
+def _page_after(records: List[Dict[str, Any]], after_id: Optional[int], limit: int) -> List[Dict[str, Any]]:
+    """Retorna hasta limit registros con ID mayor a after_id (búsqueda binaria)."""
+    start = 0 if after_id is None else bisect_right(records, after_id, key=_record_id)
+    return records[start:start + limit]
+
+
+def _remove_sorted(records: List[Dict[str, Any]], removed: List[Dict[str, Any]], key) -> None:
+    """
+    Quita registros de una lista ordenada por key. Con pocos registros cada
+    uno se ubica por búsqueda binaria; con muchos se filtra la lista una vez.
+    """
+    if len(removed) > SORTED_REMOVE_LIMIT:
+        removed_ids = set(map(id, removed))
+        records[:] = compress(records, [identity not in removed_ids for identity in map(id, records)])
+        return
+    for record in removed:
+        position = bisect_left(records, key(record), key=key)
+        # Registros con la misma clave (IDs duplicados): se busca el mismo objeto
+        while position < len(records) and records[position] is not record:
+            position += 1
+        if position < len(records):
+            del records[position]
+
+
+def _price_key(product: Dict[str, Any]) -> Tuple[float, int]:
+    return product['price'], product['id']
+
+
+def _price(product: Dict[str, Any]) -> float:
+    return product['price']
+
+
+def _has_price(product: Dict[str, Any]) -> bool:
+    """Solo los precios numéricos entran al índice (price == price descarta NaN)."""
+    price = product.get('price')
+    return type(price) in (int, float) and price == price
+
+
+def _price_range(records: List[Dict[str, Any]], min_price: Optional[float], max_price: Optional[float],
+                 after: Optional[Tuple[float, int]], limit: int) -> List[Dict[str, Any]]:
+    """
+    Retorna hasta limit registros con precio en [min_price, max_price] y
+    posteriores a after, de una lista ordenada por (precio, ID).
+    Dos búsquedas binarias y un slice: O(log n + limit).
+    """
+    # (precio,) es menor que cualquier (precio, id): el límite inferior es inclusivo
+    start = 0 if min_price is None else bisect_left(records, (min_price,), key=_price_key)
+    if after is not None:
+        start = max(start, bisect_right(records, after, key=_price_key))
+    end = len(records) if max_price is None else bisect_right(records, (max_price, math.inf), key=_price_key)
+    return records[start:min(start + limit, end)]
+
+
+@instrument('storage')
+class DataStore:
+    """
+    Singleton por archivo JSON, compartido por todos los repositorios del proceso.
+    Carga el archivo una sola vez y lo vuelve a leer únicamente cuando
+    cambian su fecha de modificación o su tamaño.
+    """
+    _instances: Dict[str, 'DataStore'] = {}
+    _instances_lock = threading.Lock()
+
+    def __new__(cls, json_file_path: str = 'db.json'):
+        path = os.path.abspath(json_file_path)
+        with cls._instances_lock:
+            instance = cls._instances.get(path)
+            if instance is None:
+                instance = super(DataStore, cls).__new__(cls)
+                instance._setup(path)
+                cls._instances[path] = instance
+        return instance
+
+    def _setup(self, path: str) -> None:
+        """Inicializa el estado interno; solo se ejecuta una vez por archivo."""
+        config = StorageConfig()
+        self.db = DatabaseConnection(path, journaled=config.JOURNAL_ENABLED)
+        self._lock = threading.RLock()
+        self._sequence = IdSequence(path + '.seq')
+        self._epoch = ''
+        self._generation = 0
+        # Colecciones cuyos índices ya se construyeron desde la última carga
+        self._indexed: Set[str] = set()
+        self._index_builders = {
+            'products': self._build_product_indexes,
+            'categories': self._build_category_indexes,
+            'favorites': self._build_favorite_indexes,
+        }
+        self._versions: Dict[str, Tuple[int, float]] = {}
+        self._max_ids: Dict[str, int] = {}
+        self._products_by_id: Dict[int, Dict[str, Any]] = {}
+        self._products_sorted: List[Dict[str, Any]] = []
+        self._products_by_category: Dict[str, List[Dict[str, Any]]] = {}
+        # Productos ordenados por (precio, ID), en total y por categoría
+        self._products_by_price: List[Dict[str, Any]] = []
+        self._products_by_category_price: Dict[str, List[Dict[str, Any]]] = {}
+        self._product_search = SearchIndex()
+        # IDs indexados por categoría, ordenados, para intersectar con la búsqueda; se construyen al primer pedido
+        self._category_ids: Dict[str, array] = {}
+        # Columnas para estadísticas; se construyen al primer pedido
+        self._product_columns: Optional[ProductColumns] = None
+        self._categories_by_id: Dict[int, Dict[str, Any]] = {}
+        self._categories_by_name: Dict[str, Dict[str, Any]] = {}
+        self._categories_sorted: List[Dict[str, Any]] = []
+        # Por usuario, sus IDs de producto como set ordenado (dict con valores None):
+        # pertenencia y baja en O(1), y se recorren en orden de inserción
+        self._favorites_by_user: Dict[int, Dict[int, None]] = {}
+        if config.JOURNAL_ENABLED:
+            self._start_compactor(config.COMPACT_INTERVAL, config.COMPACT_THRESHOLD)
+
+    def _start_compactor(self, interval: float, threshold: int) -> None:
+        """Lanza el hilo que consolida el journal en el snapshot periódicamente."""
+        def run():
+            while True:
+                time.sleep(interval)
+                if self.db.pending_journal_entries() >= threshold:
+                    self.db.compact()
+
+        threading.Thread(target=run, name='journal-compactor', daemon=True).start()
+
+    def _refresh(self, collection: Optional[str] = None) -> None:
+        """
+        Recarga los datos si el archivo cambió desde la última lectura y
+        construye los índices de la colección pedida si aún no existen.
+        Las colecciones que el proceso nunca usa no se parsean.
+        """
+        self.db.reload_if_stale()
+        self._rebuild_if_reloaded()
+        if collection is not None and collection not in self._indexed:
+            self._index_builders[collection]()
+            self._indexed.add(collection)
+
+    def _rebuild_if_reloaded(self) -> None:
+        """Invalida índices y versiones si la conexión volvió a leer el disco."""
+        if self.db.generation != self._generation:
+            self._generation = self.db.generation
+            self._reset_versions()
+            self._indexed = set()
+
+    def _commit(self, ticket: Optional[int]) -> None:
+        """
+        Espera a que una mutación quede en disco, fuera del lock del almacén,
+        para que las escrituras concurrentes se agrupen en un mismo flush.
+        """
+        if ticket is None:
+            return
+        self.db.flush(ticket)
+        with self._lock:
+            # Si otro proceso escribió antes, el flush recargó el archivo
+            self._rebuild_if_reloaded()
+
+    def _reset_versions(self) -> None:
+        """
+        Reinicia los contadores de versión tras (re)cargar el archivo.
+        La época identifica el contenido cargado, así dos procesos que parten
+        del mismo archivo no generan la misma versión para datos distintos.
+        """
+        signature = self.db.signature()
+        self._epoch = hashlib.sha1(repr(signature).encode()).hexdigest()[:12]
+        loaded_at = max((part[0] / 1e9 for part in signature if part), default=time.time())
+        self._versions = {collection: (0, loaded_at)
+                          for collection in ('products', 'categories', 'favorites')}
+
+    def _bump_version(self, collection: str) -> None:
+        version, _ = self._versions.get(collection, (0, 0.0))
+        self._versions[collection] = (version + 1, time.time())
+
+    def get_version(self, collection: str) -> Tuple[str, float]:
+        """
+        Obtiene la versión actual de una colección sin tocar sus datos.
+
+        Args:
+            collection: Nombre de la colección
+
+        Returns:
+            Tupla (etiqueta de versión, timestamp de la última modificación)
+        """
+        with self._lock:
+            self._refresh()
+            version, modified = self._versions.get(collection, (0, 0.0))
+            return f"{self._epoch}-{version}", modified
+
+    def _build_product_indexes(self) -> None:
+        """Construye los índices de productos por ID (conserva el primero si hay duplicados) y por categoría."""
+        self._products_by_id = {}
+        self._products_by_category = {}
+        for product in self.db.get_products():
+            self._index_product(product)
+        self._products_sorted = sorted(self.db.get_products(), key=_record_id)
+        # Ordenar de forma estable por precio la lista ya ordenada por ID da el orden (precio, ID)
+        # sin comparar tuplas, varias veces más rápido
+        self._products_by_price = sorted(filter(_has_price, self._products_sorted), key=_price)
+        self._products_by_category_price = {}
+        for product in self._products_by_price:
+            # Se recorre ya ordenado, así cada lista por categoría queda ordenada
+            category = product.get('category', '').casefold()
+            self._products_by_category_price.setdefault(category, []).append(product)
+        self._max_ids['products'] = max(self._products_by_id, default=0)
+        self._product_columns = None
+        self._category_ids = {}
+        self._product_search = SearchIndex()
+        self._product_search.build((product_id, product.get('name'))
+                                   for product_id, product in self._products_by_id.items())
+
+    def _index_product(self, product: Dict[str, Any]) -> None:
+        indexed = self._products_by_id.setdefault(product['id'], product) is product
+        category = product.get('category', '').casefold()
+        self._products_by_category.setdefault(category, []).append(product)
+        ids = self._category_ids.get(category)
+        if indexed and ids is not None:
+            if not ids or ids[-1] < product['id']:
+                ids.append(product['id'])
+            else:
+                ids.insert(bisect_left(ids, product['id']), product['id'])
+
+    def _ids_in_category(self, key: str) -> array:
+        """IDs ordenados de los productos indexados de una categoría (se construyen al primer pedido)."""
+        ids = self._category_ids.get(key)
+        if ids is None:
+            ids = self._category_ids[key] = array('q', sorted(
+                product['id'] for product in self._products_by_category.get(key, ())
+                if self._products_by_id.get(product['id']) is product))
+        return ids
+
+    def _index_product_price(self, product: Dict[str, Any]) -> None:
+        """Inserta un producto nuevo en los índices por precio (búsqueda binaria) y en las columnas."""
+        if not _has_price(product):
+            return
+        insort(self._products_by_price, product, key=_price_key)
+        category = product.get('category', '').casefold()
+        insort(self._products_by_category_price.setdefault(category, []), product, key=_price_key)
+        if self._product_columns is not None and self._products_by_id.get(product['id']) is product:
+            self._product_columns.append(product)
+
+    def _build_category_indexes(self) -> None:
+        """Construye los índices de categorías por ID y por nombre normalizado."""
+        self._categories_by_id = {}
+        self._categories_by_name = {}
+        for category in self.db.get_categories():
+            self._index_category(category)
+        self._categories_sorted = sorted(self.db.get_categories(), key=_record_id)
+        self._max_ids['categories'] = max(self._categories_by_id, default=0)
+
+    def _build_favorite_indexes(self) -> None:
+        """Construye por usuario el set ordenado de productos favoritos."""
+        favorites = self.db.get_favorites()
+        if isinstance(favorites, FavoriteTable):
+            pairs = favorites.pairs()
+        else:
+            pairs = ((favorite.get('user_id'), favorite.get('product_id')) for favorite in favorites
+                     if type(favorite.get('user_id')) is int and type(favorite.get('product_id')) is int)
+        by_user: Dict[int, Dict[int, None]] = {}
+        for user_id, product_id in pairs:
+            products = by_user.get(user_id)
+            if products is None:
+                products = by_user[user_id] = {}
+            # Un par repetido conserva la posición de su primera aparición
+            products[product_id] = None
+        self._favorites_by_user = by_user
+
+    def _index_favorite(self, favorite: Dict[str, Any]) -> None:
+        self._index_favorite_pair(favorite['user_id'], favorite['product_id'])
+
+    def _index_favorite_pair(self, user_id: int, product_id: int) -> None:
+        if type(user_id) is not int or type(product_id) is not int:
+            return  # Filas mal formadas no son consultables por usuario/producto
+        products = self._favorites_by_user.get(user_id)
+        if products is None:
+            products = self._favorites_by_user[user_id] = {}
+        products.setdefault(product_id, None)
+
+    def _unindex_favorite(self, user_id: int, product_id: int) -> None:
+        products = self._favorites_by_user.get(user_id)
+        if products is None or product_id not in products:
+            return
+        del products[product_id]
+        if not products:
+            del self._favorites_by_user[user_id]
+
+    def _has_favorite(self, user_id: int, product_id: int) -> bool:
+        products = self._favorites_by_user.get(user_id)
+        return products is not None and product_id in products
+
+    def _index_category(self, category: Dict[str, Any]) -> None:
+        self._categories_by_id.setdefault(category['id'], category)
+        self._categories_by_name.setdefault(category.get('name', '').casefold(), category)
+
+    def _track_id(self, collection: str, new_id: int) -> None:
+        self._max_ids[collection] = max(self._max_ids.get(collection, 0), new_id)
+
+    def next_id(self, collection: str, count: int = 1) -> int:
+        """
+        Reserva IDs nuevos para una colección; nunca reutiliza uno ya entregado.
+
+        Args:
+            collection: Nombre de la colección ('products' o 'categories')
+            count: Cantidad de IDs consecutivos a reservar
+
+        Returns:
+            Primer ID reservado
+        """
+        with self._lock:
+            self._refresh(collection)
+            return self._sequence.allocate(collection, self._max_ids.get(collection, 0), count)
+
+    def get_products(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            self._refresh('products')
+            return self.db.get_products()
+
+    def _require_categories(self, products: List[Dict[str, Any]]) -> None:
+        """
+        Verifica, con el lock tomado, que existan las categorías de los productos,
+        así ninguna se elimina entre la verificación y la escritura.
+
+        Raises:
+            IntegrityError: Si alguna categoría no existe
+        """
+        self._refresh('categories')
+        for category in dict.fromkeys(product['category'] for product in products):
+            if category.casefold() not in self._categories_by_name:
+                raise IntegrityError(f"La categoría '{category}' no existe")
+
+    def add_product(self, new_product: Dict[str, Any]) -> None:
+        """Agrega un producto si su categoría existe (IntegrityError si no)."""
+        with self._lock:
+            self._require_categories([new_product])
+            self._refresh('products')
+            ticket = self.db.add_product(new_product, flush=False)
+            self._index_product(new_product)
+            self._product_search.add(new_product['id'], new_product.get('name'))
+            self._index_product_price(new_product)
+            _insert_by_id(self._products_sorted, new_product)
+            self._track_id('products', new_product['id'])
+            self._bump_version('products')
+        self._commit(ticket)
+
+    def add_products(self, new_products: List[Dict[str, Any]]) -> None:
+        """Agrega varios productos con una sola escritura; todos o ninguno si falta una categoría."""
+        with self._lock:
+            self._require_categories(new_products)
+            self._refresh('products')
+            ticket = self.db.add_products(new_products, flush=False)
+            for product in new_products:
+                self._index_product(product)
+                self._product_search.add(product['id'], product.get('name'))
+                self._index_product_price(product)
+                _insert_by_id(self._products_sorted, product)
+                self._track_id('products', product['id'])
+            self._bump_version('products')
+        self._commit(ticket)
+
+    def get_product(self, product_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            self._refresh('products')
+            return self._products_by_id.get(product_id)
+
+    def get_products_by_ids(self, product_ids: List[int]) -> List[Optional[Dict[str, Any]]]:
+        """Busca varios productos en el índice por ID tomando el lock una sola vez (None si no existe)."""
+        with self._lock:
+            self._refresh('products')
+            return list(map(self._products_by_id.get, product_ids))
+
+    def get_products_page(self, after_id: Optional[int], limit: int) -> List[Dict[str, Any]]:
+        """Retorna hasta limit productos con ID mayor a after_id, ordenados por ID."""
+        with self._lock:
+            self._refresh('products')
+            return _page_after(self._products_sorted, after_id, limit)
+
+    def get_products_by_category(self, category: str) -> List[Dict[str, Any]]:
+        with self._lock:
+            self._refresh('products')
+            return self._products_by_category.get(category.casefold(), [])
+
+    def get_products_by_price(self, min_price: Optional[float], max_price: Optional[float],
+                              after: Optional[Tuple[float, int]], limit: int,
+                              category: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Retorna hasta limit productos en un rango de precios, ordenados por (precio, ID).
+
+        Args:
+            min_price: Precio mínimo inclusive (None sin límite)
+            max_price: Precio máximo inclusive (None sin límite)
+            after: (precio, ID) del último producto de la página anterior
+            limit: Cantidad máxima de productos
+            category: Restringe el rango a una categoría (opcional)
+        """
+        with self._lock:
+            self._refresh('products')
+            if category is None:
+                products = self._products_by_price
+            else:
+                products = self._products_by_category_price.get(category.casefold(), [])
+            return _price_range(products, min_price, max_price, after, limit)
+
+    def get_product_columns(self) -> ProductColumns:
+        """
+        Retorna una copia de las columnas (ID, precio, categoría) de los productos
+        con precio numérico, un registro por ID. Una vez construidas se
+        mantienen al agregar productos.
+        """
+        with self._lock:
+            self._refresh('products')
+            if self._product_columns is None:
+                self._product_columns = ProductColumns()
+                self._product_columns.extend(filter(_has_price, self._products_by_id.values()))
+            # Copia: quien la use fuera del lock no bloquea los append (BufferError)
+            return self._product_columns.copy()
+
+    def search_products(self, query: str, limit: int, category: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Busca productos por nombre con el índice invertido.
+
+        Args:
+            query: Palabras a buscar; cada una puede ser el comienzo de una palabra
+            limit: Cantidad máxima de resultados
+            category: Restringe la búsqueda a una categoría (opcional); se intersecta
+                con los IDs ordenados de la categoría en lugar de filtrar cada resultado
+
+        Returns:
+            Productos ordenados por relevancia
+        """
+        with self._lock:
+            self._refresh('products')
+            within = None if category is None else self._ids_in_category(category.casefold())
+            ids = self._product_search.search(query, limit, within)
+            return [self._products_by_id[product_id] for product_id in ids]
+
+    def get_categories(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            self._refresh('categories')
+            return self.db.get_categories()
+
+    def add_category(self, new_category: Dict[str, Any]) -> None:
+        with self._lock:
+            self._refresh('categories')
+            ticket = self.db.add_category(new_category, flush=False)
+            self._index_category(new_category)
+            _insert_by_id(self._categories_sorted, new_category)
+            self._track_id('categories', new_category['id'])
+            self._bump_version('categories')
+        self._commit(ticket)
+
+    def remove_category(self, category_name: str, cascade: bool = False) -> int:
+        """
+        Elimina una categoría. La verificación de sus productos y la eliminación
+        ocurren con el lock tomado, así ningún producto nuevo queda huérfano.
+
+        Args:
+            category_name: Nombre de la categoría
+            cascade: Eliminar también sus productos y los favoritos que los referencian;
+                si es False y tiene productos no se elimina
+
+        Returns:
+            Cantidad de productos eliminados
+
+        Raises:
+            IntegrityError: Si la categoría no existe o tiene productos sin cascade
+        """
+        with self._lock:
+            self._refresh('categories')
+            self._refresh('products')
+            key = category_name.casefold()
+            category = self._categories_by_name.get(key)
+            if category is None:
+                raise IntegrityError("Categoría no encontrada")
+            count = len(self._products_by_category.get(key, ()))
+            if count and not cascade:
+                raise IntegrityError(f"La categoría tiene {count} productos; use cascade=true para eliminarlos")
+            if count:
+                self._remove_category_products(key)
+            ticket = self.db.remove_category(category['name'], flush=False)
+            self._build_category_indexes()
+            self._bump_version('categories')
+        self._commit(ticket)
+        return count
+
+    def _remove_category_products(self, key: str) -> None:
+        """
+        Elimina los productos de una categoría con una sola entrada del journal.
+        Se ubican con el índice por categoría; los demás índices se
+        actualizan con búsquedas binarias sin recorrer el catálogo.
+        """
+        products = self._products_by_category.pop(key)
+        self.db.remove_products([product['id'] for product in products], key, flush=False)
+        indexed = [product for product in products if self._products_by_id.get(product['id']) is product]
+        for product in indexed:
+            del self._products_by_id[product['id']]
+        self._product_search.remove((product['id'], product.get('name')) for product in indexed)
+        _remove_sorted(self._products_sorted, products, _record_id)
+        _remove_sorted(self._products_by_price, list(filter(_has_price, products)), _price_key)
+        self._products_by_category_price.pop(key, None)
+        self._category_ids.pop(key, None)
+        # Un producto de otra categoría con el mismo ID pasa a ser el indexado
+        for product in indexed:
+            position = bisect_left(self._products_sorted, product['id'], key=_record_id)
+            if position < len(self._products_sorted) and self._products_sorted[position]['id'] == product['id']:
+                survivor = self._products_sorted[position]
+                self._products_by_id[product['id']] = survivor
+                self._product_search.add(survivor['id'], survivor.get('name'))
+                self._category_ids.pop(survivor.get('category', '').casefold(), None)
+        # Las columnas de estadísticas se reconstruyen al próximo pedido
+        self._product_columns = None
+        self._bump_version('products')
+        self._remove_product_favorites([product['id'] for product in indexed
+                                        if product['id'] not in self._products_by_id])
+
+    def _remove_product_favorites(self, product_ids: List[int]) -> None:
+        """Elimina con una sola entrada del journal los favoritos de productos eliminados."""
+        if not product_ids:
+            return
+        self._refresh('favorites')
+        removed = set(product_ids)
+        pairs = [(user_id, product_id) for user_id, products in self._favorites_by_user.items()
+                 for product_id in products if product_id in removed]
+        if not pairs:
+            return
+        self.db.remove_product_favorites(product_ids, flush=False)
+        for pair in pairs:
+            self._unindex_favorite(*pair)
+        self._bump_version('favorites')
+
+    def get_category(self, category_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            self._refresh('categories')
+            return self._categories_by_id.get(category_id)
+
+    def get_categories_page(self, after_id: Optional[int], limit: int) -> List[Dict[str, Any]]:
+        """Retorna hasta limit categorías con ID mayor a after_id, ordenadas por ID."""
+        with self._lock:
+            self._refresh('categories')
+            return _page_after(self._categories_sorted, after_id, limit)
+
+    def get_category_by_name(self, name: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            self._refresh('categories')
+            return self._categories_by_name.get(name.casefold())
+
+    def get_favorites(self) -> List[Dict[str, Any]]:
+        with self._lock:
+            self._refresh('favorites')
+            return self.db.get_favorites()
+
+    def _require_products(self, favorites: List[Dict[str, Any]]) -> None:
+        """
+        Verifica, con el lock tomado, que existan los productos de los favoritos,
+        así ninguno se elimina entre la verificación y la escritura.
+
+        Raises:
+            IntegrityError: Si algún producto no existe
+        """
+        self._refresh('products')
+        for favorite in favorites:
+            if favorite['product_id'] not in self._products_by_id:
+                raise IntegrityError("El producto no existe")
+
+    def add_favorite(self, new_favorite: Dict[str, Any]) -> None:
+        """Agrega un favorito si su producto existe (IntegrityError si no)."""
+        with self._lock:
+            self._require_products([new_favorite])
+            self._refresh('favorites')
+            ticket = self.db.add_favorite(new_favorite, flush=False)
+            self._index_favorite(new_favorite)
+            self._bump_version('favorites')
+        self._commit(ticket)
+
+    def add_favorites(self, new_favorites: List[Dict[str, Any]]) -> None:
+        """Agrega varios favoritos con una sola escritura; todos o ninguno si falta un producto."""
+        with self._lock:
+            self._require_products(new_favorites)
+            self._refresh('favorites')
+            ticket = self.db.add_favorites(new_favorites, flush=False)
+            for favorite in new_favorites:
+                self._index_favorite(favorite)
+            self._bump_version('favorites')
+        self._commit(ticket)
+
+    def remove_favorite(self, user_id: int, product_id: int) -> None:
+        with self._lock:
+            self._refresh('favorites')
+            ticket = self.db.remove_favorite(user_id, product_id, flush=False)
+            self._unindex_favorite(user_id, product_id)
+            self._bump_version('favorites')
+        self._commit(ticket)
+
+    def apply_favorite_changes(self, changes: List[Tuple[str, Dict[str, Any]]]) -> List[Optional[Exception]]:
+        """
+        Aplica un grupo de altas y bajas de favoritos con una sola escritura.
+        Las altas ya existentes y las bajas inexistentes se omiten, así dos
+        peticiones iguales en el mismo grupo no duplican registros. Las altas
+        de productos inexistentes se rechazan sin afectar al resto del grupo.
+
+        Args:
+            changes: Lista de ('add' | 'remove', {'user_id', 'product_id'})
+
+        Returns:
+            Error de cada cambio, en el mismo orden (None si se aplicó u omitió)
+        """
+        ticket = None
+        errors: List[Optional[Exception]] = []
+        with self._lock:
+            self._refresh('products')
+            self._refresh('favorites')
+            for op, favorite in changes:
+                key = (favorite['user_id'], favorite['product_id'])
+                exists = self._has_favorite(*key)
+                if op == 'add' and key[1] not in self._products_by_id:
+                    errors.append(IntegrityError("El producto no existe"))
+                    continue
+                errors.append(None)
+                if op == 'add' and not exists:
+                    ticket = self.db.add_favorite(favorite, flush=False)
+                    self._index_favorite(favorite)
+                elif op == 'remove' and exists:
+                    ticket = self.db.remove_favorite(*key, flush=False)
+                    self._unindex_favorite(*key)
+            if ticket is not None:
+                self._bump_version('favorites')
+        self._commit(ticket)
+        return errors
+
+    def get_favorite_product_ids(self) -> array:
+        """Retorna el ID de producto de cada favorito, sin pares usuario-producto repetidos."""
+        with self._lock:
+            self._refresh('favorites')
+            product_ids = array('q')
+            for products in self._favorites_by_user.values():
+                product_ids.extend(products)
+            return product_ids
+
+    def has_favorite(self, user_id: int, product_id: int) -> bool:
+        with self._lock:
+            self._refresh('favorites')
+            return self._has_favorite(user_id, product_id)
+
+    def get_user_favorites(self, user_id: int) -> List[Dict[str, Any]]:
+        with self._lock:
+            self._refresh('favorites')
+            return list(map(Favorite, repeat(user_id), self._favorites_by_user.get(user_id, ())))
@@ -1,17 +1,190 @@
 import json
+import os
+import threading
+from utils.file_lock import FileLock
+from utils.lazy_json import LazyDocument
+from utils.metrics import timed
+from utils.records import RecordCodec, dumps
+
+JOURNAL_KEY = '_journal'
+
 
 class DatabaseConnection:
-    def __init__(self, json_file_path):
+    def __init__(self, json_file_path, journaled=False):
         self.json_file_path = json_file_path
+        self.journal_path = json_file_path + '.wal'
+        self.journaled = journaled
         self.data = None
+        self._codec = RecordCodec()
+        # Se incrementa en cada recarga desde disco
+        self.generation = 0
+        # _state_lock protege data y la cola; _flush_lock elige al hilo que escribe
+        # el grupo pendiente; _file_lock serializa las escrituras entre procesos
+        self._state_lock = threading.RLock()
+        self._flush_lock = threading.Lock()
+        self._file_lock = FileLock(json_file_path + '.lock')
+        self._pending = []
+        self._queued = 0
+        self._flushed = 0
+        self._flush_in_progress = False
+        self._journal_seq = 0
+        self._checkpoint_seq = 0
+        self._known_signature = object()
 
     def connect(self):
+        with self._state_lock:
+            self._load()
+
+    def reload_if_stale(self):
+        with self._state_lock:
+            # Durante una escritura propia el archivo cambia, pero no hay nada nuevo que leer
+            if self._flush_in_progress or not self.is_stale():
+                return False
+            self._load()
+            return True
+
+    @timed('storage', 'DatabaseConnection.load')
+    def _load(self):
         try:
-            with open(self.json_file_path, 'r') as json_file:
-                self.data = json.load(json_file)
+            # Cada colección se parsea recién cuando alguien la pide
+            self.data = LazyDocument(self.json_file_path, self._codec)
         except FileNotFoundError:
             self.data = None
             print("Error: json file not found.")
+        if self.data is not None:
+            if self.journaled:
+                self._replay_journal()
+            # Las mutaciones propias que aún no llegaron a disco se vuelven a aplicar
+            for entry in self._pending:
+                self._apply(entry)
+        self._known_signature = self.signature()
+        self.generation += 1
+
+    def signature(self):
+        return (self._file_signature(self.json_file_path),
+                self._file_signature(self.journal_path) if self.journaled else None)
+
+    def is_stale(self):
+        return self.signature() != self._known_signature
+
+    def _file_signature(self, path):
+        try:
+            stat = os.stat(path)
+            return (stat.st_mtime_ns, stat.st_size)
+        except FileNotFoundError:
+            return None
+
+    def _replay_journal(self):
+        self._checkpoint_seq = self.data.pop(JOURNAL_KEY, {}).get('seq', 0)
+        self._journal_seq = self._checkpoint_seq
+        try:
+            with open(self.journal_path, 'r') as journal_file:
+                for line in journal_file:
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        break  # Última línea incompleta por una caída
+                    if entry['seq'] > self._checkpoint_seq:
+                        self._apply(entry)
+                        self._journal_seq = entry['seq']
+        except FileNotFoundError:
+            pass
+
+    def _apply(self, entry):
+        # Si la colección aún no se parseó, la entrada se aplica al parsearla
+        self.data.apply(entry)
+
+    def _mutate(self, entry, flush=True):
+        with self._state_lock:
+            self._apply(entry)
+            self._pending.append(entry)
+            self._queued += 1
+            ticket = self._queued
+        if flush:
+            self.flush(ticket)
+        return ticket
+
+    def flush(self, ticket=None):
+        if ticket is None:
+            ticket = self._queued
+        with self._flush_lock:
+            # Otro hilo ya escribió el grupo que incluía esta mutación
+            if self._flushed >= ticket:
+                return
+            with self._file_lock:
+                self._flush_locked()
+
+    @timed('storage', 'DatabaseConnection.flush')
+    def _flush_locked(self):
+        with self._state_lock:
+            # Otro proceso escribió desde nuestra última lectura: recargar y reaplicar lo pendiente
+            if self.is_stale():
+                self._load()
+            batch_size = len(self._pending)
+            target = self._queued
+            if not batch_size:
+                return
+            if self.journaled:
+                lines = []
+                for entry in self._pending:
+                    self._journal_seq += 1
+                    lines.append(dumps(dict(entry, seq=self._journal_seq)) + '\n')
+                payload = ''.join(lines)
+            else:
+                payload = self.data.serialize()
+            self._flush_in_progress = True
+        try:
+            if self.journaled:
+                with open(self.journal_path, 'a') as journal_file:
+                    journal_file.write(payload)
+                    journal_file.flush()
+                    os.fsync(journal_file.fileno())
+                with self._state_lock:
+                    self._mark_flushed(batch_size, target)
+            else:
+                tmp_path = self._write_tmp(self.json_file_path, payload)
+                with self._state_lock:
+                    os.replace(tmp_path, self.json_file_path)
+                    self._mark_flushed(batch_size, target)
+        finally:
+            self._flush_in_progress = False
+
+    def _mark_flushed(self, batch_size, target):
+        del self._pending[:batch_size]
+        self._flushed = target
+        self._known_signature = self.signature()
+
+    def _write_tmp(self, path, payload):
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'w') as tmp_file:
+            tmp_file.write(payload)
+            tmp_file.flush()
+            os.fsync(tmp_file.fileno())
+        return tmp_path
+
+    def pending_journal_entries(self):
+        return self._journal_seq - self._checkpoint_seq
+
+    @timed('storage', 'DatabaseConnection.compact')
+    def compact(self):
+        if not self.journaled or self.data is None:
+            return
+        with self._flush_lock, self._file_lock:
+            self._flush_locked()
+            with self._state_lock:
+                checkpoint = self._journal_seq
+                snapshot = self.data.serialize({JOURNAL_KEY: {'seq': checkpoint}})
+                self._flush_in_progress = True
+            try:
+                tmp_path = self._write_tmp(self.json_file_path, snapshot)
+                with self._state_lock:
+                    os.replace(tmp_path, self.json_file_path)
+                    # Con el lock de archivo tomado nadie más agregó entradas al log
+                    open(self.journal_path, 'w').close()
+                    self._checkpoint_seq = checkpoint
+                    self._known_signature = self.signature()
+            finally:
+                self._flush_in_progress = False
 
     def get_products(self):
         if self.data:
@@ -19,40 +192,48 @@ class DatabaseConnection:
         else:
             return []
 
-    def add_product(self, new_product):
+    def add_product(self, new_product, flush=True):
         if self.data:
-            products = self.data.get('products', [])
-            products.append(new_product)
-            self.data['products'] = products
-            with open(self.json_file_path, 'w') as json_file:
-                json.dump(self.data, json_file, indent=4)
+            return self._mutate({'op': 'add', 'collection': 'products', 'item': new_product}, flush)
         else:
             print("Error: something went wrong adding the product")
 
+    def add_products(self, new_products, flush=True):
+        if self.data:
+            return self._mutate({'op': 'add_many', 'collection': 'products', 'items': new_products}, flush)
+        else:
+            print("Error: something went wrong adding the products")
+
+    def remove_products(self, product_ids, category_key, flush=True):
+        if self.data:
+            return self._mutate({'op': 'remove_many', 'collection': 'products',
+                                 'ids': product_ids, 'category': category_key}, flush)
+        else:
+            print("Error: something went wrong removing the products")
+
+    def remove_product_favorites(self, product_ids, flush=True):
+        if self.data:
+            return self._mutate({'op': 'remove_many', 'collection': 'favorites',
+                                 'ids': product_ids, 'field': 'product_id'}, flush)
+        else:
+            print("Error: something went wrong removing the favorite products")
+
     def get_categories(self):
         if self.data:
             return self.data.get('categories', [])
         else:
             return []
 
-    def add_category(self, new_category):
+    def add_category(self, new_category, flush=True):
         if self.data:
-            categories = self.data.get('categories', [])
-            categories.append(new_category)
-            self.data['categories'] = categories
-            with open(self.json_file_path, 'w') as json_file:
-                json.dump(self.data, json_file, indent=4)
+            return self._mutate({'op': 'add', 'collection': 'categories', 'item': new_category}, flush)
         else:
             print("Error: something went wrond adding category")
 
-    def remove_category(self, category_name):
+    def remove_category(self, category_name, flush=True):
         if self.data:
-            categories = self.data.get('categories', [])
-            categories = [cat for cat in categories if cat["name"] != category_name] 
-            self.data['categories'] = categories
-
-            with open(self.json_file_path, 'w') as json_file:
-                json.dump(self.data, json_file, indent=4)
+            return self._mutate({'op': 'remove', 'collection': 'categories',
+                                 'match': {'name': category_name}}, flush)
         else:
             print("Error: something went wrond removing category")
 
@@ -62,18 +243,21 @@ class DatabaseConnection:
         else:
             return []
 
-    def add_favorite(self, new_favorite):
+    def add_favorite(self, new_favorite, flush=True):
         if self.data:
-            favorites = self.data.get('favorites', [])
-            favorites.append(new_favorite)
-            self.data['favorites'] = favorites
-            with open(self.json_file_path, 'w') as json_file:
-                json.dump(self.data, json_file, indent=4)
+            return self._mutate({'op': 'add', 'collection': 'favorites', 'item': new_favorite}, flush)
         else:
             print("Error: something went wrong adding the favorite product")
 
+    def add_favorites(self, new_favorites, flush=True):
+        if self.data:
+            return self._mutate({'op': 'add_many', 'collection': 'favorites', 'items': new_favorites}, flush)
+        else:
+            print("Error: something went wrong adding the favorite products")
 
-
-
-            
-
+    def remove_favorite(self, user_id, product_id, flush=True):
+        if self.data:
+            return self._mutate({'op': 'remove', 'collection': 'favorites',
+                                 'match': {'user_id': user_id, 'product_id': product_id}}, flush)
+        else:
+            print("Error: something went wrong removing the favorite product")
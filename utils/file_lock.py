@@ -0,0 +1,60 @@
+"""
+Bloqueo de archivos entre procesos.
+Usa bloqueos advisory de fcntl cuando están disponibles (POSIX); en otras
+plataformas solo serializa los hilos del proceso actual.
+"""
+
+import threading
+from typing import Dict, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+
+class FileLock:
+    """
+    Context manager que toma un bloqueo exclusivo sobre un archivo de lock.
+    El bloqueo es reentrante dentro del mismo hilo.
+    """
+    _registry: Dict[str, Tuple[threading.RLock, threading.local]] = {}
+    _registry_lock = threading.Lock()
+
+    def __init__(self, lock_path: str):
+        """
+        Args:
+            lock_path: Ruta del archivo usado como lock
+        """
+        self.lock_path = lock_path
+        with FileLock._registry_lock:
+            # El estado se comparte por ruta para que varias instancias no se bloqueen entre sí
+            if lock_path not in FileLock._registry:
+                FileLock._registry[lock_path] = (threading.RLock(), threading.local())
+            self._thread_lock, self._local = FileLock._registry[lock_path]
+
+    def __enter__(self) -> 'FileLock':
+        self._thread_lock.acquire()
+        depth = getattr(self._local, 'depth', 0)
+        if depth == 0 and fcntl is not None:
+            lock_file = None
+            try:
+                lock_file = open(self.lock_path, 'a')
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+            except BaseException:
+                # Sin el lock del archivo no queda nada tomado: otro intento no debe bloquearse
+                if lock_file is not None:
+                    lock_file.close()
+                self._thread_lock.release()
+                raise
+            self._local.file = lock_file
+        self._local.depth = depth + 1
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self._local.depth -= 1
+        if self._local.depth == 0 and fcntl is not None:
+            fcntl.flock(self._local.file.fileno(), fcntl.LOCK_UN)
+            self._local.file.close()
+            self._local.file = None
+        self._thread_lock.release()
@@ -0,0 +1,146 @@
+"""
+Cola de escritura con group commit.
+Agrupa las mutaciones que llegan desde peticiones concurrentes y las guarda
+con una sola escritura durable; cada petición espera a que su grupo esté
+en disco antes de responder.
+"""
+
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+
+class _PendingWrite:
+    """
+    Una mutación encolada y el aviso de que su grupo ya es durable.
+    claimed indica que el hilo escritor ya la tomó; abandoned, que quien la
+    envió dejó de esperar antes de eso y no debe aplicarse.
+    """
+    __slots__ = ('change', 'done', 'error', 'claimed', 'abandoned')
+
+    def __init__(self, change: Any):
+        self.change = change
+        self.done = threading.Event()
+        self.error: Optional[Exception] = None
+        self.claimed = False
+        self.abandoned = False
+
+
+class GroupCommitQueue:
+    """
+    Singleton por nombre con un hilo escritor en segundo plano.
+    El hilo toma la primera mutación pendiente, espera hasta max_delay_ms
+    a que lleguen más (hasta batch_size) y las entrega juntas a commit_batch.
+    commit_batch puede retornar una lista con el error de cada mutación
+    (None si se aplicó); si lanza una excepción, falla todo el grupo.
+    """
+    _instances: Dict[str, 'GroupCommitQueue'] = {}
+    _instances_lock = threading.Lock()
+
+    def __new__(cls, name: str, commit_batch: Callable[[List[Any]], Optional[Sequence[Optional[Exception]]]],
+                batch_size: int = 256, max_delay_ms: float = 2, max_depth: int = 10000):
+        with cls._instances_lock:
+            instance = cls._instances.get(name)
+            if instance is None:
+                instance = super(GroupCommitQueue, cls).__new__(cls)
+                instance._setup(name, commit_batch, batch_size, max_delay_ms, max_depth)
+                cls._instances[name] = instance
+        return instance
+
+    def _setup(self, name: str, commit_batch: Callable[[List[Any]], Optional[Sequence[Optional[Exception]]]],
+               batch_size: int, max_delay_ms: float, max_depth: int) -> None:
+        """Inicializa la cola y lanza el hilo escritor; solo se ejecuta una vez por nombre."""
+        self.name = name
+        self._commit_batch = commit_batch
+        self.batch_size = max(1, batch_size)
+        self.max_delay = max(0.0, max_delay_ms) / 1000
+        self._queue: 'queue.Queue[_PendingWrite]' = queue.Queue(maxsize=max(1, max_depth))
+        # Protege claimed/abandoned: una mutación se toma o se abandona, nunca ambas
+        self._claim_lock = threading.Lock()
+        self.batches = 0
+        self.writes = 0
+        thread = threading.Thread(target=self._run, name=f'group-commit-{name}', daemon=True)
+        thread.start()
+
+    def submit(self, change: Any, timeout: float = 30) -> None:
+        """
+        Encola una mutación y espera a que su grupo quede guardado.
+
+        Args:
+            change: Mutación que entiende commit_batch
+            timeout: Segundos máximos de espera
+
+        Si el tiempo se agota antes de que el hilo escritor tome la mutación,
+        se descarta y nunca se aplica. Si ya la tomó, se espera el resultado de
+        su grupo: responder con error a una escritura que luego queda guardada
+        haría que el reintento falle.
+        
+        Raises:
+            Exception: Si la cola está llena, se agotó el tiempo o falló la escritura
+        """
+        pending = _PendingWrite(change)
+        try:
+            self._queue.put(pending, timeout=timeout)
+        except queue.Full:
+            raise Exception("La cola de escritura está llena")
+        if not pending.done.wait(timeout):
+            with self._claim_lock:
+                if not pending.claimed:
+                    pending.abandoned = True
+            if pending.abandoned:
+                raise Exception("Tiempo de espera agotado al guardar; la escritura no se aplicó")
+            pending.done.wait()
+        if pending.error is not None:
+            raise pending.error
+
+    def _next_batch(self) -> List[_PendingWrite]:
+        """Bloquea hasta la primera mutación y junta las que lleguen dentro del plazo."""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.max_delay
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            try:
+                if remaining > 0:
+                    batch.append(self._queue.get(timeout=remaining))
+                else:
+                    # Vencido el plazo, se suma lo que ya esté encolado sin esperar
+                    batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _claim(self, batch: List[_PendingWrite]) -> List[_PendingWrite]:
+        """Marca como tomadas las mutaciones del grupo y descarta las abandonadas."""
+        with self._claim_lock:
+            claimed = [pending for pending in batch if not pending.abandoned]
+            for pending in claimed:
+                pending.claimed = True
+        return claimed
+
+    def _run(self) -> None:
+        while True:
+            batch = self._claim(self._next_batch())
+            if not batch:
+                continue
+            try:
+                errors = self._commit_batch([pending.change for pending in batch])
+                # commit_batch puede rechazar cambios sueltos sin afectar al resto del grupo
+                for pending, error in zip(batch, errors or ()):
+                    pending.error = error
+            except Exception as e:
+                for pending in batch:
+                    pending.error = e
+            self.batches += 1
+            self.writes += len(batch)
+            for pending in batch:
+                pending.done.set()
+
+    def stats(self) -> Dict[str, Any]:
+        """Retorna los contadores de la cola."""
+        return {
+            'batches': self.batches,
+            'writes': self.writes,
+            'avg_batch_size': round(self.writes / self.batches, 2) if self.batches else 0.0,
+            'queue_depth': self._queue.qsize()
+        }
@@ -0,0 +1,101 @@
+"""
+Decorador para GET condicionales (ETag / Last-Modified).
+Responde 304 usando solo la versión de los datos, sin consultar los
+repositorios ni serializar la respuesta.
+
+request_variant(), validators() e is_not_modified() no dependen de Flask:
+asgi_app.py los usa para aplicar exactamente las mismas reglas.
+"""
+
+import zlib
+from functools import wraps
+from typing import Dict, Optional, Tuple
+from flask import g, request, Response
+from werkzeug.http import http_date, parse_date, parse_etags
+
+
+def build_etag(collection: str, version: str, variant: str) -> str:
+    """ETag fuerte: colección + versión + huella de la variante pedida (query y Accept)."""
+    return f"{collection}-{version}-{zlib.crc32(variant.encode()):08x}"
+
+
+def request_variant(request) -> str:
+    """
+    Variante pedida (query y tipo preferido del Accept) de una petición de Flask
+    o de asgi_app, así ambas aplicaciones generan el mismo ETag.
+    """
+    return f"{request.query_string.decode('latin-1')}|{request.accept_mimetypes.best}"
+
+
+def validators(collection: str, version: str, modified: float, variant: str) -> Tuple[str, Dict[str, str]]:
+    """
+    Calcula el ETag y las cabeceras de validación de una respuesta.
+
+    Returns:
+        Tupla (etag sin comillas, cabeceras ETag y Last-Modified)
+    """
+    etag = build_etag(collection, version, variant)
+    headers = {'ETag': f'"{etag}"'}
+    if modified:
+        headers['Last-Modified'] = http_date(modified)
+    return etag, headers
+
+
+def is_not_modified(etag: str, modified: float, if_none_match: Optional[str],
+                    if_modified_since: Optional[str]) -> bool:
+    """
+    Indica si el cliente ya tiene la versión actual. If-None-Match tiene
+    prioridad: If-Modified-Since solo se evalúa si no viene (RFC 7232).
+
+    Args:
+        etag: ETag actual sin comillas
+        modified: Timestamp de la última modificación (0 si no se conoce)
+        if_none_match: Valor crudo de la cabecera If-None-Match
+        if_modified_since: Valor crudo de la cabecera If-Modified-Since
+    """
+    if if_none_match:
+        return parse_etags(if_none_match).contains_weak(etag)
+    if if_modified_since and modified:
+        since = parse_date(if_modified_since)
+        return since is not None and int(modified) <= since.timestamp()
+    return False
+
+
+def conditional_get(collection: str):
+    """
+    Decorador que agrega ETag y Last-Modified a las respuestas 200 de un GET
+    y responde 304 si el cliente ya tiene la versión actual.
+
+    El resource decorado debe exponer self.service.get_data_version().
+
+    Uso:
+        @token_required
+        @conditional_get('products')
+        def get(self):
+            # código del endpoint
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(resource, *args, **kwargs):
+            # La versión se lee antes que los datos: nunca se etiqueta una respuesta con una versión más nueva
+            version, modified = resource.service.get_data_version()
+            # cached_response usa la misma versión en lugar de volver a consultarla
+            g.data_version = version
+            etag, headers = validators(collection, version, modified, request_variant(request))
+            
+            if is_not_modified(etag, modified, request.headers.get('If-None-Match'),
+                               request.headers.get('If-Modified-Since')):
+                return Response(status=304, headers=headers)
+            
+            result = f(resource, *args, **kwargs)
+            if isinstance(result, Response):
+                if result.status_code == 200:
+                    result.headers.update(headers)
+                return result
+            if isinstance(result, tuple) and len(result) == 2 and result[1] == 200:
+                return result[0], 200, headers
+            return result
+        
+        return decorated_function
+    
+    return decorator
@@ -0,0 +1,72 @@
+"""
+Secuencias persistentes de IDs por colección.
+Reemplaza el cálculo len(lista) + 1, que reutilizaba IDs tras eliminar registros.
+"""
+
+import json
+import os
+from utils.file_lock import FileLock
+
+
+class IdSequence:
+    """
+    Contador monotónico por colección guardado en un archivo junto a la base de datos.
+    Cada asignación se hace bajo un bloqueo de archivo, por lo que es segura
+    entre hilos y entre procesos, y nunca entrega dos veces el mismo ID.
+    """
+
+    def __init__(self, sequence_file_path: str):
+        """
+        Args:
+            sequence_file_path: Ruta del archivo donde se guardan los contadores
+        """
+        self.sequence_file_path = sequence_file_path
+        self._lock = FileLock(sequence_file_path + '.lock')
+
+    def allocate(self, collection: str, floor: int = 0, count: int = 1) -> int:
+        """
+        Reserva un bloque de IDs consecutivos.
+
+        Args:
+            collection: Nombre de la colección
+            floor: Mayor ID ya existente; la secuencia nunca queda por debajo
+            count: Cantidad de IDs a reservar
+
+        Returns:
+            Primer ID del bloque reservado
+        """
+        with self._lock:
+            counters = self._read()
+            first_id = max(counters.get(collection, 0), floor) + 1
+            counters[collection] = first_id + count - 1
+            self._write(counters)
+            return first_id
+
+    def _read(self) -> dict:
+        """
+        Lee los contadores; un archivo inexistente equivale a no haber asignado IDs.
+
+        Raises:
+            RuntimeError: Si el archivo existe pero está corrupto. Tratarlo como
+                vacío volvería a max(id) y reutilizaría IDs de registros eliminados.
+        """
+        try:
+            with open(self.sequence_file_path, 'r') as sequence_file:
+                counters = json.load(sequence_file)
+        except FileNotFoundError:
+            return {}
+        except ValueError as e:
+            raise RuntimeError(f"Archivo de secuencias corrupto {self.sequence_file_path}: {str(e)}")
+        if not isinstance(counters, dict) or not all(
+                isinstance(value, int) and not isinstance(value, bool) for value in counters.values()):
+            raise RuntimeError(f"Archivo de secuencias corrupto {self.sequence_file_path}: "
+                               "se esperaba un objeto con contadores enteros")
+        return counters
+
+    def _write(self, counters: dict) -> None:
+        tmp_path = self.sequence_file_path + '.tmp'
+        with open(tmp_path, 'w') as tmp_file:
+            json.dump(counters, tmp_file)
+            tmp_file.flush()
+            os.fsync(tmp_file.fileno())
+        os.replace(tmp_path, self.sequence_file_path)
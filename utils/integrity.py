@@ -0,0 +1,12 @@
+"""
+Errores de integridad referencial entre colecciones.
+"""
+
+
+class IntegrityError(ValueError):
+    """
+    La escritura rompería una referencia entre colecciones: un producto de una
+    categoría inexistente o una categoría eliminada que aún tiene productos.
+    Los almacenes la lanzan al verificar la referencia dentro de la misma
+    operación que escribe; al ser ValueError, los endpoints responden 400.
+    """
@@ -0,0 +1,232 @@
+"""
+Carga perezosa de db.json por colección.
+Mapea el archivo con mmap, ubica con una expresión regular dónde empieza y
+termina cada clave de primer nivel y solo parsea una colección cuando se
+pide. Las colecciones que nunca se leen no ocupan memoria como objetos
+Python y se vuelven a escribir copiando sus bytes originales.
+"""
+
+import json
+import mmap
+import os
+import re
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+_OPENING = re.compile(rb'\s*\{\r?\n([ \t]+)"')
+_WHITESPACE = b' \t\r\n'
+_MISSING = object()
+
+
+def scan_sections(buffer) -> Optional[Dict[str, Tuple[int, int]]]:
+    """
+    Ubica los valores de primer nivel de un documento JSON indentado.
+
+    En JSON un salto de línea solo puede aparecer como espacio en blanco,
+    nunca dentro de un string; por eso en un archivo indentado las claves
+    de primer nivel son las únicas líneas que empiezan con la indentación
+    del primer nivel seguida de comillas.
+
+    Args:
+        buffer: Bytes o mmap con el documento
+
+    Returns:
+        {clave: (inicio, fin)} del valor de cada clave, o None si el documento
+        no está indentado (en ese caso hay que parsearlo completo)
+    """
+    opening = _OPENING.match(buffer)
+    if not opening:
+        return None
+    indent = opening.group(1)
+    needle = b'\n' + indent + b'"'
+    key_pattern = re.compile(re.escape(needle) + rb'((?:[^"\\\r\n]|\\.)*)"[ \t]*:[ \t]*')
+    # find recorre el buffer mucho más rápido que una regex multilínea
+    matches = []
+    position = buffer.find(needle, opening.start(1) - 1)
+    while position != -1:
+        match = key_pattern.match(buffer, position)
+        if match:
+            matches.append(match)
+        position = buffer.find(needle, position + 1)
+    document_end = buffer.rfind(b'}')
+    if not matches or document_end < matches[-1].end():
+        return None
+
+    sections = {}
+    for index, match in enumerate(matches):
+        is_last = index + 1 == len(matches)
+        end = _strip_right(buffer, match.end(), document_end if is_last else matches[index + 1].start())
+        if not is_last:
+            # Entre dos claves debe quedar exactamente la coma separadora
+            if buffer[end - 1:end] != b',':
+                return None
+            end = _strip_right(buffer, match.end(), end - 1)
+        sections[json.loads(b'"' + match.group(1) + b'"')] = (match.end(), end)
+    return sections
+
+
+def _strip_right(buffer, start: int, end: int) -> int:
+    while end > start and buffer[end - 1] in _WHITESPACE:
+        end -= 1
+    return end
+
+
+class LazyDocument:
+    """
+    Documento JSON de primer nivel cuyas colecciones se parsean al primer acceso.
+    Las mutaciones sobre colecciones aún no parseadas se guardan y se aplican
+    cuando la colección se lee.
+
+    El codec decide cómo se representa cada colección en memoria: decode(clave,
+    bytes), convert(clave, valor ya parseado), apply(items, entrada) y dumps(valor).
+    """
+
+    def __init__(self, path: str, codec):
+        """
+        Abre el archivo y ubica sus colecciones sin parsearlas.
+
+        Args:
+            path: Ruta al archivo JSON
+            codec: Conversión entre JSON y la representación en memoria
+
+        Raises:
+            FileNotFoundError: Si el archivo no existe
+            ValueError: Si el archivo no es JSON válido
+        """
+        self._codec = codec
+        self._parsed: Dict[str, Any] = {}
+        self._deferred: Dict[str, List[Dict[str, Any]]] = {}
+        self._source = None
+        self._sections: Dict[str, Tuple[int, int]] = {}
+        self._order: List[str] = []
+        # Dos lectores pueden pedir a la vez la misma colección sin parsear
+        self._lock = threading.RLock()
+
+        with open(path, 'rb') as json_file:
+            size = os.fstat(json_file.fileno()).st_size
+            if size and os.name == 'posix':
+                # El mapeo sigue siendo válido aunque otro proceso reemplace el archivo
+                source = mmap.mmap(json_file.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                source = json_file.read()
+        # Lo que sigue a la llave final (normalmente un salto de línea) se conserva al escribir
+        trailer = bytes(source[source.rfind(b'}') + 1:]) if size else b''
+        self._trailer = trailer.decode() if not trailer.strip() else ''
+        sections = scan_sections(source)
+        if sections is None:
+            document = json.loads(bytes(source))
+            self._parsed = {key: codec.convert(key, value) for key, value in document.items()}
+            self._order = list(self._parsed)
+            _close(source)
+        else:
+            self._source = source
+            self._sections = sections
+            self._order = list(sections)
+
+    def _parse(self, key: str) -> Any:
+        start, end = self._sections[key]
+        try:
+            value = self._codec.decode(key, self._source[start:end])
+        except ValueError:
+            # La indentación no permitió separar las secciones: se parsea todo
+            self._parse_all()
+            return self._parsed[key]
+        del self._sections[key]
+        for entry in self._deferred.pop(key, []):
+            value = self._codec.apply(value, entry)
+        self._parsed[key] = value
+        if not self._sections:
+            self.close()
+        return value
+
+    def _parse_all(self) -> None:
+        document = json.loads(bytes(self._source))
+        for key in self._sections:
+            value = self._codec.convert(key, document[key])
+            for entry in self._deferred.pop(key, []):
+                value = self._codec.apply(value, entry)
+            self._parsed[key] = value
+        self._sections = {}
+        self.close()
+
+    def get(self, key: str, default: Any = None) -> Any:
+        value = self._parsed.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        with self._lock:
+            if key in self._parsed:
+                return self._parsed[key]
+            if key in self._sections:
+                return self._parse(key)
+            return default
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        with self._lock:
+            if key not in self._parsed and key not in self._sections:
+                self._order.append(key)
+            self._sections.pop(key, None)
+            self._deferred.pop(key, None)
+            self._parsed[key] = value
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._parsed or key in self._sections
+
+    def __bool__(self) -> bool:
+        return bool(self._parsed or self._sections)
+
+    def pop(self, key: str, default: Any = None) -> Any:
+        with self._lock:
+            value = self.get(key, _MISSING)
+            if value is _MISSING:
+                return default
+            self._parsed.pop(key, None)
+            self._order.remove(key)
+            return value
+
+    def is_parsed(self, key: str) -> bool:
+        """Indica si la colección ya fue parseada."""
+        return key in self._parsed
+
+    def apply(self, entry: Dict[str, Any]) -> None:
+        """Aplica una mutación ahora o, si su colección no se leyó aún, al parsearla."""
+        collection = entry['collection']
+        with self._lock:
+            if collection in self._sections:
+                self._deferred.setdefault(collection, []).append(entry)
+            else:
+                self[collection] = self._codec.apply(self.get(collection, []), entry)
+
+    def serialize(self, extra: Optional[Dict[str, Any]] = None) -> str:
+        """
+        Genera el documento con el mismo formato que json.dumps(..., indent=4).
+        Las colecciones sin parsear se copian byte a byte desde el archivo.
+
+        Args:
+            extra: Claves adicionales de primer nivel (reemplazan a las existentes)
+        """
+        extra = extra or {}
+        parts = []
+        with self._lock:
+            for key in self._order + [key for key in extra if key not in self]:
+                if key in self._sections and key not in self._deferred and key not in extra:
+                    # Los bytes originales ya tienen la indentación de segundo nivel
+                    start, end = self._sections[key]
+                    value = self._source[start:end].decode()
+                else:
+                    value = extra[key] if key in extra else self.get(key)
+                    value = self._codec.dumps(value).replace('\n', '\n    ')
+                parts.append(f'    {json.dumps(key)}: {value}')
+        if not parts:
+            return '{}' + self._trailer
+        return '{\n' + ',\n'.join(parts) + '\n}' + self._trailer
+
+    def close(self) -> None:
+        """Libera el mapeo del archivo."""
+        with self._lock:
+            _close(self._source)
+            self._source = None
+
+
+def _close(source) -> None:
+    if isinstance(source, mmap.mmap):
+        source.close()
@@ -0,0 +1,198 @@
+"""
+Instrumentación opcional de tiempos usando Singleton Pattern y Decorator Pattern.
+Registra histogramas por endpoint y por capa (auth, service, repository,
+storage) y los expone en formato de texto de Prometheus.
+
+Se activa con METRICS_ENABLED=1. Desactivada, los decoradores devuelven la
+función original sin envolver, así que no agregan costo por llamada.
+"""
+
+import inspect
+import os
+import threading
+import time
+from bisect import bisect_left
+from functools import wraps
+from typing import Dict, List, Tuple
+from flask import g, request
+
+# Límites de los buckets en segundos (los de los clientes de Prometheus)
+BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025,
+           0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PROMETHEUS_MIMETYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+REQUEST_METRIC = 'app_request_duration_seconds'
+LAYER_METRIC = 'app_layer_duration_seconds'
+_HELP = {
+    REQUEST_METRIC: 'Tiempo total de cada petición HTTP por endpoint.',
+    LAYER_METRIC: 'Tiempo de cada operación por capa (auth, service, repository, storage).',
+}
+
+
+class Histogram:
+    """Contadores por bucket, suma y total de observaciones."""
+    __slots__ = ('counts', 'sum', 'count', '_lock')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float) -> None:
+        index = bisect_left(BUCKETS, seconds)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += seconds
+            self.count += 1
+
+
+class Metrics:
+    """
+    Singleton con los histogramas del proceso, indexados por nombre de
+    métrica y etiquetas.
+    """
+    _instance = None
+    _initialized = False
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(Metrics, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not self._initialized:
+            flag = os.environ.get('METRICS_ENABLED', '0')
+            self.enabled = flag.strip().lower() in ('1', 'true', 'yes', 'on')
+            self._histograms: Dict[Tuple[str, Tuple[Tuple[str, str], ...]], Histogram] = {}
+            self._lock = threading.Lock()
+            self._initialized = True
+
+    def observe(self, metric: str, labels: Tuple[Tuple[str, str], ...], seconds: float) -> None:
+        """
+        Registra una duración.
+
+        Args:
+            metric: Nombre de la métrica
+            labels: Pares (etiqueta, valor) en orden fijo
+            seconds: Duración observada
+        """
+        key = (metric, labels)
+        histogram = self._histograms.get(key)
+        if histogram is None:
+            with self._lock:
+                histogram = self._histograms.setdefault(key, Histogram())
+        histogram.observe(seconds)
+
+    def render(self) -> str:
+        """Genera la exposición en formato de texto de Prometheus."""
+        lines: List[str] = []
+        with self._lock:
+            items = sorted(self._histograms.items())
+        current = None
+        for (metric, labels), histogram in items:
+            if metric != current:
+                lines.append(f'# HELP {metric} {_HELP.get(metric, metric)}')
+                lines.append(f'# TYPE {metric} histogram')
+                current = metric
+            label_text = ','.join(f'{name}="{_escape(value)}"' for name, value in labels)
+            prefix = label_text + ',' if label_text else ''
+            with histogram._lock:
+                counts, total, count = list(histogram.counts), histogram.sum, histogram.count
+            cumulative = 0
+            for bound, bucket_count in zip(BUCKETS, counts):
+                cumulative += bucket_count
+                lines.append(f'{metric}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+            lines.append(f'{metric}_bucket{{{prefix}le="+Inf"}} {count}')
+            lines.append(f'{metric}_sum{{{label_text}}} {total}')
+            lines.append(f'{metric}_count{{{label_text}}} {count}')
+        lines.extend(_cache_lines())
+        return '\n'.join(lines) + '\n'
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _cache_lines() -> List[str]:
+    """Contadores de la caché de respuestas."""
+    from utils.response_cache import ResponseCache
+    stats = ResponseCache().stats()
+    return [
+        '# HELP app_response_cache_hits_total Respuestas servidas desde la caché.',
+        '# TYPE app_response_cache_hits_total counter',
+        f'app_response_cache_hits_total {stats["hits"]}',
+        '# HELP app_response_cache_misses_total Respuestas que no estaban en la caché.',
+        '# TYPE app_response_cache_misses_total counter',
+        f'app_response_cache_misses_total {stats["misses"]}',
+        '# HELP app_response_cache_bytes Bytes ocupados por la caché.',
+        '# TYPE app_response_cache_bytes gauge',
+        f'app_response_cache_bytes {stats["bytes"]}',
+    ]
+
+
+def timed(layer: str, operation: str = None):
+    """
+    Decorador que mide la duración de una función en una capa.
+
+    Uso:
+        @timed('auth', 'token_required')
+        def decorated_function(...):
+            ...
+    """
+    def decorator(f):
+        metrics = Metrics()
+        if not metrics.enabled:
+            return f
+        labels = (('layer', layer), ('operation', operation or f.__qualname__))
+
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return f(*args, **kwargs)
+            finally:
+                metrics.observe(LAYER_METRIC, labels, time.perf_counter() - start)
+
+        return decorated_function
+
+    return decorator
+
+
+def instrument(layer: str):
+    """
+    Decorador de clase que aplica timed a todos los métodos públicos.
+
+    Uso:
+        @instrument('service')
+        class ProductService:
+            ...
+    """
+    def decorator(cls):
+        if not Metrics().enabled:
+            return cls
+        for name, value in list(vars(cls).items()):
+            if inspect.isfunction(value) and not name.startswith('_'):
+                setattr(cls, name, timed(layer, f'{cls.__name__}.{name}')(value))
+        return cls
+
+    return decorator
+
+
+def install_flask_metrics(app) -> None:
+    """Registra hooks de Flask que miden cada petición por endpoint, método y estado."""
+    metrics = Metrics()
+
+    @app.before_request
+    def start_timer():
+        g.metrics_start = time.perf_counter()
+
+    @app.after_request
+    def record_request(response):
+        start = g.pop('metrics_start', None)
+        if start is not None:
+            endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+            labels = (('endpoint', endpoint), ('method', request.method),
+                      ('status', str(response.status_code)))
+            metrics.observe(REQUEST_METRIC, labels, time.perf_counter() - start)
+        return response
@@ -0,0 +1,217 @@
+"""
+Utilidades de paginación por cursor, proyección de campos y streaming NDJSON.
+"""
+
+import json
+import math
+from typing import Callable, Iterable, Iterator, List, Optional, Dict, Any, Tuple
+from flask import Response
+from utils.records import as_dict
+
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 1000
+NDJSON_MIMETYPE = 'application/x-ndjson'
+# Parámetros que piden el listado de productos por rango u orden de precio
+PRICE_PARAMS = ('min_price', 'max_price', 'sort')
+
+
+def parse_limit(limit: Optional[str]) -> int:
+    """
+    Valida el tamaño de página solicitado.
+
+    Args:
+        limit: Valor del parámetro limit (puede ser None)
+
+    Returns:
+        Tamaño de página entre 1 y MAX_PAGE_SIZE
+
+    Raises:
+        ValueError: Si el valor no es un entero válido
+    """
+    if limit is None or limit == '':
+        return DEFAULT_PAGE_SIZE
+    try:
+        value = int(limit)
+    except (TypeError, ValueError):
+        raise ValueError("El parámetro limit debe ser un número entero")
+    if value <= 0 or value > MAX_PAGE_SIZE:
+        raise ValueError(f"El parámetro limit debe estar entre 1 y {MAX_PAGE_SIZE}")
+    return value
+
+
+def parse_id_cursor(cursor: Optional[str]) -> Optional[int]:
+    """
+    Interpreta un cursor basado en ID (el último ID entregado).
+
+    Raises:
+        ValueError: Si el cursor no es válido
+    """
+    if cursor is None or cursor == '':
+        return None
+    try:
+        return int(cursor)
+    except (TypeError, ValueError):
+        raise ValueError("El cursor no es válido")
+
+
+def parse_price(value: Optional[str], name: str) -> Optional[float]:
+    """
+    Valida un límite de precio (min_price o max_price).
+
+    Args:
+        value: Valor del parámetro (puede ser None)
+        name: Nombre del parámetro, usado en el mensaje de error
+
+    Raises:
+        ValueError: Si el valor no es numérico
+    """
+    if value is None or value == '':
+        return None
+    try:
+        price = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"El parámetro {name} debe ser numérico")
+    if math.isnan(price):
+        raise ValueError(f"El parámetro {name} debe ser numérico")
+    return price
+
+
+def parse_price_cursor(cursor: Optional[str]) -> Optional[Tuple[float, int]]:
+    """
+    Interpreta un cursor 'precio:ID' (el último producto entregado).
+
+    Raises:
+        ValueError: Si el cursor no es válido
+    """
+    if cursor is None or cursor == '':
+        return None
+    try:
+        price, product_id = cursor.rsplit(':', 1)
+        return float(price), int(product_id)
+    except (TypeError, ValueError):
+        raise ValueError("El cursor no es válido")
+
+
+def id_cursor(item: Any) -> str:
+    """Cursor de las páginas ordenadas por ID."""
+    return str(item['id'])
+
+
+def price_cursor(item: Any) -> str:
+    """Cursor de las páginas ordenadas por (precio, ID)."""
+    return f"{item['price']}:{item['id']}"
+
+
+def parse_id_list(ids: Optional[str], limit: int = MAX_PAGE_SIZE) -> List[int]:
+    """
+    Convierte '1,2,3' en [1, 2, 3], sin repetidos y conservando el orden.
+
+    Args:
+        ids: Valor del parámetro ids
+        limit: Cantidad máxima de IDs distintos
+
+    Raises:
+        ValueError: Si la lista está vacía, tiene valores no enteros o supera limit
+    """
+    try:
+        values = [int(part) for part in (ids or '').split(',') if part.strip()]
+    except ValueError:
+        raise ValueError("El parámetro ids debe ser una lista de números enteros separados por coma")
+    if not values:
+        raise ValueError("El parámetro ids no puede estar vacío")
+    unique = list(dict.fromkeys(values))
+    if len(unique) > limit:
+        raise ValueError(f"El parámetro ids admite como máximo {limit} IDs")
+    return unique
+
+
+def parse_flag(value: Optional[str], name: str) -> bool:
+    """
+    Valida un parámetro booleano ('true'/'false' o '1'/'0'); ausente es False.
+
+    Args:
+        value: Valor del parámetro (puede ser None)
+        name: Nombre del parámetro, usado en el mensaje de error
+
+    Raises:
+        ValueError: Si el valor no es un booleano reconocido
+    """
+    if value is None or value == '':
+        return False
+    normalized = value.strip().lower()
+    if normalized in ('true', '1'):
+        return True
+    if normalized in ('false', '0'):
+        return False
+    raise ValueError(f"El parámetro {name} debe ser true o false")
+
+
+def build_page(rows: List[Dict[str, Any]], limit: int,
+               cursor: Callable[[Any], str] = id_cursor) -> Dict[str, Any]:
+    """
+    Arma la respuesta paginada a partir de limit + 1 filas.
+    La fila extra solo indica si existe una página siguiente.
+
+    Args:
+        rows: Hasta limit + 1 filas en el orden de la paginación
+        limit: Tamaño de página
+        cursor: Función que arma el cursor a partir de la última fila entregada
+    """
+    items = rows[:limit]
+    next_cursor = cursor(items[-1]) if len(rows) > limit else None
+    return {'items': items, 'next_cursor': next_cursor}
+
+
+def iter_by_id(fetch_page, batch_size: int = 500) -> Iterator[Dict[str, Any]]:
+    """
+    Recorre una colección completa página por página.
+
+    Args:
+        fetch_page: Función (after_id, limit) -> lista ordenada por ID
+        batch_size: Filas por página leída del almacén
+    """
+    after_id = None
+    while True:
+        rows = fetch_page(after_id, batch_size)
+        yield from rows
+        if len(rows) < batch_size:
+            return
+        after_id = rows[-1]['id']
+
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Convierte 'id,name' en ['id', 'name']; None si no se pidió proyección."""
+    if not fields:
+        return None
+    return [field.strip() for field in fields.split(',') if field.strip()]
+
+
+def project(item: Any, fields: Optional[List[str]]) -> Dict[str, Any]:
+    """Convierte un registro en dict con solo los campos pedidos."""
+    item = as_dict(item)
+    if fields is None:
+        return item
+    return {field: item[field] for field in fields if field in item}
+
+
+def project_all(items: Iterable[Any], fields: Optional[List[str]]) -> List[Dict[str, Any]]:
+    """Aplica la proyección a una lista de registros."""
+    return [project(item, fields) for item in items]
+
+
+def wants_ndjson(request) -> bool:
+    """Indica si el cliente pidió la exportación en streaming NDJSON."""
+    return (request.args.get('format') == 'ndjson'
+            or request.accept_mimetypes.best == NDJSON_MIMETYPE)
+
+
+def ndjson_response(rows: Iterable[Dict[str, Any]], fields: Optional[List[str]] = None) -> Response:
+    """
+    Construye una respuesta NDJSON que serializa las filas a medida que se envían,
+    sin armar el payload completo en memoria.
+    """
+    def generate():
+        for row in rows:
+            yield json.dumps(project(row, fields)) + '\n'
+
+    return Response(generate(), mimetype=NDJSON_MIMETYPE)
@@ -0,0 +1,425 @@
+"""
+Representación compacta de productos y favoritos en memoria.
+Los productos son objetos con __slots__ y la categoría internada; los
+favoritos se guardan por columnas en arreglos de enteros. Los repositorios
+y servicios trabajan con estos registros y solo se convierten a dict al
+armar la respuesta (as_dict / as_dicts).
+"""
+
+import json
+import sys
+from array import array
+from itertools import compress
+from operator import attrgetter, itemgetter
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+PRODUCT_FIELDS = ('id', 'name', 'category', 'price')
+# Orden de claves con el que se escriben los productos nuevos
+PRODUCT_KEY_ORDER = ('id', 'name', 'price', 'category')
+FAVORITE_FIELDS = ('user_id', 'product_id')
+# Marca de FavoriteTable para una fila eliminada (los IDs de usuario válidos son positivos)
+DELETED_ROW = -2 ** 63
+
+
+class Record:
+    """
+    Base de los registros compactos. Permite leer los campos como en el
+    dict al que reemplaza (record['id'], record.get('category')).
+    """
+    __slots__ = ()
+    _fields: Tuple[str, ...] = ()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {field: getattr(self, field) for field in self._fields}
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self._fields:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, (Record, dict)):
+            return self.to_dict() == as_dict(other)
+        return NotImplemented
+
+    # Como los dict a los que reemplazan, los registros son mutables y se comparan
+    # por contenido: no se pueden usar en sets ni como claves de dict
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}({self.to_dict()!r})'
+
+
+class Product(Record):
+    """
+    Producto; los campos que no son de PRODUCT_FIELDS se conservan en extra.
+    key_order guarda el orden de claves leído de db.json cuando no es el de
+    PRODUCT_KEY_ORDER, así guardar no reordena las filas existentes.
+    """
+    __slots__ = ('id', 'name', 'category', 'price', 'extra', 'key_order')
+    _fields = PRODUCT_FIELDS
+
+    def __init__(self, id: int, name: str, category: str, price: float,
+                 extra: Optional[Dict[str, Any]] = None, key_order: Optional[Tuple[str, ...]] = None):
+        self.id = id
+        self.name = name
+        # Pocas categorías repetidas en muchos productos: una sola copia de cada string
+        self.category = sys.intern(category) if isinstance(category, str) else category
+        self.price = price
+        self.extra = extra
+        self.key_order = key_order
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Product':
+        extra = {key: value for key, value in data.items() if key not in PRODUCT_FIELDS}
+        product = cls(data.get('id'), data.get('name'), data.get('category'), data.get('price'),
+                      extra or None)
+        order = tuple(data)
+        if order != tuple(product._default_dict()):
+            # Los órdenes se repiten entre filas: se comparte una sola tupla
+            product.key_order = _KEY_ORDERS.setdefault(order, order)
+        return product
+
+    def _default_dict(self) -> Dict[str, Any]:
+        data = {'id': self.id, 'name': self.name, 'price': self.price, 'category': self.category}
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = self._default_dict()
+        if self.key_order is None:
+            return data
+        ordered = {key: data.pop(key) for key in self.key_order if key in data}
+        ordered.update(data)
+        return ordered
+
+    def __getitem__(self, key: str) -> Any:
+        if key in PRODUCT_FIELDS:
+            return getattr(self, key)
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+
+class Favorite(Record):
+    """Par (usuario, producto) devuelto por las consultas de favoritos."""
+    __slots__ = ('user_id', 'product_id')
+    _fields = FAVORITE_FIELDS
+
+    def __init__(self, user_id: int, product_id: int):
+        self.user_id = user_id
+        self.product_id = product_id
+
+
+class FavoriteTable:
+    """
+    Favoritos en dos columnas array('q'), en orden de inserción.
+    Ocupa 16 bytes por favorito frente a un dict por fila.
+    Las bajas marcan la fila con DELETED_ROW en lugar de mover las columnas;
+    las filas marcadas se descartan al compactar o al serializar.
+    """
+    __slots__ = ('user_ids', 'product_ids', '_rows_by_user', '_deleted')
+
+    def __init__(self):
+        self.user_ids = array('q')
+        self.product_ids = array('q')
+        # Por usuario, posiciones de sus filas; se construye en la primera baja
+        self._rows_by_user: Optional[Dict[int, array]] = None
+        self._deleted = 0
+
+    def __len__(self) -> int:
+        return len(self.user_ids) - self._deleted
+
+    def __iter__(self) -> Iterator[Favorite]:
+        if not self._deleted:
+            return map(Favorite, self.user_ids, self.product_ids)
+        return (Favorite(user_id, product_id) for user_id, product_id in self.pairs())
+
+    def pairs(self) -> Iterator[Tuple[int, int]]:
+        pairs = zip(self.user_ids, self.product_ids)
+        if not self._deleted:
+            return pairs
+        return (pair for pair in pairs if pair[0] != DELETED_ROW)
+
+    def append(self, favorite: Any) -> None:
+        if self._rows_by_user is not None:
+            self._rows_by_user.setdefault(favorite['user_id'], array('q')).append(len(self.user_ids))
+        self.user_ids.append(favorite['user_id'])
+        self.product_ids.append(favorite['product_id'])
+
+    def extend(self, favorites: Iterable[Any]) -> None:
+        for favorite in favorites:
+            self.append(favorite)
+
+    def remove(self, user_id: int, product_id: int) -> None:
+        """
+        Elimina todas las filas del par. Solo recorre las filas del usuario
+        (índice por usuario) y las marca, sin desplazar las columnas.
+        """
+        if self._rows_by_user is None:
+            self._rows_by_user = {}
+            for position, row_user in enumerate(self.user_ids):
+                if row_user != DELETED_ROW:
+                    self._rows_by_user.setdefault(row_user, array('q')).append(position)
+        rows = self._rows_by_user.get(user_id)
+        if not rows:
+            return
+        product_ids = self.product_ids
+        kept = array('q', [position for position in rows if product_ids[position] != product_id])
+        if len(kept) == len(rows):
+            return
+        for position in rows:
+            if product_ids[position] == product_id:
+                self.user_ids[position] = DELETED_ROW
+        self._deleted += len(rows) - len(kept)
+        if kept:
+            self._rows_by_user[user_id] = kept
+        else:
+            del self._rows_by_user[user_id]
+        if self._deleted * 2 > len(self.user_ids):
+            self._compact()
+
+    def remove_products(self, product_ids: Set[int]) -> None:
+        """Elimina las filas de los productos indicados recorriendo las columnas una vez; también compacta."""
+        keep = [user_id != DELETED_ROW and product_id not in product_ids
+                for user_id, product_id in zip(self.user_ids, self.product_ids)]
+        if keep.count(False) == self._deleted:
+            return
+        self.user_ids = array('q', compress(self.user_ids, keep))
+        self.product_ids = array('q', compress(self.product_ids, keep))
+        self._rows_by_user = None
+        self._deleted = 0
+
+    def _compact(self) -> None:
+        """Descarta las filas marcadas; las posiciones cambian y el índice se reconstruye al necesitarlo."""
+        keep = [row_user != DELETED_ROW for row_user in self.user_ids]
+        self.user_ids = array('q', compress(self.user_ids, keep))
+        self.product_ids = array('q', compress(self.product_ids, keep))
+        self._rows_by_user = None
+        self._deleted = 0
+
+    def dumps(self) -> str:
+        """Misma salida que json.dumps(lista de dicts, indent=4), sin crear los dicts."""
+        if not len(self):
+            return '[]'
+        row = '    {\n        "user_id": %d,\n        "product_id": %d\n    }'
+        return '[\n' + ',\n'.join([row % pair for pair in self.pairs()]) + '\n]'
+
+
+class ProductColumns:
+    """
+    Columnas de productos para cálculos vectorizados: ID, precio y código de
+    categoría en arreglos (se pueden copiar a NumPy sin recorrer objetos).
+    Las categorías se agrupan sin distinguir mayúsculas; el nombre que se
+    muestra es el primero encontrado.
+    """
+    __slots__ = ('ids', 'prices', 'category_codes', 'categories', '_codes')
+
+    def __init__(self):
+        self.ids = array('q')
+        self.prices = array('d')
+        self.category_codes = array('q')
+        self.categories: List[str] = []
+        self._codes: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def append(self, product: Any) -> None:
+        category = product['category']
+        key = category.casefold()
+        code = self._codes.get(key)
+        if code is None:
+            code = self._codes[key] = len(self.categories)
+            self.categories.append(category)
+        self.ids.append(product['id'])
+        self.prices.append(product['price'])
+        self.category_codes.append(code)
+
+    def extend(self, products: Iterable[Any]) -> None:
+        for product in products:
+            self.append(product)
+
+    def copy(self) -> 'ProductColumns':
+        """Copia independiente; los slices de array se copian en C."""
+        columns = ProductColumns()
+        columns.ids = self.ids[:]
+        columns.prices = self.prices[:]
+        columns.category_codes = self.category_codes[:]
+        columns.categories = list(self.categories)
+        columns._codes = dict(self._codes)
+        return columns
+
+
+def as_dict(record: Any) -> Any:
+    """Convierte un registro compacto en dict; cualquier otro valor se retorna igual."""
+    return record.to_dict() if isinstance(record, Record) else record
+
+
+def as_dicts(records: Iterable[Any]) -> List[Any]:
+    """Convierte una colección de registros en una lista de dicts."""
+    return [as_dict(record) for record in records]
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, Record):
+        return value.to_dict()
+    if isinstance(value, FavoriteTable):
+        return as_dicts(value)
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def dumps(value: Any, **kwargs) -> str:
+    """json.dumps que acepta registros compactos."""
+    return json.dumps(value, default=_json_default, **kwargs)
+
+
+_KEY_ORDERS: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+
+class _NotFavoriteRow(Exception):
+    """La colección de favoritos tiene una fila que no entra en FavoriteTable."""
+
+
+def _product_hook(data: Dict[str, Any]) -> Any:
+    if len(data) == 4:
+        try:
+            product = Product(data['id'], data['name'], data['category'], data['price'])
+        except KeyError:
+            pass
+        else:
+            order = tuple(data)
+            if order != PRODUCT_KEY_ORDER:
+                product.key_order = _KEY_ORDERS.setdefault(order, order)
+            return product
+    # Los objetos anidados dentro de un producto (sin id) quedan como dict
+    return Product.from_dict(data) if 'id' in data else data
+
+
+def _is_favorite_row(row: Any) -> bool:
+    """Fila que FavoriteTable puede escribir igual: solo user_id y product_id enteros, en ese orden."""
+    return (type(row) is dict and tuple(row) == FAVORITE_FIELDS
+            and type(row['user_id']) is int and type(row['product_id']) is int)
+
+
+class RecordCodec:
+    """
+    Convierte las colecciones de db.json entre JSON y registros compactos.
+    Lo usa LazyDocument al parsear y al volver a escribir cada colección.
+    """
+
+    def decode(self, collection: str, raw: bytes) -> Any:
+        """Parsea una colección sin pasar por una lista intermedia de dicts."""
+        if collection == 'products':
+            return json.loads(raw, object_hook=_product_hook)
+        if collection == 'favorites':
+            return self._decode_favorites(raw)
+        return json.loads(raw)
+
+    def _decode_favorites(self, raw: bytes) -> Any:
+        """
+        Parsea los favoritos directo a las columnas de FavoriteTable: cada fila
+        se copia a los arreglos apenas se lee, sin crear un dict por fila.
+        Si alguna fila tiene otro formato se parsea de nuevo como lista de dicts.
+        """
+        table = FavoriteTable()
+        append_user, append_product = table.user_ids.append, table.product_ids.append
+
+        def hook(pairs: List[Tuple[str, Any]]) -> None:
+            # object_pairs_hook: la fila llega como pares y nunca se crea su dict
+            if len(pairs) != 2:
+                raise _NotFavoriteRow()
+            (user_key, user_id), (product_key, product_id) = pairs
+            if (user_key != 'user_id' or product_key != 'product_id'
+                    or type(user_id) is not int or type(product_id) is not int):
+                raise _NotFavoriteRow()
+            try:
+                append_user(user_id)
+                append_product(product_id)
+            except OverflowError:
+                raise _NotFavoriteRow()
+
+        try:
+            # El resultado es una lista de None: lo que se conserva son las columnas
+            rows = json.loads(raw, object_pairs_hook=hook)
+        except _NotFavoriteRow:
+            return json.loads(raw)
+        if not isinstance(rows, list) or len(rows) != len(table.user_ids):
+            return json.loads(raw)
+        return table
+
+    def convert(self, collection: str, value: Any) -> Any:
+        """Convierte una colección ya parseada como dicts."""
+        if collection == 'products' and isinstance(value, list):
+            return [_product_hook(item) if isinstance(item, dict) else item for item in value]
+        if collection == 'favorites':
+            return self._favorites(value)
+        return value
+
+    def _favorites(self, rows: Any) -> Any:
+        if not isinstance(rows, list):
+            return rows
+        if all(_is_favorite_row(row) for row in rows):
+            try:
+                # Las columnas se copian en C; falla si un valor no entra en 64 bits
+                table = FavoriteTable()
+                table.user_ids = array('q', map(itemgetter('user_id'), rows))
+                table.product_ids = array('q', map(itemgetter('product_id'), rows))
+                return table
+            except OverflowError:
+                pass
+        # Alguna fila con otro formato: se conserva la lista tal como estaba
+        return rows
+
+    def apply(self, items: Any, entry: Dict[str, Any]) -> Any:
+        """Aplica una mutación del journal o pendiente a una colección."""
+        collection = entry['collection']
+        if entry['op'] == 'add':
+            items.append(self._record(collection, entry['item']))
+        elif entry['op'] == 'add_many':
+            items.extend([self._record(collection, item) for item in entry['items']])
+        elif entry['op'] == 'remove':
+            match = entry['match']
+            if isinstance(items, FavoriteTable):
+                items.remove(match['user_id'], match['product_id'])
+            else:
+                items = [item for item in items
+                         if any(item.get(key) != value for key, value in match.items())]
+        elif entry['op'] == 'remove_many':
+            ids = set(entry['ids'])
+            # Por defecto se elimina por ID; los favoritos, por product_id
+            field = entry.get('field', 'id')
+            if isinstance(items, FavoriteTable):
+                items.remove_products(ids)
+                return items
+            try:
+                # Registros compactos: el campo se lee del slot sin llamar a get por fila
+                keys = list(map(attrgetter(field), items))
+            except AttributeError:
+                keys = [item.get(field) for item in items]
+            removed = [key in ids for key in keys]
+            category = entry.get('category')
+            if category is not None:
+                # Solo se quitan las filas de la categoría, aunque otra comparta el ID
+                removed = [hit and (item.get('category') or '').casefold() == category
+                           for hit, item in zip(removed, items)]
+            items = list(compress(items, [not hit for hit in removed]))
+        return items
+
+    def _record(self, collection: str, item: Any) -> Any:
+        if collection == 'products' and isinstance(item, dict):
+            return _product_hook(item)
+        return item
+
+    def dumps(self, value: Any) -> str:
+        """Serializa una colección con el formato de db.json (indent=4)."""
+        if isinstance(value, FavoriteTable):
+            return value.dumps()
+        return dumps(value, indent=4)
@@ -0,0 +1,168 @@
+"""
+Caché de respuestas GET ya serializadas usando Singleton Pattern.
+Guarda los bytes JSON listos para enviar, con política LRU acotada e
+invalidación explícita cuando los servicios modifican una colección.
+"""
+
+import json
+import os
+import threading
+from collections import OrderedDict
+from functools import wraps
+from typing import Dict, Set, Tuple, Any
+from flask import g, request, Response
+
+
+class ResponseCache:
+    """
+    Singleton con las respuestas serializadas por ruta, query y versión de datos.
+    Lleva contadores de aciertos y fallos para monitoreo.
+    """
+    _instance = None
+    _initialized = False
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(ResponseCache, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not self._initialized:
+            # Límites de la caché: cantidad de entradas y bytes totales
+            self.MAX_ENTRIES = int(os.environ.get('RESPONSE_CACHE_MAX_ENTRIES', '1024'))
+            self.MAX_BYTES = int(os.environ.get('RESPONSE_CACHE_MAX_BYTES', str(64 * 1024 * 1024)))
+            self._entries: 'OrderedDict[Tuple, Tuple[str, bytes]]' = OrderedDict()
+            self._keys_by_collection: Dict[str, Set[Tuple]] = {}
+            self._size = 0
+            self._lock = threading.Lock()
+            self.hits = 0
+            self.misses = 0
+            self._initialized = True
+
+    def get(self, key: Tuple):
+        """
+        Busca una respuesta en la caché.
+
+        Returns:
+            Bytes de la respuesta o None si no está
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key: Tuple, collection: str, body: bytes) -> None:
+        """Guarda una respuesta, desalojando las menos usadas si se superan los límites."""
+        if len(body) > self.MAX_BYTES:
+            return
+        with self._lock:
+            self._discard(key)
+            self._entries[key] = (collection, body)
+            self._keys_by_collection.setdefault(collection, set()).add(key)
+            self._size += len(body)
+            while len(self._entries) > self.MAX_ENTRIES or self._size > self.MAX_BYTES:
+                self._discard(next(iter(self._entries)))
+
+    def invalidate(self, collection: str) -> None:
+        """Elimina todas las respuestas que dependen de una colección."""
+        with self._lock:
+            for key in list(self._keys_by_collection.get(collection, ())):
+                self._discard(key)
+
+    def _discard(self, key: Tuple) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._size -= len(entry[1])
+            self._keys_by_collection[entry[0]].discard(key)
+
+    def stats(self) -> Dict[str, Any]:
+        """Retorna los contadores de la caché."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+                'entries': len(self._entries),
+                'bytes': self._size
+            }
+
+
+def cache_key(request, version: str) -> Tuple:
+    """
+    Clave de una respuesta: ruta, query, tipo preferido del Accept y versión de
+    los datos. Acepta una petición de Flask o de asgi_app, así ambas
+    aplicaciones comparten las mismas entradas para la misma petición.
+    """
+    return (request.path, request.query_string, str(request.accept_mimetypes.best), version)
+
+
+def _json_response(body: bytes, cache_status: str) -> Response:
+    response = Response(body, status=200, mimetype='application/json')
+    response.headers['X-Cache'] = cache_status
+    return response
+
+
+def cached_response(collection: str):
+    """
+    Decorador que sirve las respuestas 200 de un GET desde la caché.
+    La clave incluye la versión de los datos, así una escritura hecha por otro
+    proceso tampoco puede devolver una respuesta vieja.
+
+    El resource decorado debe exponer self.service.get_data_version(). Debajo de
+    conditional_get se usa la versión que ese decorador ya leyó.
+
+    Uso:
+        @token_required
+        @cached_response('products')
+        def get(self):
+            # código del endpoint
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(resource, *args, **kwargs):
+            cache = ResponseCache()
+            version = g.pop('data_version', None)
+            if version is None:
+                version, _ = resource.service.get_data_version()
+            key = cache_key(request, version)
+            body = cache.get(key)
+            if body is not None:
+                return _json_response(body, 'HIT')
+
+            result = f(resource, *args, **kwargs)
+            if isinstance(result, tuple) and len(result) == 2 and result[1] == 200:
+                body = (json.dumps(result[0]) + '\n').encode()
+                cache.put(key, collection, body)
+                return _json_response(body, 'MISS')
+            return result
+
+        return decorated_function
+
+    return decorator
+
+
+def invalidates(collection: str):
+    """
+    Decorador para métodos de servicio que modifican una colección.
+    Invalida la caché de respuestas cuando el método termina sin errores.
+
+    Uso:
+        @invalidates('products')
+        def create_product(self, ...):
+            # código del servicio
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            result = f(*args, **kwargs)
+            ResponseCache().invalidate(collection)
+            return result
+
+        return decorated_function
+
+    return decorator
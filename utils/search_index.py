@@ -0,0 +1,254 @@
+"""
+Índice invertido en memoria para buscar productos por nombre.
+Cada término (palabra normalizada con casefold) apunta a los IDs que lo
+contienen, ordenados. Los términos se guardan además en una lista ordenada
+para resolver prefijos con búsqueda binaria.
+"""
+
+import heapq
+import math
+import re
+from array import array
+from bisect import bisect_left, insort
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+# Letras y dígitos; el guion bajo separa palabras igual que el tokenizador de SQLite FTS5
+TOKEN_PATTERN = re.compile(r'[^\W_]+')
+# Términos que puede abarcar un prefijo (como max_expansions en los motores de búsqueda);
+# si coinciden más, se usan los que aparecen en más documentos
+MAX_EXPANSIONS = 50
+# Prefijos cortos cuyo ranking de términos se guarda hasta la próxima modificación
+RANKED_CACHE_SIZE = 256
+# Una coincidencia por prefijo pesa la mitad que la palabra exacta
+PREFIX_WEIGHT = 0.5
+# Hasta esta cantidad de IDs (o de términos), remove los quita uno a uno con búsqueda binaria
+BATCH_REMOVE_LIMIT = 64
+
+# Un término presente en un solo documento se guarda como int en lugar de un arreglo
+Postings = Union[int, array]
+
+
+def tokenize(text) -> List[str]:
+    """Separa un texto en términos normalizados, sin repetidos."""
+    if not isinstance(text, str):
+        return []
+    return list(dict.fromkeys(TOKEN_PATTERN.findall(text.casefold())))
+
+
+def _contains(postings: Postings, doc_id: int) -> bool:
+    if isinstance(postings, int):
+        return postings == doc_id
+    position = bisect_left(postings, doc_id)
+    return position < len(postings) and postings[position] == doc_id
+
+
+def _size(postings: Postings) -> int:
+    return 1 if isinstance(postings, int) else len(postings)
+
+
+def _iterate(postings: Postings) -> Iterable[int]:
+    return (postings,) if isinstance(postings, int) else postings
+
+
+class SearchIndex:
+    """
+    Índice invertido con búsqueda por prefijo y ranking.
+    Todas las palabras de la consulta deben aparecer (AND); cada una puede
+    coincidir con una palabra completa o con el comienzo de una. El puntaje
+    suma por palabra el IDF del término encontrado, reducido a la mitad si
+    la coincidencia fue por prefijo. Los empates se ordenan por ID.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Postings] = {}
+        self._terms: List[str] = []
+        self._documents = 0
+        self._ranked: Dict[str, List[str]] = {}
+
+    def build(self, documents: Iterable[Tuple[int, str]]) -> None:
+        """
+        Reconstruye el índice completo.
+
+        Args:
+            documents: Pares (ID, texto)
+        """
+        grouped: Dict[str, List[int]] = {}
+        count = 0
+        for doc_id, text in documents:
+            count += 1
+            for term in tokenize(text):
+                grouped.setdefault(term, []).append(doc_id)
+        self._postings = {term: ids[0] if len(ids) == 1 else array('q', sorted(ids))
+                          for term, ids in grouped.items()}
+        self._terms = sorted(self._postings)
+        self._documents = count
+        self._ranked = {}
+
+    def add(self, doc_id: int, text: str) -> None:
+        """Agrega un documento; con IDs crecientes cada término es un append."""
+        self._ranked.clear()
+        for term in tokenize(text):
+            postings = self._postings.get(term)
+            if postings is None:
+                self._postings[term] = doc_id
+                insort(self._terms, term)
+            elif isinstance(postings, int):
+                if postings != doc_id:
+                    self._postings[term] = array('q', sorted((postings, doc_id)))
+            elif postings[-1] < doc_id:
+                postings.append(doc_id)
+            elif not _contains(postings, doc_id):
+                postings.insert(bisect_left(postings, doc_id), doc_id)
+        self._documents += 1
+
+    def remove(self, documents: Iterable[Tuple[int, str]]) -> None:
+        """
+        Quita documentos; solo se tocan las listas de sus propios términos.
+        Cada lista se actualiza una vez: con pocos IDs por búsqueda binaria y
+        con muchos filtrándola en una pasada.
+
+        Args:
+            documents: Pares (ID, texto) con el texto que se indexó
+        """
+        self._ranked.clear()
+        grouped: Dict[str, List[int]] = {}
+        for doc_id, text in documents:
+            self._documents -= 1
+            for term in tokenize(text):
+                grouped.setdefault(term, []).append(doc_id)
+        emptied = []
+        for term, ids in grouped.items():
+            postings = self._postings.get(term)
+            if postings is None:
+                continue
+            if isinstance(postings, int):
+                remaining = array('q', () if postings in ids else (postings,))
+            elif len(ids) <= BATCH_REMOVE_LIMIT:
+                remaining = postings
+                for doc_id in ids:
+                    if _contains(remaining, doc_id):
+                        del remaining[bisect_left(remaining, doc_id)]
+            else:
+                removed = set(ids)
+                remaining = array('q', [doc_id for doc_id in postings if doc_id not in removed])
+            if not remaining:
+                del self._postings[term]
+                emptied.append(term)
+            else:
+                self._postings[term] = remaining[0] if len(remaining) == 1 else remaining
+        if len(emptied) <= BATCH_REMOVE_LIMIT:
+            for term in emptied:
+                del self._terms[bisect_left(self._terms, term)]
+        else:
+            self._terms = [term for term in self._terms if term in self._postings]
+
+    def _matching_terms(self, token: str) -> List[str]:
+        """
+        Términos que empiezan con la palabra. Si son más de MAX_EXPANSIONS se
+        conservan los de más documentos (y siempre la palabra exacta), no los
+        primeros en orden alfabético; el ranking se guarda por prefijo hasta
+        la próxima modificación del índice.
+        """
+        start = bisect_left(self._terms, token)
+        end = bisect_left(self._terms, token + '\U0010ffff', start)
+        if end - start <= MAX_EXPANSIONS:
+            return self._terms[start:end]
+        terms = self._ranked.get(token)
+        if terms is None:
+            postings = self._postings
+            terms = heapq.nlargest(MAX_EXPANSIONS, self._terms[start:end],
+                                   key=lambda term: _size(postings[term]))
+            if token in postings and token not in terms:
+                terms[-1] = token
+            if len(self._ranked) >= RANKED_CACHE_SIZE:
+                self._ranked.clear()
+            self._ranked[token] = terms
+        return terms
+
+    def _expand(self, token: str) -> List[Tuple[float, Postings]]:
+        """Términos que coinciden con una palabra, de mayor a menor peso."""
+        matches = []
+        for term in self._matching_terms(token):
+            postings = self._postings[term]
+            weight = math.log(1 + self._documents / _size(postings))
+            matches.append((weight if term == token else weight * PREFIX_WEIGHT, postings))
+        matches.sort(key=lambda match: match[0], reverse=True)
+        return matches
+
+    def search(self, query: str, limit: int, within: Optional[Sequence[int]] = None) -> List[int]:
+        """
+        Busca documentos que contengan todas las palabras de la consulta.
+
+        Args:
+            query: Texto de búsqueda
+            limit: Cantidad máxima de resultados
+            within: IDs ordenados a los que se restringe la búsqueda (opcional);
+                se intersectan con las listas de la palabra más selectiva
+
+        Returns:
+            IDs ordenados por relevancia
+        """
+        tokens = tokenize(query)
+        if not tokens or limit <= 0:
+            return []
+        expansions = [self._expand(token) for token in tokens]
+        if not all(expansions):
+            return []
+        # Se recorren los documentos de la palabra más selectiva y se verifican las demás
+        expansions.sort(key=lambda matches: sum(_size(postings) for _, postings in matches))
+        if within is not None:
+            # Recorriendo las listas se visitan unos limit * listas / within documentos hasta llenar
+            # el top; si within es más chico que eso, conviene recorrer within y probar las listas
+            total = sum(_size(postings) for _, postings in expansions[0])
+            if len(within) * len(within) < limit * total:
+                return self._search_within(expansions, limit, within)
+        first, rest = expansions[0], expansions[1:]
+        rest_bound = sum(matches[0][0] for matches in rest)
+
+        top: List[Tuple[float, int]] = []  # heap mínimo de (puntaje, -id)
+        seen = set()
+        for weight, postings in first:
+            bound = weight + rest_bound
+            if len(top) == limit and top[0][0] > bound:
+                break  # Ningún documento restante puede superar al peor del top
+            for doc_id in _iterate(postings):
+                if len(top) == limit and top[0][0] >= bound and -doc_id < top[0][1]:
+                    break  # Los IDs siguientes de este término solo empatan con IDs mayores
+                if doc_id in seen:
+                    continue
+                seen.add(doc_id)
+                if within is not None and not _contains(within, doc_id):
+                    continue
+                score = weight
+                for matches in rest:
+                    best = next((other for other, candidates in matches
+                                 if _contains(candidates, doc_id)), None)
+                    if best is None:
+                        break
+                    score += best
+                else:
+                    entry = (score, -doc_id)
+                    if len(top) < limit:
+                        heapq.heappush(top, entry)
+                    elif entry > top[0]:
+                        heapq.heapreplace(top, entry)
+        return [-negative_id for _, negative_id in sorted(top, reverse=True)]
+
+    def _search_within(self, expansions: List[List[Tuple[float, Postings]]], limit: int,
+                       within: Sequence[int]) -> List[int]:
+        """Variante de search que recorre within cuando es más chico que las listas de la consulta."""
+        top: List[Tuple[float, int]] = []
+        for doc_id in within:
+            score = 0.0
+            for matches in expansions:
+                best = next((weight for weight, postings in matches if _contains(postings, doc_id)), None)
+                if best is None:
+                    break
+                score += best
+            else:
+                entry = (score, -doc_id)
+                if len(top) < limit:
+                    heapq.heappush(top, entry)
+                elif entry > top[0]:
+                    heapq.heapreplace(top, entry)
+        return [-negative_id for _, negative_id in sorted(top, reverse=True)]
@@ -0,0 +1,441 @@
+"""
+Backend de almacenamiento SQLite.
+Alternativa a DatabaseConnection/DataStore con la misma interfaz, pensada
+para catálogos grandes y varios workers escribiendo a la vez.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from array import array
+from contextlib import contextmanager
+from typing import List, Optional, Dict, Any, Tuple
+from utils.integrity import IntegrityError
+from utils.metrics import instrument
+from utils.records import Favorite, Product, ProductColumns
+from utils.search_index import tokenize
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS products (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    category TEXT NOT NULL,
+    category_key TEXT NOT NULL,
+    price REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_products_category ON products (category_key, id);
+CREATE INDEX IF NOT EXISTS idx_products_price ON products (price, id);
+CREATE INDEX IF NOT EXISTS idx_products_category_price ON products (category_key, price, id);
+CREATE TABLE IF NOT EXISTS categories (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    name_key TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_categories_name ON categories (name_key);
+CREATE TABLE IF NOT EXISTS favorites (
+    user_id INTEGER NOT NULL,
+    product_id INTEGER NOT NULL
+);
+CREATE UNIQUE INDEX IF NOT EXISTS idx_favorites_user_product ON favorites (user_id, product_id);
+CREATE TABLE IF NOT EXISTS sequences (
+    collection TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS versions (
+    collection TEXT PRIMARY KEY,
+    version INTEGER NOT NULL,
+    modified REAL NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+    name, content='products', content_rowid='id', tokenize='unicode61 remove_diacritics 0'
+);
+CREATE TRIGGER IF NOT EXISTS products_fts_insert AFTER INSERT ON products BEGIN
+    INSERT INTO products_fts (rowid, name) VALUES (new.id, new.name);
+END;
+CREATE TRIGGER IF NOT EXISTS products_fts_delete AFTER DELETE ON products BEGIN
+    INSERT INTO products_fts (products_fts, rowid, name) VALUES ('delete', old.id, old.name);
+END;
+"""
+
+# Sentencias constantes: sqlite3 las compila una vez y las reutiliza por conexión
+SELECT_PRODUCTS = "SELECT id, name, category, price FROM products ORDER BY id"
+SELECT_PRODUCTS_PAGE = "SELECT id, name, category, price FROM products WHERE id > ? ORDER BY id LIMIT ?"
+SELECT_PRODUCT = "SELECT id, name, category, price FROM products WHERE id = ?"
+SELECT_PRODUCTS_BY_IDS = "SELECT id, name, category, price FROM products WHERE id IN ({placeholders})"
+SELECT_PRODUCTS_BY_CATEGORY = ("SELECT id, name, category, price FROM products "
+                               "WHERE category_key = ? ORDER BY id")
+COUNT_PRODUCTS_BY_CATEGORY = "SELECT COUNT(*) FROM products WHERE category_key = ?"
+DELETE_PRODUCTS_BY_CATEGORY = "DELETE FROM products WHERE category_key = ?"
+# Las condiciones son fragmentos fijos de get_products_by_price; los valores van como parámetros
+SELECT_PRODUCTS_BY_PRICE = ("SELECT id, name, category, price FROM products "
+                            "WHERE {conditions} ORDER BY price, id LIMIT ?")
+INSERT_PRODUCT = "INSERT INTO products (id, name, category, category_key, price) VALUES (?, ?, ?, ?, ?)"
+SEARCH_PRODUCTS = ("SELECT p.id, p.name, p.category, p.price FROM products_fts "
+                   "JOIN products p ON p.id = products_fts.rowid "
+                   "WHERE products_fts MATCH ? ORDER BY bm25(products_fts), p.id LIMIT ?")
+SEARCH_PRODUCTS_IN_CATEGORY = ("SELECT p.id, p.name, p.category, p.price FROM products_fts "
+                               "JOIN products p ON p.id = products_fts.rowid "
+                               "WHERE products_fts MATCH ? AND p.category_key = ? "
+                               "ORDER BY bm25(products_fts), p.id LIMIT ?")
+SELECT_FAVORITE_PRODUCT_IDS = "SELECT product_id FROM favorites"
+SELECT_PRODUCT_EXISTS = "SELECT 1 FROM products WHERE id = ?"
+DELETE_FAVORITES_BY_CATEGORY = ("DELETE FROM favorites WHERE product_id IN "
+                                "(SELECT id FROM products WHERE category_key = ?)")
+SELECT_CATEGORIES = "SELECT id, name FROM categories ORDER BY id"
+SELECT_CATEGORIES_PAGE = "SELECT id, name FROM categories WHERE id > ? ORDER BY id LIMIT ?"
+SELECT_CATEGORY = "SELECT id, name FROM categories WHERE id = ?"
+SELECT_CATEGORY_BY_NAME = "SELECT id, name FROM categories WHERE name_key = ? ORDER BY id LIMIT 1"
+INSERT_CATEGORY = "INSERT INTO categories (id, name, name_key) VALUES (?, ?, ?)"
+DELETE_CATEGORY = "DELETE FROM categories WHERE id = ?"
+SELECT_FAVORITES = "SELECT user_id, product_id FROM favorites ORDER BY rowid"
+SELECT_USER_FAVORITES = "SELECT user_id, product_id FROM favorites WHERE user_id = ? ORDER BY rowid"
+SELECT_FAVORITE = "SELECT 1 FROM favorites WHERE user_id = ? AND product_id = ?"
+INSERT_FAVORITE = "INSERT OR IGNORE INTO favorites (user_id, product_id) VALUES (?, ?)"
+DELETE_FAVORITE = "DELETE FROM favorites WHERE user_id = ? AND product_id = ?"
+SELECT_SEQUENCE = "SELECT value FROM sequences WHERE collection = ?"
+UPSERT_SEQUENCE = ("INSERT INTO sequences (collection, value) VALUES (?, ?) "
+                   "ON CONFLICT (collection) DO UPDATE SET value = excluded.value")
+SELECT_VERSION = "SELECT version, modified FROM versions WHERE collection = ?"
+BUMP_VERSION = ("INSERT INTO versions (collection, version, modified) VALUES (?, 1, ?) "
+                "ON CONFLICT (collection) DO UPDATE SET version = version + 1, modified = excluded.modified")
+# Parámetros por sentencia IN (...); SQLite anterior a 3.32 admite como máximo 999
+MAX_IN_PARAMS = 500
+# Nombres de tabla permitidos para next_id (no se interpolan valores del usuario)
+SEQUENCE_TABLES = {'products': 'products', 'categories': 'categories'}
+
+
+def _product_row(row) -> Product:
+    return Product(row[0], row[1], row[2], row[3])
+
+
+def _category_row(row) -> Dict[str, Any]:
+    return {'id': row[0], 'name': row[1]}
+
+
+def _favorite_row(row) -> Favorite:
+    return Favorite(row[0], row[1])
+
+
+@instrument('storage')
+class SQLiteConnection:
+    """
+    Singleton por archivo SQLite con la misma interfaz que DataStore.
+    Usa modo WAL para que las lecturas no bloqueen a los escritores, una
+    conexión por hilo e índices para las búsquedas por ID, categoría,
+    nombre y favoritos.
+    """
+    _instances: Dict[str, 'SQLiteConnection'] = {}
+    _instances_lock = threading.Lock()
+
+    def __new__(cls, sqlite_file_path: str = 'db.sqlite3'):
+        path = os.path.abspath(sqlite_file_path)
+        with cls._instances_lock:
+            instance = cls._instances.get(path)
+            if instance is None:
+                instance = super(SQLiteConnection, cls).__new__(cls)
+                instance._setup(path)
+                cls._instances[path] = instance
+        return instance
+
+    def _setup(self, path: str) -> None:
+        """Inicializa el estado interno y crea el esquema si no existe."""
+        self.sqlite_file_path = path
+        self._local = threading.local()
+        connection = self._connection()
+        has_search = connection.execute(
+            "SELECT 1 FROM sqlite_master WHERE name = 'products_fts'").fetchone() is not None
+        connection.executescript(SCHEMA)
+        if not has_search:
+            # Base creada antes del índice de búsqueda: se indexan los productos existentes
+            connection.execute("INSERT INTO products_fts (products_fts) VALUES ('rebuild')")
+
+    def _connection(self) -> sqlite3.Connection:
+        """Devuelve la conexión del hilo actual, creándola si hace falta."""
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = sqlite3.connect(self.sqlite_file_path, isolation_level=None,
+                                         check_same_thread=False, timeout=30)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+        return connection
+
+    @contextmanager
+    def _transaction(self):
+        """Abre una transacción que toma el lock de escritura desde el inicio."""
+        connection = self._connection()
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield connection
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        connection.execute("COMMIT")
+
+    def _write(self, collection: str, statement: str, params: tuple) -> int:
+        """
+        Ejecuta una escritura y, en la misma transacción, incrementa la versión
+        de la colección si cambió alguna fila.
+        """
+        with self._transaction() as connection:
+            rowcount = connection.execute(statement, params).rowcount
+            if rowcount > 0:
+                connection.execute(BUMP_VERSION, (collection, time.time()))
+        return rowcount
+
+    def _write_many(self, collection: str, statement: str, rows: List[tuple]) -> int:
+        """Ejecuta una escritura por lotes en una sola transacción e incrementa la versión."""
+        with self._transaction() as connection:
+            rowcount = connection.executemany(statement, rows).rowcount
+            if rowcount > 0:
+                connection.execute(BUMP_VERSION, (collection, time.time()))
+        return rowcount
+
+    def get_version(self, collection: str) -> Tuple[str, float]:
+        """
+        Obtiene la versión actual de una colección sin tocar sus datos.
+
+        Returns:
+            Tupla (etiqueta de versión, timestamp de la última modificación)
+        """
+        row = self._connection().execute(SELECT_VERSION, (collection,)).fetchone()
+        return (str(row[0]), row[1]) if row else ('0', 0.0)
+
+    def get_products(self) -> List[Dict[str, Any]]:
+        return [_product_row(row) for row in self._connection().execute(SELECT_PRODUCTS)]
+
+    def add_product(self, new_product: Dict[str, Any]) -> None:
+        """Agrega un producto si su categoría existe (IntegrityError si no)."""
+        self.add_products([new_product])
+
+    def add_products(self, new_products: List[Dict[str, Any]]) -> None:
+        """
+        Agrega varios productos en una transacción que primero verifica sus
+        categorías; todos o ninguno si falta alguna.
+        """
+        with self._transaction() as connection:
+            for category in dict.fromkeys(p['category'] for p in new_products):
+                if connection.execute(SELECT_CATEGORY_BY_NAME, (category.casefold(),)).fetchone() is None:
+                    raise IntegrityError(f"La categoría '{category}' no existe")
+            connection.executemany(INSERT_PRODUCT,
+                                   [(p['id'], p['name'], p['category'], p['category'].casefold(), p['price'])
+                                    for p in new_products])
+            if new_products:
+                connection.execute(BUMP_VERSION, ('products', time.time()))
+
+    def get_product(self, product_id: int) -> Optional[Dict[str, Any]]:
+        row = self._connection().execute(SELECT_PRODUCT, (product_id,)).fetchone()
+        return _product_row(row) if row else None
+
+    def get_products_by_ids(self, product_ids: List[int]) -> List[Optional[Product]]:
+        """Busca varios productos por clave primaria con una sentencia IN por bloque."""
+        found = {}
+        connection = self._connection()
+        for start in range(0, len(product_ids), MAX_IN_PARAMS):
+            chunk = product_ids[start:start + MAX_IN_PARAMS]
+            statement = SELECT_PRODUCTS_BY_IDS.format(placeholders=', '.join('?' * len(chunk)))
+            for row in connection.execute(statement, chunk):
+                found[row[0]] = _product_row(row)
+        return [found.get(product_id) for product_id in product_ids]
+
+    def get_products_page(self, after_id: Optional[int], limit: int) -> List[Dict[str, Any]]:
+        rows = self._connection().execute(SELECT_PRODUCTS_PAGE, (after_id or 0, limit))
+        return [_product_row(row) for row in rows]
+
+    def get_products_by_category(self, category: str) -> List[Dict[str, Any]]:
+        rows = self._connection().execute(SELECT_PRODUCTS_BY_CATEGORY, (category.casefold(),))
+        return [_product_row(row) for row in rows]
+
+    def get_products_by_price(self, min_price: Optional[float], max_price: Optional[float],
+                              after: Optional[Tuple[float, int]], limit: int,
+                              category: Optional[str] = None) -> List[Product]:
+        """Recorre el rango con el índice (price, id) o (category_key, price, id)."""
+        conditions, params = [], []
+        if category is not None:
+            conditions.append("category_key = ?")
+            params.append(category.casefold())
+        if min_price is not None:
+            conditions.append("price >= ?")
+            params.append(min_price)
+        if max_price is not None:
+            conditions.append("price <= ?")
+            params.append(max_price)
+        if after is not None:
+            conditions.append("(price, id) > (?, ?)")
+            params.extend(after)
+        statement = SELECT_PRODUCTS_BY_PRICE.format(conditions=' AND '.join(conditions) or '1')
+        rows = self._connection().execute(statement, (*params, limit))
+        return [_product_row(row) for row in rows]
+
+    def get_product_columns(self) -> ProductColumns:
+        """Columnas (ID, precio, categoría) de todos los productos."""
+        columns = ProductColumns()
+        columns.extend(map(_product_row, self._connection().execute(SELECT_PRODUCTS)))
+        return columns
+
+    def search_products(self, query: str, limit: int, category: Optional[str] = None) -> List[Product]:
+        """Busca productos por nombre con FTS5; cada palabra coincide también como prefijo."""
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+        # Los términos solo tienen letras y dígitos, así que pueden ir entre comillas sin escapar
+        match = ' '.join(f'"{token}"*' for token in tokens)
+        if category is None:
+            rows = self._connection().execute(SEARCH_PRODUCTS, (match, limit))
+        else:
+            rows = self._connection().execute(SEARCH_PRODUCTS_IN_CATEGORY, (match, category.casefold(), limit))
+        return [_product_row(row) for row in rows]
+
+    def get_categories(self) -> List[Dict[str, Any]]:
+        return [_category_row(row) for row in self._connection().execute(SELECT_CATEGORIES)]
+
+    def add_category(self, new_category: Dict[str, Any]) -> None:
+        self._write('categories', INSERT_CATEGORY,
+                    (new_category['id'], new_category['name'], new_category['name'].casefold()))
+
+    def remove_category(self, category_name: str, cascade: bool = False) -> int:
+        """
+        Elimina una categoría en una sola transacción que cuenta sus productos
+        con el índice (category_key, id) y, con cascade, los elimina junto con
+        sus favoritos.
+
+        Returns:
+            Cantidad de productos eliminados
+
+        Raises:
+            IntegrityError: Si la categoría no existe o tiene productos sin cascade
+        """
+        key = category_name.casefold()
+        with self._transaction() as connection:
+            row = connection.execute(SELECT_CATEGORY_BY_NAME, (key,)).fetchone()
+            if row is None:
+                raise IntegrityError("Categoría no encontrada")
+            count = connection.execute(COUNT_PRODUCTS_BY_CATEGORY, (key,)).fetchone()[0]
+            if count and not cascade:
+                raise IntegrityError(f"La categoría tiene {count} productos; use cascade=true para eliminarlos")
+            now = time.time()
+            if count:
+                # Los favoritos de esos productos se eliminan con ellos
+                if connection.execute(DELETE_FAVORITES_BY_CATEGORY, (key,)).rowcount > 0:
+                    connection.execute(BUMP_VERSION, ('favorites', now))
+                connection.execute(DELETE_PRODUCTS_BY_CATEGORY, (key,))
+                connection.execute(BUMP_VERSION, ('products', now))
+            connection.execute(DELETE_CATEGORY, (row[0],))
+            connection.execute(BUMP_VERSION, ('categories', now))
+        return count
+
+    def get_category(self, category_id: int) -> Optional[Dict[str, Any]]:
+        row = self._connection().execute(SELECT_CATEGORY, (category_id,)).fetchone()
+        return _category_row(row) if row else None
+
+    def get_categories_page(self, after_id: Optional[int], limit: int) -> List[Dict[str, Any]]:
+        rows = self._connection().execute(SELECT_CATEGORIES_PAGE, (after_id or 0, limit))
+        return [_category_row(row) for row in rows]
+
+    def get_category_by_name(self, name: str) -> Optional[Dict[str, Any]]:
+        row = self._connection().execute(SELECT_CATEGORY_BY_NAME, (name.casefold(),)).fetchone()
+        return _category_row(row) if row else None
+
+    def get_favorites(self) -> List[Dict[str, Any]]:
+        return [_favorite_row(row) for row in self._connection().execute(SELECT_FAVORITES)]
+
+    def add_favorite(self, new_favorite: Dict[str, Any]) -> None:
+        """Agrega un favorito si su producto existe (IntegrityError si no)."""
+        self.add_favorites([new_favorite])
+
+    def add_favorites(self, new_favorites: List[Dict[str, Any]]) -> None:
+        """
+        Agrega varios favoritos en una transacción que primero verifica sus
+        productos; todos o ninguno si falta alguno.
+        """
+        with self._transaction() as connection:
+            for product_id in dict.fromkeys(f['product_id'] for f in new_favorites):
+                if connection.execute(SELECT_PRODUCT_EXISTS, (product_id,)).fetchone() is None:
+                    raise IntegrityError("El producto no existe")
+            rowcount = connection.executemany(
+                INSERT_FAVORITE, [(f['user_id'], f['product_id']) for f in new_favorites]).rowcount
+            if rowcount > 0:
+                connection.execute(BUMP_VERSION, ('favorites', time.time()))
+
+    def remove_favorite(self, user_id: int, product_id: int) -> None:
+        self._write('favorites', DELETE_FAVORITE, (user_id, product_id))
+
+    def apply_favorite_changes(self, changes: List[Tuple[str, Dict[str, Any]]]) -> List[Optional[Exception]]:
+        """
+        Aplica un grupo de altas y bajas de favoritos en una sola transacción.
+        Las altas de productos inexistentes se rechazan sin afectar al resto.
+
+        Returns:
+            Error de cada cambio, en el mismo orden (None si se aplicó u omitió)
+        """
+        errors: List[Optional[Exception]] = []
+        with self._transaction() as connection:
+            rowcount = 0
+            for op, favorite in changes:
+                params = (favorite['user_id'], favorite['product_id'])
+                if op == 'add' and connection.execute(SELECT_PRODUCT_EXISTS, params[1:]).fetchone() is None:
+                    errors.append(IntegrityError("El producto no existe"))
+                    continue
+                errors.append(None)
+                statement = INSERT_FAVORITE if op == 'add' else DELETE_FAVORITE
+                rowcount += connection.execute(statement, params).rowcount
+            if rowcount > 0:
+                connection.execute(BUMP_VERSION, ('favorites', time.time()))
+        return errors
+
+    def get_favorite_product_ids(self) -> array:
+        """ID de producto de cada favorito; el índice único ya descarta pares repetidos."""
+        rows = self._connection().execute(SELECT_FAVORITE_PRODUCT_IDS)
+        return array('q', [row[0] for row in rows])
+
+    def has_favorite(self, user_id: int, product_id: int) -> bool:
+        return self._connection().execute(SELECT_FAVORITE, (user_id, product_id)).fetchone() is not None
+
+    def get_user_favorites(self, user_id: int) -> List[Dict[str, Any]]:
+        return [_favorite_row(row) for row in self._connection().execute(SELECT_USER_FAVORITES, (user_id,))]
+
+    def next_id(self, collection: str, count: int = 1) -> int:
+        """
+        Reserva IDs nuevos para una colección; nunca reutiliza uno ya entregado.
+
+        Args:
+            collection: Nombre de la colección ('products' o 'categories')
+            count: Cantidad de IDs consecutivos a reservar
+
+        Returns:
+            Primer ID reservado
+        """
+        table = SEQUENCE_TABLES[collection]
+        with self._transaction() as connection:
+            row = connection.execute(SELECT_SEQUENCE, (collection,)).fetchone()
+            floor = connection.execute(f"SELECT COALESCE(MAX(id), 0) FROM {table}").fetchone()[0]
+            first_id = max(row[0] if row else 0, floor) + 1
+            connection.execute(UPSERT_SEQUENCE, (collection, first_id + count - 1))
+        return first_id
+
+    def import_json(self, data: Dict[str, Any]) -> Dict[str, int]:
+        """
+        Carga un documento con el formato de db.json en una sola transacción.
+        Los IDs duplicados se omiten conservando el primero, igual que get_by_id.
+
+        Args:
+            data: Documento con las colecciones products, categories y favorites
+
+        Returns:
+            Cantidad de filas insertadas por colección
+        """
+        with self._transaction() as connection:
+            products = connection.executemany(
+                INSERT_PRODUCT.replace("INSERT", "INSERT OR IGNORE", 1),
+                [(p['id'], p['name'], p.get('category', ''), p.get('category', '').casefold(), p['price'])
+                 for p in data.get('products', [])]).rowcount
+            categories = connection.executemany(
+                INSERT_CATEGORY.replace("INSERT", "INSERT OR IGNORE", 1),
+                [(c['id'], c['name'], c['name'].casefold()) for c in data.get('categories', [])]).rowcount
+            favorites = connection.executemany(
+                INSERT_FAVORITE,
+                [(f['user_id'], f['product_id']) for f in data.get('favorites', [])]).rowcount
+            for collection in ('products', 'categories', 'favorites'):
+                connection.execute(BUMP_VERSION, (collection, time.time()))
+        return {'products': products, 'categories': categories, 'favorites': favorites}
@@ -0,0 +1,33 @@
+"""
+Importador de db.json a SQLite.
+
+Uso:
+    python -m utils.sqlite_import [db.json] [db.sqlite3]
+"""
+
+import json
+import sys
+from utils.sqlite_connection import SQLiteConnection
+
+
+def import_json_file(json_file_path: str, sqlite_file_path: str) -> dict:
+    """
+    Copia todas las colecciones de un archivo JSON a una base SQLite.
+
+    Args:
+        json_file_path: Ruta del db.json de origen
+        sqlite_file_path: Ruta de la base SQLite de destino
+
+    Returns:
+        Cantidad de filas insertadas por colección
+    """
+    with open(json_file_path, 'r') as json_file:
+        data = json.load(json_file)
+    return SQLiteConnection(sqlite_file_path).import_json(data)
+
+
+if __name__ == '__main__':
+    source = sys.argv[1] if len(sys.argv) > 1 else 'db.json'
+    target = sys.argv[2] if len(sys.argv) > 2 else 'db.sqlite3'
+    counts = import_json_file(source, target)
+    print(f"Importado {source} -> {target}: {counts}")
@@ -0,0 +1,49 @@
+"""
+Configuración de almacenamiento centralizada usando Singleton Pattern
+"""
+
+import os
+
+
+def _env_flag(name: str, default: bool) -> bool:
+    """Interpreta una variable de entorno como booleano."""
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+class StorageConfig:
+    """
+    Singleton para configuración del almacenamiento.
+    Los valores pueden sobreescribirse con variables de entorno.
+    """
+    _instance = None
+    _initialized = False
+
+    def __new__(cls):
+        if cls._instance is None:
+            cls._instance = super(StorageConfig, cls).__new__(cls)
+        return cls._instance
+
+    def __init__(self):
+        if not self._initialized:
+            # Backend de almacenamiento: 'json' (db.json en memoria) o 'sqlite'
+            self.STORAGE_BACKEND = os.environ.get('DB_BACKEND', 'json').strip().lower()
+            # Archivo usado por el backend SQLite
+            self.SQLITE_PATH = os.environ.get('DB_SQLITE_PATH', 'db.sqlite3')
+            # Modo journal: cada mutación se agrega a un log en lugar de reescribir el JSON
+            self.JOURNAL_ENABLED = _env_flag('DB_JOURNAL_ENABLED', False)
+            # Segundos entre revisiones del compactador en segundo plano
+            self.COMPACT_INTERVAL = float(os.environ.get('DB_COMPACT_INTERVAL', '5'))
+            # Entradas pendientes en el log a partir de las cuales se compacta
+            self.COMPACT_THRESHOLD = int(os.environ.get('DB_COMPACT_THRESHOLD', '1000'))
+            # Group commit de favoritos: altas y bajas concurrentes se guardan juntas
+            self.GROUP_COMMIT_ENABLED = _env_flag('DB_GROUP_COMMIT_ENABLED', True)
+            # Máximo de mutaciones por escritura
+            self.GROUP_COMMIT_BATCH_SIZE = int(os.environ.get('DB_GROUP_COMMIT_BATCH_SIZE', '256'))
+            # Milisegundos que se espera a que lleguen más mutaciones al grupo
+            self.GROUP_COMMIT_MAX_DELAY_MS = float(os.environ.get('DB_GROUP_COMMIT_MAX_DELAY_MS', '2'))
+            # Mutaciones en espera a partir de las cuales las peticiones nuevas se bloquean
+            self.GROUP_COMMIT_QUEUE_DEPTH = int(os.environ.get('DB_GROUP_COMMIT_QUEUE_DEPTH', '10000'))
+            self._initialized = True